@@ -1,6 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from pydantic import BaseModel
 from pathlib import Path
+from typing import Optional
 import shutil
 import os
 
@@ -21,6 +22,7 @@ class IngestResponse(BaseModel):
 async def ingest_file(
     file: UploadFile = File(...),
     dataset: str = Form("default"),
+    force: bool = Form(False),
 ):
     try:
         paths = load_paths()
@@ -30,43 +32,46 @@ async def ingest_file(
         with dest.open("wb") as f:
             shutil.copyfileobj(file.file, f)
 
-        res = pipeline.ingest(str(dest), dataset_name=dataset)
+        res = pipeline.ingest(str(dest), dataset_name=dataset, force=force)
         return IngestResponse(status=res.get("status", "ok"), count=res.get("count", 0))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/url", response_model=IngestResponse)
-async def ingest_url(url: str, dataset: str = "default"):
+async def ingest_url(url: str, dataset: str = "default", force: bool = False):
     try:
-        res = pipeline.ingest(url, dataset_name=dataset)
+        res = pipeline.ingest(url, dataset_name=dataset, force=force)
         return IngestResponse(status=res.get("status", "ok"), count=res.get("count", 0))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.post("/folder", response_model=IngestResponse)
-async def ingest_folder(path: str, dataset: str = "default"):
+async def ingest_folder(
+    path: str,
+    dataset: str = "default",
+    workers: Optional[int] = None,
+    force: bool = False,
+):
     """
     Ingest all files in a local folder (recursively).
 
     NOTE: 'path' is a server-side local path (e.g. 'data/hr_policies'),
     not a path on the client machine.
+
+    'workers' overrides settings.yaml ingestion.workers (1 = sequential).
+    Unchanged files are skipped unless 'force' is set.
     """
     try:
         if not os.path.isdir(path):
             raise HTTPException(status_code=400, detail=f"'{path}' is not a directory or does not exist")
 
-        total_chunks = 0
-        # Walk folder recursively and ingest each file
-        for root, dirs, files in os.walk(path):
-            for fname in files:
-                fpath = os.path.join(root, fname)
-                res = pipeline.ingest(fpath, dataset_name=dataset)
-                total_chunks += res.get("count", 0)
-
-        return IngestResponse(status="ok", count=total_chunks)
+        res = pipeline.ingest_folder(
+            path, dataset_name=dataset, workers=workers, force=force
+        )
+        return IngestResponse(status=res.get("status", "ok"), count=res.get("count", 0))
     except HTTPException:
         # re-raise FastAPI HTTP errors as-is
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
@@ -93,11 +93,17 @@
 #     except Exception as e:
 #         # In production you might not want to expose raw `str(e)` to clients
 #         raise HTTPException(status_code=500, detail="Internal server error")
-from typing import Any, List, Literal
+from typing import Any, AsyncIterator, Dict, List, Literal
+import json
+import logging
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from src.agent.graph_agent import build_basic_hr_agent
+from src.agent.graph_agent import build_basic_hr_agent, speculation_stats
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/query", tags=["query"])
 
@@ -118,9 +124,10 @@ compiled_graph: Any = build_basic_hr_agent().compile()
 
 
 @router.post("/", response_model=QueryResponse)
-def query_chatbot(req: QueryRequest) -> QueryResponse:
+async def query_chatbot(req: QueryRequest) -> QueryResponse:
+    # Async graph path: waiting on the LLM does not hold a threadpool thread
     try:
-        result = compiled_graph.invoke(
+        result = await compiled_graph.ainvoke(
             {
                 "question": req.question,
                 "user_id": req.user_id,
@@ -143,4 +150,71 @@ def query_chatbot(req: QueryRequest) -> QueryResponse:
             context_sources=sorted(set(sources)),
         )
     except Exception:
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_events(req: QueryRequest) -> AsyncIterator[str]:
+    """
+    SSE events for one question: `step` as each planner/retrieval step
+    completes, `sources` once the context is final, then the answer as
+    `token` events and a closing `done` (or `error`).
+    """
+    try:
+        state: Dict[str, Any] = {}
+        seen = 0
+        async for state in compiled_graph.astream(
+            {
+                "question": req.question,
+                "user_id": req.user_id,
+                "role": req.role,
+                "stream": True,
+            },
+            stream_mode="values",
+        ):
+            steps = state.get("steps") or []
+            for step in steps[seen:]:
+                yield _sse("step", {"step": step})
+            seen = len(steps)
+
+        context = state.get("context") or []
+        sources = [d.get("metadata", {}).get("source", "unknown") for d in context]
+        yield _sse("sources", {"context_sources": sorted(set(sources))})
+
+        answer_stream = state.get("answer_stream")
+        if answer_stream is None:
+            # Answered without generation (answer cache hit)
+            yield _sse("token", {"text": state.get("answer") or ""})
+        else:
+            async for token in answer_stream:
+                yield _sse("token", {"text": token})
+
+        yield _sse(
+            "done",
+            {"answer": state.get("answer") or "", "steps": state.get("steps") or []},
+        )
+    except Exception:
+        logger.exception("Streaming query failed")
+        yield _sse("error", {"detail": "Internal server error"})
+
+
+@router.post("/stream")
+async def query_chatbot_stream(req: QueryRequest) -> StreamingResponse:
+    """
+    Same as POST /query/ but streamed as Server-Sent Events, so the first
+    tokens arrive while the LLM is still generating.
+    """
+    return StreamingResponse(
+        _stream_events(req),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+def query_stats() -> Dict[str, Any]:
+    """Counters for tuning the agent (speculative KB retrieval)."""
+    return {"speculative_kb": speculation_stats.stats()}
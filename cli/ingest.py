@@ -1,7 +1,7 @@
 import argparse
 import logging
 import os
-from typing import List
+from typing import List, Optional
 
 from src.utils.config_loader import ensure_directories
 from src.ingestion.ingest_pipeline import IngestionPipeline
@@ -10,18 +10,22 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def ingest_path(pipeline: IngestionPipeline, path: str, dataset: str):
+def ingest_path(
+    pipeline: IngestionPipeline,
+    path: str,
+    dataset: str,
+    workers: Optional[int] = None,
+    force: bool = False,
+):
     if os.path.isdir(path):
-        # Walk folder recursively
-        for root, dirs, files in os.walk(path):
-            for fname in files:
-                fpath = os.path.join(root, fname)
-                logger.info("Ingesting file: %s", fpath)
-                res = pipeline.ingest(fpath, dataset_name=dataset)
-                logger.info("  -> %s", res)
+        # Walk folder recursively (parallel when workers > 1)
+        res = pipeline.ingest_folder(
+            path, dataset_name=dataset, workers=workers, force=force
+        )
+        logger.info("Folder %s -> %s", path, res)
     else:
         logger.info("Ingesting file: %s", path)
-        res = pipeline.ingest(path, dataset_name=dataset)
+        res = pipeline.ingest(path, dataset_name=dataset, force=force)
         logger.info("  -> %s", res)
 
 
@@ -33,11 +37,25 @@ def main():
         help="Local file path, folder path, or URL",
     )
     parser.add_argument("--dataset", default="it_assets", help="Dataset name")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Parallel loader processes for folder ingestion "
+        "(default: settings.yaml ingestion.workers; 1 = sequential)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-embed everything, even sources unchanged since the last run",
+    )
     args = parser.parse_args()
 
     ensure_directories()
     pipeline = IngestionPipeline()
-    ingest_path(pipeline, args.path, args.dataset)
+    ingest_path(
+        pipeline, args.path, args.dataset, workers=args.workers, force=args.force
+    )
 
 
 if __name__ == "__main__":
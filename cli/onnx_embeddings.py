@@ -0,0 +1,95 @@
+# cli/onnx_embeddings.py
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import random
+import sys
+from typing import List, Optional
+
+from src.embeddings.embedder import DEFAULT_MODEL_NAME, SentenceTransformerBackend
+from src.embeddings.onnx_backend import (
+    OnnxEmbeddingBackend,
+    benchmark,
+    default_model_dir,
+    export_onnx,
+    parity_check,
+)
+from src.utils.config_loader import load_model_config
+from src.utils.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
+
+
+def _sample_corpus(limit: int, seed: int = 0) -> List[str]:
+    """Chunk texts from the existing Chroma collection."""
+    from src.db.vector_store import VectorStore
+
+    docs = VectorStore().get_all_documents(limit=limit)
+    texts = [d["text"] for d in docs if d.get("text")]
+    random.Random(seed).shuffle(texts)
+    return texts
+
+
+def _load_queries(path: Optional[str], corpus: List[str], n: int) -> List[str]:
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            return [line.strip() for line in f if line.strip()][:n]
+    # No query log given: use the first words of corpus chunks as pseudo-queries
+    return [" ".join(t.split()[:12]) for t in corpus[:n]]
+
+
+def main(argv: list[str] | None = None) -> None:
+    emb_cfg = load_model_config().get("embeddings", {}) or {}
+    onnx_cfg = emb_cfg.get("onnx", {}) or {}
+    model_name = emb_cfg.get("model_name", DEFAULT_MODEL_NAME)
+    model_dir = onnx_cfg.get("model_dir") or default_model_dir(model_name)
+
+    parser = argparse.ArgumentParser(
+        description="Export / validate / benchmark the ONNX embedding backend."
+    )
+    parser.add_argument("--model-dir", default=model_dir, help="ONNX model directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="Export the embedding model to ONNX")
+    p_export.add_argument("--no-quantize", action="store_true", help="Skip int8 quantization")
+
+    for name, help_text in (
+        ("parity", "Compare ONNX vectors with sentence-transformers vectors"),
+        ("bench", "Query latency speedup + recall delta vs sentence-transformers"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("--fp32", action="store_true", help="Use the non-quantized graph")
+        p.add_argument("--corpus-size", type=int, default=2000)
+        p.add_argument("--queries", type=int, default=200)
+        p.add_argument("--queries-file", default=None, help="One query per line")
+        p.add_argument("--top-k", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    if args.command == "export":
+        paths = export_onnx(model_name, args.model_dir, quantize=not args.no_quantize)
+        print(json.dumps(paths, indent=2))
+        return
+
+    reference = SentenceTransformerBackend(model_name, device="cpu")
+    candidate = OnnxEmbeddingBackend(args.model_dir, quantized=not args.fp32)
+
+    corpus = _sample_corpus(args.corpus_size)
+    if not corpus:
+        print("No documents in the vector store; ingest data first.")
+        sys.exit(1)
+    queries = _load_queries(args.queries_file, corpus, args.queries)
+
+    if args.command == "parity":
+        report = parity_check(reference, candidate, corpus[: args.queries])
+    else:
+        report = benchmark(reference, candidate, corpus, queries, top_k=args.top_k)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
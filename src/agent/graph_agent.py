@@ -2,19 +2,27 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import asyncio
 import logging
 import os
 import json
+import re
+import threading
 
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
+from src.agent.tools.answer_cache_tool import answer_cache_from_config
 from src.agent.tools.knowledge_base_tool import KnowledgeBaseTool
 from src.agent.tools.local_directory_tool import LocalDirectoryTool
 from src.agent.tools.memory_tool import MemoryTool
 from src.agent.tools.rbac_tool import RBACFilterTool
 from src.retrieval.retriever import Retriever
 from src.llm.generator import LLMGenerator
+from src.utils.async_utils import run_blocking
+from src.utils.config_loader import load_model_config
 
 logger = logging.getLogger(__name__)
 
@@ -22,12 +30,111 @@ MAX_PLANNER_STEPS = 8  # or whatever limit you prefer
 
 PLANNER_ACTIONS = ["KB_SEARCH", "LOCAL_SEARCH", "ANSWER"]
 
+# model.yaml:agent.planner_mode
+#   "heuristic" = rules below, LLM only when they cannot decide
+#   "llm"       = LLM round-trip at every planning step
+#   "rules"     = never call the LLM (undecided -> KB_SEARCH)
+PLANNER_MODES = ("heuristic", "llm", "rules")
+
+# model.yaml:agent.topology
+#   "planner" = load_memory -> plan <-> kb_retrieve / local_retrieve -> answer
+#   "fanout"  = load_memory -> KB + local retrieval concurrently -> answer
+TOPOLOGIES = ("planner", "fanout")
+# Threads for fan-out local search and speculative KB retrieval
+DEFAULT_RETRIEVAL_WORKERS = 16
+
+
+class SpeculationStats:
+    """
+    Counters of speculative KB retrievals (started alongside an LLM planner
+    call): used when the planner chose KB_SEARCH, wasted otherwise.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.used = 0
+        self.wasted = 0
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def stats(self) -> Dict[str, Any]:
+        decided = self.used + self.wasted
+        return {
+            "started": self.started,
+            "used": self.used,
+            "wasted": self.wasted,
+            "waste_rate": (self.wasted / decided) if decided else 0.0,
+        }
+
+
+# Process-wide, shared by every graph built here (see GET /query/stats)
+speculation_stats = SpeculationStats()
+
+# Whole-message greetings/thanks: nothing to retrieve
+_SMALL_TALK_RE = re.compile(
+    r"^\W*(hi|hello|hey|thanks|thank you|thx|ok|okay|bye|goodbye|"
+    r"good (morning|afternoon|evening))\b\W*(\w+\W*){0,2}$",
+    re.IGNORECASE,
+)
+# Continuations that may be answerable from conversation memory alone
+_FOLLOW_UP_RE = re.compile(
+    r"^\W*(and|also|so|then|what about|how about)\b"
+    r"|\b(it|that|this|those|these|them|they|above|previous)\b",
+    re.IGNORECASE,
+)
+
+
+def heuristic_plan(
+    question: str,
+    steps: List[str],
+    has_context: bool,
+    has_history: bool,
+) -> Optional[str]:
+    """
+    Deterministic planner following the LLM planner's own guidelines
+    (KB first, local search if KB found nothing, then answer). Returns None
+    for ambiguous cases: a possible follow-up before any retrieval.
+    """
+    if has_context:
+        return "ANSWER"
+    if "kb_retrieve" not in steps:
+        if _SMALL_TALK_RE.match(question or ""):
+            return "ANSWER"
+        if has_history and _FOLLOW_UP_RE.search(question or ""):
+            return None
+        return "KB_SEARCH"
+    if "local_retrieve" not in steps:
+        return "LOCAL_SEARCH"
+    return "ANSWER"
+
+
+def merge_docs(*doc_lists: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Concatenate retrieval results, dropping docs with the same source and
+    text as an earlier one.
+    """
+    seen = set()
+    merged: List[Dict[str, Any]] = []
+    for docs in doc_lists:
+        for d in docs or []:
+            key = ((d.get("metadata") or {}).get("source"), d.get("text", ""))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(d)
+    return merged
+
 
 def build_basic_hr_agent() -> StateGraph:
     """
     Advanced HR/IT-assets RAG agent with:
       - Conversation + user memory
-      - LLM-based planner (KB vs Local vs Answer)
+      - Semantic answer cache for near-duplicate questions (optional)
+      - LLM-based planner (KB vs Local vs Answer), or a fan-out topology
+        running KB and local search concurrently (model.yaml:agent.topology)
       - RBAC filtering of retrieved docs
     """
 
@@ -38,65 +145,175 @@ def build_basic_hr_agent() -> StateGraph:
     memory_tool = MemoryTool()
     rbac_tool = RBACFilterTool()
 
+    agent_cfg = load_model_config().get("agent", {}) or {}
+    planner_mode = str(agent_cfg.get("planner_mode", "heuristic")).lower()
+    if planner_mode not in PLANNER_MODES:
+        logger.warning("Unknown agent.planner_mode %r; using 'heuristic'.", planner_mode)
+        planner_mode = "heuristic"
+    topology = str(agent_cfg.get("topology", "planner")).lower()
+    if topology not in TOPOLOGIES:
+        logger.warning("Unknown agent.topology %r; using 'planner'.", topology)
+        topology = "planner"
+
     # Wrap Retriever in KnowledgeBaseTool
-    def kb_retrieve_fn(query: str, top_k: int = 5):
-        docs = base_retriever.retrieve(query)
-        if top_k and len(docs) > top_k:
-            docs = docs[:top_k]
-        return docs
+    def kb_retrieve_fn(query: str, top_k: int = 5, **filters):
+        return base_retriever.retrieve(query, top_k=top_k, **filters)
 
     kb_tool = KnowledgeBaseTool(
         retriever=kb_retrieve_fn,
         top_k=base_retriever.top_k,
     )
 
+    # Near-duplicate questions skip planning, retrieval and generation
+    # (model.yaml:answer_cache); reuses the retriever's cached query embedder
+    answer_cache = answer_cache_from_config(
+        base_retriever.embedder.embed_query,
+        base_retriever.store.index_version,
+    )
+
     local_tool = LocalDirectoryTool(
         local_dir=os.getenv("HR_LOCAL_DOCS_DIR", "data/hr_local"),
         top_k=5,
     )
 
+    # Planner topology: the KB search the planner LLM will most likely ask
+    # for starts alongside that call (model.yaml:agent.speculative_kb)
+    speculative_kb = topology == "planner" and bool(agent_cfg.get("speculative_kb", True))
+
+    # Fan-out local search and speculative KB searches run here while the
+    # request thread does the rest
+    retrieval_pool = None
+    if topology == "fanout" or speculative_kb:
+        retrieval_pool = ThreadPoolExecutor(
+            max_workers=int(agent_cfg.get("retrieval_workers", DEFAULT_RETRIEVAL_WORKERS)),
+            thread_name_prefix="agent-retrieve",
+        )
+
+    def kb_search(question: str, user_id: str, role: str) -> Tuple[List[Dict[str, Any]], Dict]:
+        """
+        RBAC-filtered KB results, plus the retrieval cache status.
+        """
+        # RBAC is pushed down into retrieval so top_k counts only visible
+        # docs; filter_docs stays as the final check.
+        cache_info: Dict[str, Any] = {}
+        docs = kb_tool.run(
+            question,
+            where=rbac_tool.where_filter(user_id=user_id, role=role),
+            doc_filter=rbac_tool.metadata_filter(user_id=user_id, role=role),
+            cache_info=cache_info,
+        )
+        return rbac_tool.filter_docs(docs, user_id=user_id, role=role) or [], cache_info
+
+    def local_search(question: str, user_id: str, role: str) -> List[Dict[str, Any]]:
+        docs = local_tool.run(question)
+        return rbac_tool.filter_docs(docs, user_id=user_id, role=role) or []
+
+    async def kb_search_async(
+        question: str, user_id: str, role: str
+    ) -> Tuple[List[Dict[str, Any]], Dict]:
+        cache_info: Dict[str, Any] = {}
+        docs = await kb_tool.run_async(
+            question,
+            where=rbac_tool.where_filter(user_id=user_id, role=role),
+            doc_filter=rbac_tool.metadata_filter(user_id=user_id, role=role),
+            cache_info=cache_info,
+        )
+        docs = await rbac_tool.filter_docs_async(docs, user_id=user_id, role=role)
+        return docs or [], cache_info
+
+    async def local_search_async(question: str, user_id: str, role: str) -> List[Dict[str, Any]]:
+        docs = await local_tool.run_async(question)
+        return await rbac_tool.filter_docs_async(docs, user_id=user_id, role=role) or []
+
+    def cache_step(cache_info: Dict[str, Any]) -> Optional[str]:
+        if cache_info.get("status") not in ("hit", "miss"):
+            return None
+        return (
+            f"retrieval_cache:{cache_info['status']}"
+            f"(hits={cache_info['hits']},misses={cache_info['misses']})"
+        )
+
     # ---------------------- Nodes ---------------------- #
+    # Each node has an async twin (a-prefixed) used by graph.ainvoke() /
+    # astream(): LLM calls await the async clients, and blocking retrieval,
+    # embedding and file work goes to the bounded executor (async_utils).
 
     def load_memory_node(state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Load recent conversation history and user profile into state.
         """
-        user_id = state.get("user_id", "anonymous")
+        mem = memory_tool.load(user_id=state.get("user_id", "anonymous"), limit=10)
+        return set_memory(state, mem)
+
+    async def aload_memory_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        mem = await memory_tool.load_async(user_id=state.get("user_id", "anonymous"), limit=10)
+        return set_memory(state, mem)
+
+    def set_memory(state: Dict[str, Any], mem: Dict[str, Any]) -> Dict[str, Any]:
         steps = state.get("steps", [])
         steps.append("load_memory")
 
-        mem = memory_tool.load(user_id=user_id, limit=10)
         state["conversation_history"] = mem.get("conversation_history", [])
         state["user_profile"] = mem.get("user_profile", {})
         state["steps"] = steps
         return state
 
-    def planner_node(state: Dict[str, Any]) -> Dict[str, Any]:
+    def answer_cache_node(state: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Decide next action: KB_SEARCH, LOCAL_SEARCH, or ANSWER.
-        Includes a max-iteration guard to prevent infinite loops.
+        Serve a cached answer to a near-duplicate question, if any.
+        Follow-ups depend on the conversation so far, not just their own
+        wording: they neither read nor populate the cache.
         """
         question = state.get("question", "")
+        user_id = state.get("user_id", "")
         role = state.get("role", "")
-        steps = state.get("steps", [])
-        context = state.get("context") or []
+        steps: List[str] = state.get("steps", [])
 
-        # ---- MAX ITERATION GUARD ----
-        planner_calls = state.get("planner_calls", 0)
-        if planner_calls >= MAX_PLANNER_STEPS:
-            # We've already planned too many times; stop looping.
-            steps.append(f"max_planner_steps_reached:{planner_calls}")
-
-            # Fallback behavior:
-            # - If we have some context, try to answer anyway.
-            # - If no context at all, still route to ANSWER (the RAG prompt
-            #   will see "No context." and say it doesn't know).
-            state["next_action"] = "ANSWER"  # route_from_planner -> generate_answer
+        if state.get("conversation_history") and _FOLLOW_UP_RE.search(question or ""):
+            steps.append("answer_cache:skip(follow_up)")
+            state["steps"] = steps
+            return state
+
+        try:
+            # Version read before retrieval: ingests racing with this turn
+            # invalidate the entry it stores
+            lookup = {
+                "vec": answer_cache.embed(question),
+                "scope": answer_cache.scope(
+                    user_id, rbac_tool.where_filter(user_id=user_id, role=role)
+                ),
+                "version": answer_cache.index_version.current(),
+            }
+            hit = answer_cache.lookup(lookup["vec"], lookup["scope"])
+        except Exception as e:
+            logger.warning("Answer cache lookup failed: %s", e)
+            steps.append("answer_cache:error")
             state["steps"] = steps
-            state["planner_calls"] = planner_calls
             return state
-        # ------------------------------
 
+        state["answer_cache_lookup"] = lookup
+        if hit is None:
+            steps.append("answer_cache:miss")
+        else:
+            steps.append(f"answer_cache:hit(similarity={hit['similarity']:.3f})")
+            state["answer"] = hit["answer"]
+            state["context"] = hit["context"]
+        state["steps"] = steps
+        return state
+
+    async def aanswer_cache_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        # Embedding the question and scanning the cache are CPU work
+        return await run_blocking(answer_cache_node, state)
+
+    def route_from_answer_cache(state: Dict[str, Any]) -> str:
+        return "save_memory" if state.get("answer") else "retrieve"
+
+    def planner_prompt(
+        question: str, role: str, steps: List[str], context: List[Any]
+    ) -> Dict[str, Any]:
+        """
+        generate_text() arguments for one planner decision.
+        """
         system_prompt = (
             "You are an orchestration agent for an IT/HR assistant. "
             "You must choose exactly ONE of: KB_SEARCH, LOCAL_SEARCH, ANSWER.\n\n"
@@ -117,21 +334,141 @@ def build_basic_hr_agent() -> StateGraph:
             "Choose: KB_SEARCH, LOCAL_SEARCH, or ANSWER."
         )
 
-        raw = generator.generate_text(
-            system_prompt=system_prompt,
-            user_content=user_content,
-            max_tokens=5,
-            temperature=0.0,
-        )
+        return {
+            "system_prompt": system_prompt,
+            "user_content": user_content,
+            "max_tokens": 5,
+            "temperature": 0.0,
+        }
 
+    def parse_plan(raw: Optional[str]) -> str:
         action = (raw or "").strip().upper()
         if action not in PLANNER_ACTIONS:
             action = "KB_SEARCH"
+        return action
+
+    def llm_plan(question: str, role: str, steps: List[str], context: List[Any]) -> str:
+        """
+        One LLM round-trip choosing KB_SEARCH, LOCAL_SEARCH or ANSWER.
+        """
+        return parse_plan(
+            generator.generate_text(**planner_prompt(question, role, steps, context))
+        )
+
+    async def allm_plan(question: str, role: str, steps: List[str], context: List[Any]) -> str:
+        return parse_plan(
+            await generator.agenerate_text(**planner_prompt(question, role, steps, context))
+        )
+
+    def planner_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Decide next action: KB_SEARCH, LOCAL_SEARCH, or ANSWER.
+        Includes a max-iteration guard to prevent infinite loops.
+        """
+        if planner_guard(state):
+            return state
+
+        # Rule-based fast path; the LLM only sees the ambiguous cases
+        action = rule_plan(state)
+        if action is not None:
+            return finish_plan(state, action, llm_used=False)
+
+        speculation = start_speculation(state)
+        action = llm_plan(
+            state.get("question", ""),
+            state.get("role", ""),
+            state.get("steps", []),
+            state.get("context") or [],
+        )
+        return finish_plan(state, action, llm_used=True, speculation=speculation)
+
+    async def aplanner_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        if planner_guard(state):
+            return state
 
-        planner_calls += 1
+        action = rule_plan(state)
+        if action is not None:
+            return finish_plan(state, action, llm_used=False)
+
+        speculation = start_speculation(state)
+        action = await allm_plan(
+            state.get("question", ""),
+            state.get("role", ""),
+            state.get("steps", []),
+            state.get("context") or [],
+        )
+        return finish_plan(state, action, llm_used=True, speculation=speculation)
+
+    def planner_guard(state: Dict[str, Any]) -> bool:
+        """
+        MAX ITERATION GUARD: True (with next_action set) once the planner
+        ran MAX_PLANNER_STEPS times.
+        """
+        planner_calls = state.get("planner_calls", 0)
+        if planner_calls < MAX_PLANNER_STEPS:
+            return False
+
+        # We've already planned too many times; stop looping.
+        steps = state.get("steps", [])
+        steps.append(f"max_planner_steps_reached:{planner_calls}")
+
+        # Fallback behavior:
+        # - If we have some context, try to answer anyway.
+        # - If no context at all, still route to ANSWER (the RAG prompt
+        #   will see "No context." and say it doesn't know).
+        state["next_action"] = "ANSWER"  # route_from_planner -> generate_answer
+        state["steps"] = steps
         state["planner_calls"] = planner_calls
+        return True
 
-        steps.append(f"plan:{action}")
+    def rule_plan(state: Dict[str, Any]) -> Optional[str]:
+        """
+        Action decided without the LLM, or None if it must be consulted.
+        """
+        if planner_mode == "llm":
+            return None
+        action = heuristic_plan(
+            state.get("question", ""),
+            state.get("steps", []),
+            has_context=bool(state.get("context")),
+            has_history=bool(state.get("conversation_history")),
+        )
+        if action is None and planner_mode == "rules":
+            action = "KB_SEARCH"
+        return action
+
+    def start_speculation(state: Dict[str, Any]) -> Optional[Future]:
+        # Only the first decision right after load_memory is speculated on
+        if not speculative_kb or state.get("planner_calls", 0) != 0:
+            return None
+        speculation_stats.record("started")
+        return retrieval_pool.submit(
+            kb_search, state.get("question", ""), state.get("user_id", ""), state.get("role", "")
+        )
+
+    def finish_plan(
+        state: Dict[str, Any],
+        action: str,
+        llm_used: bool,
+        speculation: Optional[Future] = None,
+    ) -> Dict[str, Any]:
+        steps = state.get("steps", [])
+        labels = [f"plan:{action}" if llm_used else f"plan:{action}(rule)"]
+        if llm_used:
+            state["planner_llm_calls"] = state.get("planner_llm_calls", 0) + 1
+
+        if speculation is not None:
+            if action == "KB_SEARCH":
+                # Consumed by kb_retrieve_node
+                state["speculative_kb"] = speculation
+            else:
+                # Result discarded (a started search runs to completion)
+                speculation.cancel()
+                speculation_stats.record("wasted")
+                labels.append("speculative_kb:wasted")
+
+        state["planner_calls"] = state.get("planner_calls", 0) + 1
+        steps.extend(labels)
         state["next_action"] = action
         state["steps"] = steps
         return state
@@ -148,14 +485,47 @@ def build_basic_hr_agent() -> StateGraph:
         """
         Retrieve from knowledge base + apply RBAC.
         """
-        question = state.get("question", "")
-        user_id = state.get("user_id", "")
-        role = state.get("role", "")
         steps: List[str] = state.get("steps", [])
         steps.append("kb_retrieve")
 
-        docs = kb_tool.run(question)
-        docs = rbac_tool.filter_docs(docs, user_id=user_id, role=role)
+        speculation: Optional[Future] = state.pop("speculative_kb", None)
+        result = None
+        if speculation is not None:
+            try:
+                result = speculation.result()
+                speculation_stats.record("used")
+                steps.append("speculative_kb:used")
+            except Exception as e:
+                logger.warning("Speculative KB retrieval failed; retrying: %s", e)
+        if result is None:
+            result = kb_search(state.get("question", ""), state.get("user_id", ""), state.get("role", ""))
+        return set_kb_context(state, *result)
+
+    async def akb_retrieve_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        steps: List[str] = state.get("steps", [])
+        steps.append("kb_retrieve")
+
+        speculation: Optional[Future] = state.pop("speculative_kb", None)
+        result = None
+        if speculation is not None:
+            try:
+                result = await asyncio.wrap_future(speculation)
+                speculation_stats.record("used")
+                steps.append("speculative_kb:used")
+            except Exception as e:
+                logger.warning("Speculative KB retrieval failed; retrying: %s", e)
+        if result is None:
+            result = await kb_search_async(
+                state.get("question", ""), state.get("user_id", ""), state.get("role", "")
+            )
+        return set_kb_context(state, *result)
+
+    def set_kb_context(
+        state: Dict[str, Any], docs: List[Dict[str, Any]], cache_info: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        steps: List[str] = state.get("steps", [])
+        if cache_step(cache_info):
+            steps.append(cache_step(cache_info))
 
         state["kb_docs"] = docs or []
         # Replace or extend context; here we overwrite KB context
@@ -167,24 +537,111 @@ def build_basic_hr_agent() -> StateGraph:
         """
         Retrieve from local directory + apply RBAC, then merge with context.
         """
-        question = state.get("question", "")
-        user_id = state.get("user_id", "")
-        role = state.get("role", "")
+        docs = local_search(state.get("question", ""), state.get("user_id", ""), state.get("role", ""))
+        return set_local_context(state, docs)
+
+    async def alocal_retrieve_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        docs = await local_search_async(
+            state.get("question", ""), state.get("user_id", ""), state.get("role", "")
+        )
+        return set_local_context(state, docs)
+
+    def set_local_context(state: Dict[str, Any], docs: List[Dict[str, Any]]) -> Dict[str, Any]:
         steps: List[str] = state.get("steps", [])
         steps.append("local_retrieve")
 
-        docs = local_tool.run(question)
-        docs = rbac_tool.filter_docs(docs, user_id=user_id, role=role)
-
         state["local_docs"] = docs or []
         prev_ctx = state.get("context") or []
         state["context"] = prev_ctx + (docs or [])
         state["steps"] = steps
         return state
 
+    def fanout_retrieve_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Retrieve from knowledge base and local directory concurrently
+        (both RBAC-filtered), merge and dedupe, then go straight to answering.
+        """
+        question = state.get("question", "")
+        user_id = state.get("user_id", "")
+        role = state.get("role", "")
+
+        local_future = retrieval_pool.submit(local_search, question, user_id, role)
+        kb_docs, cache_info = kb_search(question, user_id, role)
+        local_docs = local_future.result()
+        return set_fanout_context(state, kb_docs, cache_info, local_docs)
+
+    async def afanout_retrieve_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        question = state.get("question", "")
+        user_id = state.get("user_id", "")
+        role = state.get("role", "")
+
+        (kb_docs, cache_info), local_docs = await asyncio.gather(
+            kb_search_async(question, user_id, role),
+            local_search_async(question, user_id, role),
+        )
+        return set_fanout_context(state, kb_docs, cache_info, local_docs)
+
+    def set_fanout_context(
+        state: Dict[str, Any],
+        kb_docs: List[Dict[str, Any]],
+        cache_info: Dict[str, Any],
+        local_docs: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        steps: List[str] = state.get("steps", [])
+        steps.append("fanout_retrieve")
+        if cache_step(cache_info):
+            steps.append(cache_step(cache_info))
+
+        state["kb_docs"] = kb_docs
+        state["local_docs"] = local_docs
+        state["context"] = merge_docs(kb_docs, local_docs)
+        state["steps"] = steps
+        return state
+
     def generate_answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
         """
         Use combined context + memory to generate final answer.
+
+        With state["stream"] set, no answer is generated here: the node puts
+        an iterator of answer tokens in state["answer_stream"] and the graph
+        ends. Exhausting the iterator fills state["answer"], caches it and
+        saves memory (the save_memory node is skipped).
+        """
+        question, context_docs = answer_context(state)
+        if state.get("stream"):
+            state["answer_stream"] = stream_answer_tokens(state, question, context_docs)
+            return state
+
+        answer = generator.generate_answer(
+            question=question,
+            context_docs=context_docs,
+            hr_domain="it_assets",
+        )
+
+        state["answer"] = answer
+        cache_answer(state, answer, context_docs)
+        return state
+
+    async def agenerate_answer_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        # Streaming: state["answer_stream"] is an async iterator here
+        question, context_docs = answer_context(state)
+        if state.get("stream"):
+            state["answer_stream"] = astream_answer_tokens(state, question, context_docs)
+            return state
+
+        answer = await generator.agenerate_answer(
+            question=question,
+            context_docs=context_docs,
+            hr_domain="it_assets",
+        )
+
+        state["answer"] = answer
+        cache_answer(state, answer, context_docs)
+        return state
+
+    def answer_context(state: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        (question, context docs incl. synthetic memory/profile docs).
         """
         question = state.get("question", "")
         steps: List[str] = state.get("steps", [])
@@ -217,15 +674,60 @@ def build_basic_hr_agent() -> StateGraph:
                 }
             )
 
-        answer = generator.generate_answer(
+        state["steps"] = steps
+        return question, context_docs
+
+    def stream_answer_tokens(
+        state: Dict[str, Any], question: str, context_docs: List[Dict[str, Any]]
+    ) -> Iterator[str]:
+        parts: List[str] = []
+        for token in generator.stream_answer(
             question=question,
             context_docs=context_docs,
             hr_domain="it_assets",
-        )
+        ):
+            parts.append(token)
+            yield token
+
+        # Only reached once the whole answer was streamed
+        state.pop("answer_stream", None)
+        state["answer"] = "".join(parts)
+        cache_answer(state, state["answer"], context_docs)
+        save_memory_node(state)
+
+    async def astream_answer_tokens(
+        state: Dict[str, Any], question: str, context_docs: List[Dict[str, Any]]
+    ) -> AsyncIterator[str]:
+        parts: List[str] = []
+        async for token in generator.astream_answer(
+            question=question,
+            context_docs=context_docs,
+            hr_domain="it_assets",
+        ):
+            parts.append(token)
+            yield token
+
+        state.pop("answer_stream", None)
+        state["answer"] = "".join(parts)
+        cache_answer(state, state["answer"], context_docs)
+        await asave_memory_node(state)
+
+    def cache_answer(
+        state: Dict[str, Any], answer: str, context_docs: List[Dict[str, Any]]
+    ) -> None:
+        lookup = state.get("answer_cache_lookup")
+        if answer_cache is not None and lookup:
+            answer_cache.store(
+                lookup["vec"],
+                lookup["scope"],
+                lookup["version"],
+                answer=answer,
+                context=context_docs,
+            )
 
-        state["answer"] = answer
-        state["steps"] = steps
-        return state
+    def route_from_generate_answer(state: Dict[str, Any]) -> str:
+        # Streaming: memory is saved once the answer stream is exhausted
+        return "end" if state.get("answer_stream") is not None else "save_memory"
 
     def save_memory_node(state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -244,33 +746,71 @@ def build_basic_hr_agent() -> StateGraph:
         state["steps"] = steps
         return state
 
+    async def asave_memory_node(state: Dict[str, Any]) -> Dict[str, Any]:
+        user_id = state.get("user_id", "anonymous")
+        question = state.get("question", "")
+        answer = state.get("answer", "")
+
+        steps: List[str] = state.get("steps", [])
+        steps.append("save_memory")
+
+        if question and answer:
+            await memory_tool.save_turn_async(user_id=user_id, question=question, answer=answer)
+
+        state["steps"] = steps
+        return state
+
+    def node(func, afunc) -> RunnableLambda:
+        # invoke()/stream() run func, ainvoke()/astream() run afunc
+        return RunnableLambda(func, afunc=afunc, name=func.__name__)
+
     # ------------------- Build graph ------------------- #
 
     graph = StateGraph(dict)
 
-    graph.add_node("load_memory", load_memory_node)
-    graph.add_node("plan", planner_node)
-    graph.add_node("kb_retrieve", kb_retrieve_node)
-    graph.add_node("local_retrieve", local_retrieve_node)
-    graph.add_node("generate_answer", generate_answer_node)
-    graph.add_node("save_memory", save_memory_node)
+    graph.add_node("load_memory", node(load_memory_node, aload_memory_node))
+    if answer_cache is not None:
+        graph.add_node("answer_cache", node(answer_cache_node, aanswer_cache_node))
+    graph.add_node("generate_answer", node(generate_answer_node, agenerate_answer_node))
+    graph.add_node("save_memory", node(save_memory_node, asave_memory_node))
+
+    if topology == "fanout":
+        graph.add_node("fanout_retrieve", node(fanout_retrieve_node, afanout_retrieve_node))
+        retrieve_entry = "fanout_retrieve"
+        graph.add_edge("fanout_retrieve", "generate_answer")
+    else:
+        graph.add_node("plan", node(planner_node, aplanner_node))
+        graph.add_node("kb_retrieve", node(kb_retrieve_node, akb_retrieve_node))
+        graph.add_node("local_retrieve", node(local_retrieve_node, alocal_retrieve_node))
+        retrieve_entry = "plan"
+        graph.add_conditional_edges(
+            "plan",
+            route_from_planner,
+            {
+                "kb_retrieve": "kb_retrieve",
+                "local_retrieve": "local_retrieve",
+                "generate_answer": "generate_answer",
+            },
+        )
+        graph.add_edge("kb_retrieve", "plan")
+        graph.add_edge("local_retrieve", "plan")
 
     graph.set_entry_point("load_memory")
-    graph.add_edge("load_memory", "plan")
+    if answer_cache is not None:
+        graph.add_edge("load_memory", "answer_cache")
+        graph.add_conditional_edges(
+            "answer_cache",
+            route_from_answer_cache,
+            {"retrieve": retrieve_entry, "save_memory": "save_memory"},
+        )
+    else:
+        graph.add_edge("load_memory", retrieve_entry)
 
     graph.add_conditional_edges(
-        "plan",
-        route_from_planner,
-        {
-            "kb_retrieve": "kb_retrieve",
-            "local_retrieve": "local_retrieve",
-            "generate_answer": "generate_answer",
-        },
+        "generate_answer",
+        route_from_generate_answer,
+        {"save_memory": "save_memory", "end": END},
     )
-
-    graph.add_edge("kb_retrieve", "plan")
-    graph.add_edge("local_retrieve", "plan")
-    graph.add_edge("generate_answer", "save_memory")
     graph.add_edge("save_memory", END)
 
     return graph
\ No newline at end of file
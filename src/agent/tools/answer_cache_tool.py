@@ -0,0 +1,202 @@
+# src/agent/tools/answer_cache_tool.py
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import json
+import logging
+import threading
+import time
+
+import numpy as np
+
+from src.db.index_version import IndexVersion
+from src.utils.config_loader import load_model_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIMILARITY_THRESHOLD = 0.95
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_TTL_SECONDS = 3600.0
+
+# Synthetic context docs added by generate_answer (not ingested sources)
+_SYNTHETIC_SOURCES = ("conversation_memory", "user_profile")
+# Docs read straight from disk by LocalDirectoryTool: IndexVersion does not
+# see them change, so answers built from them are never cached
+_UNTRACKED_SOURCE_TYPES = ("local_file",)
+
+
+class AnswerCacheTool:
+    """
+    Semantic cache of final answers, used to skip planning, retrieval and
+    generation for near-duplicate questions.
+
+    Entries are grouped by scope (RBAC visibility, optionally the user) and
+    matched by cosine similarity of the question embeddings. Each entry
+    remembers the index version it was answered at and the sources of its
+    context docs: it is dropped as soon as one of those sources is
+    re-ingested or deleted (IndexVersion.sources_changed_since), and after
+    `ttl_seconds` in any case. Answers that used local directory files,
+    which IndexVersion does not track, are not cached at all.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[str], Sequence[float]],
+        index_version: IndexVersion,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        share_across_users: bool = False,
+    ):
+        self.embed_fn = embed_fn
+        self.index_version = index_version
+        self.similarity_threshold = float(similarity_threshold)
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds or 0)
+        self.share_across_users = share_across_users
+        self.hits = 0
+        self.misses = 0
+        self.invalidated = 0
+        self._lock = threading.Lock()
+        # scope -> entry id -> entry; one LRU order across all scopes
+        self._scopes: Dict[str, "OrderedDict[int, Dict[str, Any]]"] = {}
+        self._lru: "OrderedDict[int, str]" = OrderedDict()
+        self._next_id = 0
+
+    def scope(self, user_id: str, visibility: Optional[Dict[str, Any]]) -> str:
+        """
+        Cache partition for a user whose RBAC Chroma filter is `visibility`.
+        Answers are also built from the asker's conversation memory and
+        profile, so they are per user unless share_across_users is set.
+        """
+        scope = json.dumps(visibility, sort_keys=True, default=str) if visibility else "*"
+        return scope if self.share_across_users else f"{user_id}|{scope}"
+
+    def embed(self, question: str) -> np.ndarray:
+        vec = np.asarray(self.embed_fn(question), dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm > 0 else vec
+
+    def lookup(self, question_vec: np.ndarray, scope: str) -> Optional[Dict[str, Any]]:
+        """
+        Best still-valid entry of `scope` above the similarity threshold:
+        {"answer", "context", "similarity"}, or None.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = self._scopes.get(scope) or {}
+            stale = [
+                eid
+                for eid, e in entries.items()
+                if (self.ttl_seconds > 0 and now - e["at"] > self.ttl_seconds)
+                or self.index_version.sources_changed_since(e["version"], e["sources"])
+            ]
+            for eid in stale:
+                self._drop(eid)
+            self.invalidated += len(stale)
+
+            best_id, best_sim = None, -1.0
+            if entries:
+                ids = list(entries)
+                sims = np.stack([entries[i]["vec"] for i in ids]) @ question_vec
+                j = int(np.argmax(sims))
+                best_id, best_sim = ids[j], float(sims[j])
+
+            if best_id is None or best_sim < self.similarity_threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._lru.move_to_end(best_id)
+            entry = entries[best_id]
+            return {
+                "answer": entry["answer"],
+                "context": [dict(d, metadata=dict(d["metadata"])) for d in entry["context"]],
+                "similarity": best_sim,
+            }
+
+    def store(
+        self,
+        question_vec: np.ndarray,
+        scope: str,
+        version: int,
+        answer: str,
+        context: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Cache `answer` for the question. `version` must be the index version
+        read before retrieval, so writes that raced with it invalidate the
+        entry. Answers without retrieved context, or with context read from
+        local directory files, are not cached.
+        """
+        if any(
+            (d.get("metadata") or {}).get("source_type") in _UNTRACKED_SOURCE_TYPES
+            for d in context
+        ):
+            return
+        docs = [
+            {"text": d.get("text", ""), "metadata": dict(d.get("metadata") or {})}
+            for d in context
+            if (d.get("metadata") or {}).get("source") not in _SYNTHETIC_SOURCES
+        ]
+        if not answer or not docs:
+            return
+        sources = sorted({str(d["metadata"].get("source", "unknown")) for d in docs})
+        with self._lock:
+            eid = self._next_id
+            self._next_id += 1
+            self._scopes.setdefault(scope, OrderedDict())[eid] = {
+                "vec": question_vec,
+                "answer": answer,
+                "context": docs,
+                "sources": sources,
+                "version": version,
+                "at": time.monotonic(),
+            }
+            self._lru[eid] = scope
+            while len(self._lru) > self.max_entries:
+                self._drop(next(iter(self._lru)))
+
+    def _drop(self, eid: int) -> None:
+        scope = self._lru.pop(eid, None)
+        if scope is None:
+            return
+        entries = self._scopes.get(scope)
+        if entries is not None:
+            entries.pop(eid, None)
+            if not entries:
+                del self._scopes[scope]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "invalidated": self.invalidated,
+            "entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "similarity_threshold": self.similarity_threshold,
+        }
+
+
+def answer_cache_from_config(
+    embed_fn: Callable[[str], Sequence[float]],
+    index_version: IndexVersion,
+) -> Optional[AnswerCacheTool]:
+    """
+    AnswerCacheTool configured from model.yaml:answer_cache, or None if
+    disabled.
+    """
+    cfg = load_model_config().get("answer_cache", {}) or {}
+    if not cfg.get("enabled", False):
+        return None
+    return AnswerCacheTool(
+        embed_fn,
+        index_version,
+        similarity_threshold=cfg.get("similarity_threshold", DEFAULT_SIMILARITY_THRESHOLD),
+        max_entries=cfg.get("max_entries", DEFAULT_MAX_ENTRIES),
+        ttl_seconds=cfg.get("ttl_seconds", DEFAULT_TTL_SECONDS),
+        share_across_users=bool(cfg.get("share_across_users", False)),
+    )
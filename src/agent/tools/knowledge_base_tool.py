@@ -19,20 +19,22 @@ from __future__ import annotations
 from typing import Any, Callable, Dict, List, Optional, Protocol, Union
 import logging
 
+from src.utils.async_utils import run_blocking
+
 logger = logging.getLogger(__name__)
 
 
 class _CallableRetriever(Protocol):
     """Callable retriever: retriever(query, top_k=5) -> List[docs]."""
 
-    def __call__(self, query: str, top_k: int = 5) -> List[Any]:
+    def __call__(self, query: str, top_k: int = 5, **kwargs: Any) -> List[Any]:
         ...
 
 
 class _ObjectRetriever(Protocol):
     """Object retriever: retriever.retrieve(query, top_k=5) -> List[docs]."""
 
-    def retrieve(self, query: str, top_k: int = 5) -> List[Any]:
+    def retrieve(self, query: str, top_k: int = 5, **kwargs: Any) -> List[Any]:
         ...
 
 
@@ -61,7 +63,12 @@ class KnowledgeBaseTool:
 
     # ------------- Public API -------------
 
-    def run(self, query: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+    def run(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        **retriever_kwargs: Any,
+    ) -> List[Dict[str, Any]]:
         """
         Query the knowledge base and return normalized docs:
         [
@@ -71,11 +78,14 @@ class KnowledgeBaseTool:
           },
           ...
         ]
+
+        Extra keyword arguments (e.g. RBAC `where` / `doc_filter`) are passed
+        through to the retriever.
         """
         k = top_k or self.top_k
 
         try:
-            raw_docs = self._call_retriever(query, k) or []
+            raw_docs = self._call_retriever(query, k, **retriever_kwargs) or []
         except Exception as e:
             logger.exception("KnowledgeBaseTool retrieval failed: %s", e)
             return []
@@ -90,9 +100,21 @@ class KnowledgeBaseTool:
 
         return docs
 
+    async def run_async(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        **retriever_kwargs: Any,
+    ) -> List[Dict[str, Any]]:
+        """
+        run() for coroutines. Retrieval is CPU-bound (query embedding, BM25,
+        Chroma), so it runs on the shared blocking executor.
+        """
+        return await run_blocking(self.run, query, top_k, **retriever_kwargs)
+
     # ------------- Internal helpers -------------
 
-    def _call_retriever(self, query: str, top_k: int) -> List[Any]:
+    def _call_retriever(self, query: str, top_k: int, **kwargs: Any) -> List[Any]:
         """
         Handle both callable retrievers and objects with .retrieve().
         """
@@ -100,11 +122,11 @@ class KnowledgeBaseTool:
         if hasattr(self.retriever, "retrieve") and callable(
             getattr(self.retriever, "retrieve")
         ):
-            return self.retriever.retrieve(query=query, top_k=top_k)
+            return self.retriever.retrieve(query=query, top_k=top_k, **kwargs)
 
         # Plain callable
         if callable(self.retriever):
-            return self.retriever(query, top_k)
+            return self.retriever(query, top_k, **kwargs)
 
         raise TypeError(
             "KnowledgeBaseTool.retriever must be callable or have a .retrieve() method."
@@ -5,6 +5,8 @@ import logging
 from pathlib import Path
 import re
 
+from src.utils.async_utils import run_blocking
+
 logger = logging.getLogger(__name__)
 
 
@@ -171,6 +173,13 @@ class LocalDirectoryTool:
 
     # ---------- helpers ---------- #
 
+    async def run_async(self, query: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        run() for coroutines; the directory scan runs on the shared
+        blocking executor.
+        """
+        return await run_blocking(self.run, query, top_k)
+
     def _iter_files(self) -> List[Path]:
         """Yield files under local_dir with allowed extensions."""
         paths: List[Path] = []
@@ -8,6 +8,8 @@ import json
 import logging
 from datetime import datetime
 
+from src.utils.async_utils import run_blocking
+
 logger = logging.getLogger(__name__)
 
 
@@ -89,4 +91,15 @@ class MemoryTool:
         self.store.append_turn(user_id, question, answer)
 
     def update_profile(self, user_id: str, updates: Dict[str, Any]):
-        self.store.update_profile(user_id, updates)
\ No newline at end of file
+        self.store.update_profile(user_id, updates)
+
+    # Async variants: file I/O runs on the shared blocking executor
+
+    async def load_async(self, user_id: str, limit: int = 10) -> Dict[str, Any]:
+        return await run_blocking(self.load, user_id, limit)
+
+    async def save_turn_async(self, user_id: str, question: str, answer: str):
+        await run_blocking(self.save_turn, user_id, question, answer)
+
+    async def update_profile_async(self, user_id: str, updates: Dict[str, Any]):
+        await run_blocking(self.update_profile, user_id, updates)
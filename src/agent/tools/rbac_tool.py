@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import logging
 
+from src.utils.async_utils import run_blocking
+
 logger = logging.getLogger(__name__)
 
+# filter_docs_async: below this many docs, offloading costs more than filtering
+ASYNC_INLINE_DOCS = 256
+
 
 class RBACFilterTool:
     """
@@ -15,6 +20,11 @@ class RBACFilterTool:
     Expected metadata fields (you can adjust):
       - visibility: "public" | "hr" | "admin" | "private"
       - owner_user_id: str (for private docs)
+
+    The same rules are available in two pushdown forms so retrieval only
+    returns visible candidates: where_filter() (Chroma `where` clause) and
+    metadata_filter() (predicate for BM25 scoring). filter_docs() remains
+    the final check.
     """
 
     def __init__(self):
@@ -46,35 +56,93 @@ class RBACFilterTool:
             )
         return allowed
 
-    def _is_allowed(
+    async def filter_docs_async(
         self,
-        visibility: str,
-        owner_id: str | None,
+        docs: List[Dict[str, Any]],
+        *,
         user_id: str,
         role: str,
-    ) -> bool:
-        role = role.lower()
+    ) -> List[Dict[str, Any]]:
+        """
+        filter_docs() for coroutines. Small lists are filtered inline; large
+        candidate lists go to the shared blocking executor.
+        """
+        if len(docs) <= ASYNC_INLINE_DOCS:
+            return self.filter_docs(docs, user_id=user_id, role=role)
+        return await run_blocking(self.filter_docs, docs, user_id=user_id, role=role)
+
+    def where_filter(self, *, user_id: str, role: str) -> Optional[Dict[str, Any]]:
+        """
+        Chroma `where` clause matching exactly the docs _is_allowed accepts
+        (None = no restriction). The clause relies on `visibility` being
+        stored lowercase and never missing: ingestion normalizes it
+        (IngestionPipeline._infer_rbac_metadata) and VectorStore migrates
+        chunks stored before that (normalize_visibility).
+        """
+        visibilities, own_private = self._visibility_rules(role)
+        if visibilities is None:
+            return None
+
+        clauses: List[Dict[str, Any]] = []
+        if len(visibilities) == 1:
+            clauses.append({"visibility": visibilities[0]})
+        else:
+            clauses.append({"visibility": {"$in": list(visibilities)}})
+        if own_private and user_id:
+            clauses.append(
+                {"$and": [{"visibility": "private"}, {"owner_user_id": user_id}]}
+            )
+        return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+    def metadata_filter(
+        self, *, user_id: str, role: str
+    ) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """
+        Predicate over doc metadata implementing _is_allowed
+        (None = no restriction).
+        """
+        if self._visibility_rules(role)[0] is None:
+            return None
+
+        def allowed(meta: Dict[str, Any]) -> bool:
+            meta = meta or {}
+            visibility = (meta.get("visibility") or "public").lower()
+            return self._is_allowed(visibility, meta.get("owner_user_id"), user_id, role)
+
+        return allowed
+
+    @staticmethod
+    def _visibility_rules(role: str) -> Tuple[Optional[Tuple[str, ...]], bool]:
+        """
+        (visibilities the role always sees, or None for everything;
+         whether it also sees its own private docs)
+        """
+        role = (role or "").lower()
 
         # Admin: everything
         if role == "admin":
-            return True
+            return None, False
 
-        # HR: all public + hr docs (and maybe private if policy says so)
+        # HR: all public + hr docs, and all private docs
+        # (depends on your policy)
         if role == "hr":
-            if visibility in ("public", "hr"):
-                return True
-            # Optionally, HR can see all private (depends on your policy)
-            if visibility == "private":
-                return True
-            return False
+            return ("public", "hr", "private"), False
 
         # Employee: only public docs + their own private docs
         if role == "employee":
-            if visibility == "public":
-                return True
-            if visibility == "private" and owner_id == user_id:
-                return True
-            return False
+            return ("public",), True
 
         # Unknown role: safest is public only
-        return visibility == "public"
\ No newline at end of file
+        return ("public",), False
+
+    def _is_allowed(
+        self,
+        visibility: str,
+        owner_id: str | None,
+        user_id: str,
+        role: str,
+    ) -> bool:
+        visibilities, own_private = self._visibility_rules(role)
+        if visibilities is None or visibility in visibilities:
+            return True
+        return own_private and visibility == "private" and owner_id == user_id
\ No newline at end of file
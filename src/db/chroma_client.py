@@ -17,6 +17,18 @@ class ChromaClient:
             cls._client = chromadb.PersistentClient(path=db_dir)
         return cls._client
 
+    @classmethod
+    def get_max_batch_size(cls) -> Optional[int]:
+        """
+        Largest upsert/delete batch the client accepts (None if unknown,
+        e.g. on older chromadb versions).
+        """
+        client = cls.get_client()
+        try:
+            return int(client.get_max_batch_size())
+        except Exception:
+            return None
+
     @classmethod
     def get_collection(cls, name: str = "it_assets"):
         client = cls.get_client()
@@ -0,0 +1,112 @@
+from typing import Any, Dict, Iterable, Optional, Tuple
+from pathlib import Path
+import json
+import os
+import threading
+
+from src.utils.config_loader import load_paths
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, assume a single writer process
+    fcntl = None
+
+INDEX_VERSION_FILE = "index_version"
+SOURCE_VERSIONS_FILE = "source_versions.json"
+
+
+class IndexVersion:
+    """
+    Monotonic counter bumped on every write to the vector store, shared by
+    all processes using the same db_dir (stored in <db_dir>/index_version).
+
+    Caches key their entries on current(), so anything computed before an
+    ingest or delete is never served after it. current() only re-reads the
+    file when its stat changes.
+
+    Each bump also records the version at which every touched source last
+    changed (<db_dir>/source_versions.json), so caches can keep entries
+    whose sources were not re-ingested (see sources_changed_since()).
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = os.path.join(load_paths().get("db_dir", "data/chroma_db"), INDEX_VERSION_FILE)
+        self.path = Path(path)
+        self.sources_path = self.path.with_name(SOURCE_VERSIONS_FILE)
+        self._lock = threading.Lock()
+        self._stat: Optional[Tuple[int, int, int]] = None
+        self._value = 0
+        self._sources_stat: Optional[Tuple[int, int, int]] = None
+        self._sources: Dict[str, Any] = {}
+
+    def current(self) -> int:
+        key = _stat_key(self.path)
+        if key is None:
+            return 0
+        if key != self._stat:
+            value = self._read()
+            with self._lock:
+                self._stat, self._value = key, value
+        return self._value
+
+    def bump(self, sources: Optional[Iterable[str]] = None) -> int:
+        """
+        Increment the counter (atomically across processes); returns the new
+        value. `sources` are the sources touched by the write; None means
+        unknown, i.e. anything may have changed.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path.with_suffix(".lock"), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            value = self._read() + 1
+            data = self._read_sources()
+            if sources is None:
+                data["all"] = value
+            else:
+                data.setdefault("sources", {}).update({s: value for s in sources})
+            # Source versions first: whoever sees the new counter finds them
+            _write_atomic(self.sources_path, json.dumps(data, ensure_ascii=False))
+            _write_atomic(self.path, str(value))
+        return value
+
+    def sources_changed_since(self, version: int, sources: Iterable[str]) -> bool:
+        """True if any of `sources` was written after `version`."""
+        key = _stat_key(self.sources_path)
+        if key is not None and key != self._sources_stat:
+            data = self._read_sources()
+            with self._lock:
+                self._sources_stat, self._sources = key, data
+        data = self._sources
+        if data.get("all", 0) > version:
+            return True
+        changed = data.get("sources", {})
+        return any(changed.get(s, 0) > version for s in sources)
+
+    def _read(self) -> int:
+        try:
+            return int(self.path.read_text(encoding="utf-8").strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _read_sources(self) -> Dict[str, Any]:
+        try:
+            return json.loads(self.sources_path.read_text(encoding="utf-8")) or {}
+        except (FileNotFoundError, ValueError):
+            return {}
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int, int]]:
+    # Files are replaced on write, so the inode changes even within one mtime tick
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
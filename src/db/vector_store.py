@@ -51,12 +51,27 @@
 #         return results
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import logging
 from src.db.chroma_client import ChromaClient
+from src.db.index_version import IndexVersion
+
+logger = logging.getLogger(__name__)
+
+# Used when the Chroma client cannot report its own max batch size.
+DEFAULT_MAX_BATCH_SIZE = 5000
 
 
 class VectorStore:
     def __init__(self, collection_name: str = "it_assets"):
         self.collection = ChromaClient.get_collection(collection_name)
+        self.max_batch_size = ChromaClient.get_max_batch_size() or DEFAULT_MAX_BATCH_SIZE
+        # Bumped on every write so retrieval caches drop stale entries
+        self.index_version = IndexVersion()
+        # One-time migration, recorded next to the index version file
+        marker = self.index_version.path.with_name(f"{collection_name}.visibility_normalized")
+        if not marker.exists():
+            self.normalize_visibility()
+            marker.touch()
 
     def add_documents(
         self,
@@ -73,12 +88,17 @@ class VectorStore:
             if "ingested_at" not in m:
                 m["ingested_at"] = now
 
-        self.collection.upsert(
-            ids=ids,
-            documents=texts,
-            metadatas=metadatas,
-            embeddings=embeddings,
-        )
+        # Chroma rejects upserts larger than its max batch size; split them.
+        step = self.max_batch_size
+        for start in range(0, len(ids), step):
+            end = start + step
+            self.collection.upsert(
+                ids=ids[start:end],
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=embeddings[start:end] if embeddings is not None else None,
+            )
+        self.index_version.bump(_sources(metadatas))
 
     def similarity_search(
         self,
@@ -129,4 +149,81 @@ class VectorStore:
                     "metadata": meta or {},
                 }
             )
-        return results
\ No newline at end of file
+        return results
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def delete_where(self, where: Dict[str, Any]) -> List[str]:
+        """
+        Delete every chunk matching the Chroma `where` clause; returns the
+        deleted ids.
+        """
+        ids = self.collection.get(where=where, include=[]).get("ids") or []
+        self.delete_documents(ids)
+        return ids
+
+    def normalize_visibility(self) -> int:
+        """
+        Lowercase the RBAC `visibility` of every stored chunk (missing ->
+        "public"), as ingestion does since RBAC filtering moved into the
+        Chroma `where` clause, which matches it exactly. Chunks stored
+        before that are otherwise hidden from the dense leg. Returns the
+        number of chunks updated.
+        """
+        ids: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        offset = 0
+        while True:
+            res = self.collection.get(
+                limit=self.max_batch_size, offset=offset, include=["metadatas"]
+            )
+            batch = res.get("ids") or []
+            if not batch:
+                break
+            for _id, meta in zip(batch, res.get("metadatas") or []):
+                meta = dict(meta or {})
+                visibility = str(meta.get("visibility") or "").strip().lower() or "public"
+                if meta.get("visibility") != visibility:
+                    meta["visibility"] = visibility
+                    ids.append(_id)
+                    metadatas.append(meta)
+            offset += len(batch)
+
+        step = self.max_batch_size
+        for start in range(0, len(ids), step):
+            self.collection.update(
+                ids=ids[start : start + step], metadatas=metadatas[start : start + step]
+            )
+        if ids:
+            logger.info("Normalized RBAC visibility of %d stored chunks.", len(ids))
+            self.index_version.bump(_sources(metadatas))
+        return len(ids)
+
+    def delete_documents(self, ids: List[str]) -> None:
+        """
+        Delete chunks by id (e.g. stale chunks of a re-ingested source).
+        """
+        if not ids:
+            return
+        step = self.max_batch_size
+        metadatas: List[Dict[str, Any]] = []
+        for start in range(0, len(ids), step):
+            batch = ids[start : start + step]
+            # Record which sources lose chunks before they are gone
+            metadatas.extend(
+                self.collection.get(ids=batch, include=["metadatas"]).get("metadatas") or []
+            )
+            self.collection.delete(ids=batch)
+        self.index_version.bump(_sources(metadatas))
+
+
+def _sources(metadatas: List[Dict[str, Any]]) -> Optional[List[str]]:
+    """Distinct `source` values, or None if some chunk has none."""
+    sources = set()
+    for m in metadatas:
+        src = (m or {}).get("source")
+        if not src:
+            return None
+        sources.add(str(src))
+    return sorted(sources)
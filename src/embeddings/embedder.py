@@ -0,0 +1,207 @@
+# src/embeddings/embedder.py
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+import logging
+import os
+
+import numpy as np
+
+from src.utils.config_loader import load_model_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "BAAI/bge-small-en-v1.5"
+DEFAULT_TOKEN_BUDGET = 16384  # padded tokens per forward pass
+DEFAULT_MAX_BATCH_SIZE = 256
+
+
+def plan_batches(
+    lengths: Sequence[int],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+) -> List[List[int]]:
+    """
+    Group input indices into length buckets.
+
+    Inputs are sorted by token length, so each batch holds texts of similar
+    length (little padding). A batch grows while batch_size * longest_len
+    stays within `token_budget`: short texts get large batches, long texts
+    small ones.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in order:
+        longest = max(lengths[i], 1)
+        if current and (
+            (len(current) + 1) * longest > token_budget
+            or len(current) >= max_batch_size
+        ):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+class SentenceTransformerBackend:
+    """
+    Default backend: PyTorch sentence-transformers model.
+
+    Backends expose `tokenizer`, `max_seq_length`, `variant` (identifies
+    the runtime/precision, e.g. for cache keys) and
+    `encode(texts) -> np.ndarray` (L2-normalized float32).
+    """
+
+    variant = "torch"
+
+    def __init__(self, model_name: str, device: str = "cpu", num_threads: Optional[int] = None):
+        from sentence_transformers import SentenceTransformer
+
+        if device == "cpu" and num_threads:
+            try:
+                import torch
+
+                torch.set_num_threads(num_threads)
+            except Exception as e:
+                logger.warning("Could not set torch threads: %s", e)
+
+        self.model = SentenceTransformer(model_name, device=device)
+        self.tokenizer = self.model.tokenizer
+        self.max_seq_length = int(getattr(self.model, "max_seq_length", 512) or 512)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ).astype(np.float32, copy=False)
+
+
+def build_backend(
+    cfg: dict,
+    model_name: str,
+    device: str,
+    num_threads: int,
+):
+    """
+    Pick the embedding backend from model.yaml:embeddings.backend:
+
+      - "sentence_transformers" (default): PyTorch
+      - "onnx": exported ONNX graph on onnxruntime (optionally int8-quantized);
+        falls back to sentence-transformers if onnxruntime or the exported
+        model is missing.
+    """
+    backend = (cfg.get("backend") or "sentence_transformers").lower()
+
+    if backend == "onnx":
+        onnx_cfg = cfg.get("onnx", {}) or {}
+        try:
+            from src.embeddings.onnx_backend import OnnxEmbeddingBackend, default_model_dir
+
+            return OnnxEmbeddingBackend(
+                model_dir=onnx_cfg.get("model_dir") or default_model_dir(model_name),
+                quantized=onnx_cfg.get("quantized", True),
+                num_threads=num_threads,
+            )
+        except ImportError:
+            logger.warning(
+                "Embedding backend 'onnx' requested but onnxruntime is not installed. "
+                "Install with `pip install onnxruntime`. Falling back to sentence-transformers."
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to initialize ONNX embedding backend (%s). "
+                "Falling back to sentence-transformers.",
+                e,
+            )
+
+    return SentenceTransformerBackend(model_name, device=device, num_threads=num_threads)
+
+
+class EmbeddingService:
+    """
+    CPU-friendly BGE embeddings.
+
+    - Inputs are bucketed by token length and batched adaptively from a
+      token budget (see plan_batches), which avoids padding short CSV rows
+      up to the length of long policy chunks.
+    - Intra-op threads are set to all cores (or embeddings.num_threads).
+    - Output order always matches input order; vectors are L2-normalized.
+    - The backend (sentence-transformers or ONNX) is chosen by
+      embeddings.backend; both produce vectors for the same Chroma index.
+
+    Config (model.yaml:embeddings): model_name, device, backend, onnx,
+    batch_token_budget, max_batch_size, num_threads, query_instruction.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, device: Optional[str] = None):
+        cfg = load_model_config().get("embeddings", {}) or {}
+        self.model_name = model_name or cfg.get("model_name", DEFAULT_MODEL_NAME)
+        self.device = device or cfg.get("device", "cpu")
+        self.token_budget = int(cfg.get("batch_token_budget", DEFAULT_TOKEN_BUDGET))
+        self.max_batch_size = int(cfg.get("max_batch_size", DEFAULT_MAX_BATCH_SIZE))
+        self.query_instruction = cfg.get("query_instruction", "") or ""
+        self.num_threads = int(cfg.get("num_threads") or os.cpu_count() or 1)
+
+        self.backend = build_backend(cfg, self.model_name, self.device, self.num_threads)
+        self.max_seq_length = self.backend.max_seq_length
+        # Backend actually in use (the ONNX one may have fallen back to torch)
+        self.variant = self.backend.variant
+        logger.info(
+            "Loaded embedding model %s via %s (threads=%d, token_budget=%d)",
+            self.model_name,
+            type(self.backend).__name__,
+            self.num_threads,
+            self.token_budget,
+        )
+
+    # ------------- Public API -------------
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        lengths = self._token_lengths(texts)
+        out: Optional[np.ndarray] = None
+
+        for batch in plan_batches(lengths, self.token_budget, self.max_batch_size):
+            vecs = self.backend.encode([texts[i] for i in batch])
+            if out is None:
+                out = np.empty((len(texts), vecs.shape[1]), dtype=np.float32)
+            out[batch] = vecs
+
+        return out.tolist()
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.backend.encode([self.query_instruction + query])[0].tolist()
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Batched embed_query(): same query_instruction prefix, one pass per bucket."""
+        return self.embed_texts([self.query_instruction + q for q in queries])
+
+    # ------------- Internal helpers -------------
+
+    def _token_lengths(self, texts: List[str]) -> List[int]:
+        """
+        Token count per text (capped at max_seq_length). Falls back to a
+        chars/4 estimate if the tokenizer can't report lengths.
+        """
+        try:
+            enc = self.backend.tokenizer(
+                texts,
+                add_special_tokens=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_length=True,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )
+            return [int(n) for n in enc["length"]]
+        except Exception:
+            return [min(len(t) // 4 + 2, self.max_seq_length) for t in texts]
@@ -0,0 +1,370 @@
+# src/embeddings/embedding_cache.py
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+import atexit
+import hashlib
+import json
+import logging
+import re
+import threading
+
+import numpy as np
+
+from src.utils.config_loader import load_model_config
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, assume a single writer
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "data/embedding_cache"
+DEFAULT_MAX_ENTRIES = 500_000
+_INITIAL_ROWS = 4096
+_KEY_BYTES = 16
+
+_WS_RE = re.compile(r"\s+")
+
+# One EmbeddingCache per cache directory and process: only one instance can
+# hold the writer lock, so a second one would be read-only and stale
+_shared: Dict[Path, "EmbeddingCache"] = {}
+_shared_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    """Whitespace-insensitive form of `text` used for cache keys."""
+    return _WS_RE.sub(" ", text).strip()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed, content-addressed embedding cache with LRU eviction.
+
+    Keyed by hash(model name, kind, normalized text); the query kind
+    carries the query instruction (see CachedEmbeddingService). Each
+    embedding backend variant (torch, onnx-int8, ...) produces slightly
+    different vectors, so it gets its own storage under
+    `<cache_dir>/<model slug>[__<variant>]/`:
+
+      - vectors.f16  float16 [rows, dim]   memory-mapped vectors
+      - keys.bin     uint8   [rows, 16]    key digest per slot (all-zero = empty)
+      - ticks.bin    int64   [rows]        last-use counter (LRU order on reload)
+      - meta.json    {"model_name", "variant", "dim", "rows"}
+
+    The in-memory key -> slot index is rebuilt from keys.bin on startup, and
+    every hit is verified against keys.bin, so a crash can never serve a
+    vector for the wrong text. Only the process holding the lock file writes;
+    other processes (e.g. extra uvicorn workers) use the cache read-only.
+    Within a process, use shared_embedding_cache() rather than opening a
+    second instance on the same directory.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        variant: str = "",
+    ):
+        self.model_name = model_name
+        self.variant = variant
+        self.max_entries = max(1, int(max_entries))
+        self.dir = self.cache_path(cache_dir, model_name, variant)
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[bytes, int]" = OrderedDict()
+        self._tick = 0
+        self._dim: Optional[int] = None
+        self._rows = 0
+        self._high_water = 0
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        self._ticks: Optional[np.memmap] = None
+
+        self._lock_file = None
+        self.writable = self._acquire_writer_lock()
+        self._load()
+        if self.writable:
+            atexit.register(self.flush)
+
+    @staticmethod
+    def cache_path(cache_dir: str, model_name: str, variant: str = "") -> Path:
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        if variant:
+            slug += "__" + re.sub(r"[^A-Za-z0-9_.-]+", "_", variant)
+        return Path(cache_dir) / slug
+
+    # -------- public API -------- #
+
+    def key(self, text: str, kind: str = "passage") -> bytes:
+        payload = f"{self.model_name}\x00{kind}\x00{normalize_text(text)}"
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=_KEY_BYTES).digest()
+
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[List[float]]]:
+        """Cached vectors for `keys` (None where missing); updates LRU + counters."""
+        out: List[Optional[List[float]]] = []
+        with self._lock:
+            for k in keys:
+                slot = self._index.get(k)
+                if slot is None or bytes(self._keys[slot]) != k:
+                    if slot is not None:
+                        # Slot was reused by another writer since we loaded
+                        del self._index[k]
+                    self.misses += 1
+                    out.append(None)
+                    continue
+                self._index.move_to_end(k)
+                if self.writable:
+                    self._tick += 1
+                    self._ticks[slot] = self._tick
+                self.hits += 1
+                out.append(self._vectors[slot].astype(np.float32).tolist())
+        return out
+
+    def put_many(self, keys: Sequence[bytes], vectors: Sequence[Sequence[float]]) -> None:
+        if not self.writable or not keys:
+            return
+        with self._lock:
+            for k, vec in zip(keys, vectors):
+                arr = np.asarray(vec, dtype=np.float32)
+                if self._dim is None:
+                    self._init_storage(arr.shape[0])
+                if arr.shape[0] != self._dim:
+                    logger.warning(
+                        "Embedding dim %d != cache dim %d; not caching.",
+                        arr.shape[0],
+                        self._dim,
+                    )
+                    return
+
+                slot = self._index.get(k)
+                if slot is None:
+                    slot = self._allocate_slot()
+                self._vectors[slot] = arr.astype(np.float16)
+                self._keys[slot] = np.frombuffer(k, dtype=np.uint8)
+                self._tick += 1
+                self._ticks[slot] = self._tick
+                self._index[k] = slot
+                self._index.move_to_end(k)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "entries": len(self._index),
+            "max_entries": self.max_entries,
+        }
+
+    def flush(self) -> None:
+        with self._lock:
+            for arr in (self._vectors, self._keys, self._ticks):
+                if arr is not None:
+                    arr.flush()
+
+    # -------- storage -------- #
+
+    def _acquire_writer_lock(self) -> bool:
+        if fcntl is None:
+            return True
+        try:
+            self._lock_file = open(self.dir / "writer.lock", "w")
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            logger.info("Embedding cache %s is locked by another process; read-only.", self.dir)
+            return False
+
+    def _load(self) -> None:
+        meta_path = self.dir / "meta.json"
+        if not meta_path.exists():
+            return
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            self._dim, self._rows = int(meta["dim"]), int(meta["rows"])
+            self._open_arrays(mode="r+" if self.writable else "r")
+        except Exception as e:
+            logger.warning("Ignoring unreadable embedding cache at %s: %s", self.dir, e)
+            self._dim, self._rows = None, 0
+            self._vectors = self._keys = self._ticks = None
+            return
+
+        used = np.flatnonzero(self._keys.any(axis=1))
+        order = used[np.argsort(self._ticks[used], kind="stable")]
+        for slot in order.tolist():
+            self._index[bytes(self._keys[slot])] = slot
+        if len(order):
+            self._tick = int(self._ticks[order[-1]])
+            self._high_water = int(used.max()) + 1
+        logger.info("Loaded embedding cache %s (%d entries)", self.dir, len(self._index))
+
+    def _open_arrays(self, mode: str) -> None:
+        shape = (self._rows,)
+        self._vectors = np.memmap(
+            self.dir / "vectors.f16", dtype=np.float16, mode=mode, shape=shape + (self._dim,)
+        )
+        self._keys = np.memmap(
+            self.dir / "keys.bin", dtype=np.uint8, mode=mode, shape=shape + (_KEY_BYTES,)
+        )
+        self._ticks = np.memmap(self.dir / "ticks.bin", dtype=np.int64, mode=mode, shape=shape)
+
+    def _init_storage(self, dim: int) -> None:
+        self._dim = dim
+        self._grow(min(_INITIAL_ROWS, self.max_entries))
+
+    def _grow(self, rows: int) -> None:
+        """Resize the backing files to `rows` slots (new slots are zero = empty)."""
+        for arr in (self._vectors, self._keys, self._ticks):
+            if arr is not None:
+                arr.flush()
+        for name, row_bytes in (
+            ("vectors.f16", self._dim * 2),
+            ("keys.bin", _KEY_BYTES),
+            ("ticks.bin", 8),
+        ):
+            with open(self.dir / name, "ab") as f:
+                f.truncate(rows * row_bytes)
+        self._rows = rows
+        self._open_arrays(mode="r+")
+        (self.dir / "meta.json").write_text(
+            json.dumps(
+                {
+                    "model_name": self.model_name,
+                    "variant": self.variant,
+                    "dim": self._dim,
+                    "rows": rows,
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    def _allocate_slot(self) -> int:
+        # Slots are handed out densely up to the high-water mark, then reused
+        if self._high_water >= self._rows and self._rows < self.max_entries:
+            self._grow(min(self._rows * 2, self.max_entries))
+        if self._high_water < self._rows:
+            slot = self._high_water
+            self._high_water += 1
+            return slot
+        # Full: evict least recently used
+        _, slot = self._index.popitem(last=False)
+        return slot
+
+
+class CachedEmbeddingService:
+    """
+    Drop-in wrapper adding EmbeddingCache in front of an embedder exposing
+    embed_texts(texts) / embed_query(query) / embed_queries(queries).
+    Passages and queries are cached under separate kinds, since queries are
+    embedded with the query instruction; the query kind includes the
+    instruction itself, so changing it does not serve vectors computed
+    under the old one. Any other attribute is forwarded to the wrapped
+    embedder.
+    """
+
+    def __init__(self, embedder: Any, cache: EmbeddingCache):
+        self.embedder = embedder
+        self.cache = cache
+        instruction = getattr(embedder, "query_instruction", "") or ""
+        self._query_kind = f"query\x00{instruction}"
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.embedder, name)
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_many(texts, "passage", self.embedder.embed_texts)
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        return self._embed_many(queries, self._query_kind, self.embedder.embed_queries)
+
+    def _embed_many(
+        self,
+        texts: List[str],
+        kind: str,
+        embed_fn: Callable[[List[str]], Sequence[Sequence[float]]],
+    ) -> List[List[float]]:
+        keys = [self.cache.key(t, kind=kind) for t in texts]
+        vectors = self.cache.get_many(keys)
+
+        # Embed each distinct missing text once (repeated rows, shared policies)
+        missing: Dict[bytes, int] = {}
+        miss_texts: List[str] = []
+        for k, t, v in zip(keys, texts, vectors):
+            if v is None and k not in missing:
+                missing[k] = len(miss_texts)
+                miss_texts.append(t)
+
+        if miss_texts:
+            fresh = [list(map(float, v)) for v in embed_fn(miss_texts)]
+            self.cache.put_many(list(missing), fresh)
+            vectors = [
+                v if v is not None else fresh[missing[k]] for k, v in zip(keys, vectors)
+            ]
+        return vectors
+
+    def embed_query(self, query: str) -> List[float]:
+        key = self.cache.key(query, kind=self._query_kind)
+        cached = self.cache.get_many([key])[0]
+        if cached is not None:
+            return cached
+        vec = list(map(float, self.embedder.embed_query(query)))
+        self.cache.put_many([key], [vec])
+        return vec
+
+    def stats(self) -> Dict[str, Any]:
+        return {"embedding_cache": self.cache.stats()}
+
+
+def shared_embedding_cache(
+    model_name: str,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    max_entries: int = DEFAULT_MAX_ENTRIES,
+    variant: str = "",
+) -> EmbeddingCache:
+    """
+    The process-wide EmbeddingCache for (cache_dir, model_name, variant),
+    opened on first use. The retriever and the ingestion pipeline share it,
+    so both see each other's writes through the one writer.
+    """
+    path = EmbeddingCache.cache_path(cache_dir, model_name, variant).resolve()
+    with _shared_lock:
+        cache = _shared.get(path)
+        if cache is None:
+            cache = EmbeddingCache(
+                model_name, cache_dir=cache_dir, max_entries=max_entries, variant=variant
+            )
+            _shared[path] = cache
+        return cache
+
+
+def with_embedding_cache(embedder: Any) -> Any:
+    """
+    Wrap `embedder` with the disk cache if model.yaml:embeddings.cache.enabled.
+    """
+    emb_cfg = load_model_config().get("embeddings", {}) or {}
+    cache_cfg = emb_cfg.get("cache", {}) or {}
+    if not cache_cfg.get("enabled", False):
+        return embedder
+
+    try:
+        cache = shared_embedding_cache(
+            model_name=getattr(embedder, "model_name", None)
+            or emb_cfg.get("model_name", "BAAI/bge-small-en-v1.5"),
+            cache_dir=cache_cfg.get("dir", DEFAULT_CACHE_DIR),
+            max_entries=cache_cfg.get("max_entries", DEFAULT_MAX_ENTRIES),
+            variant=getattr(embedder, "variant", "") or "",
+        )
+    except Exception as e:
+        logger.warning("Failed to open embedding cache; continuing without it: %s", e)
+        return embedder
+    return CachedEmbeddingService(embedder, cache)
@@ -0,0 +1,68 @@
+# src/embeddings/micro_batch.py
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+import logging
+
+from src.utils.config_loader import load_model_config
+from src.utils.micro_batcher import DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_WAIT_MS, MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatchedEmbedder:
+    """
+    Routes embed_query() through a MicroBatcher so concurrent queries (one
+    per /query worker thread) share a single forward pass instead of each
+    running a batch of one. Everything else is forwarded to the wrapped
+    embedder.
+    """
+
+    def __init__(
+        self,
+        embedder: Any,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+    ):
+        self.embedder = embedder
+        self.batcher: MicroBatcher[str, List[float]] = MicroBatcher(
+            self._embed_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            name="embed-query-batcher",
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.embedder, name)
+
+    def _embed_batch(self, queries: List[str]) -> List[List[float]]:
+        if len(queries) == 1:
+            return [self.embedder.embed_query(queries[0])]
+        return self.embedder.embed_queries(queries)
+
+    def embed_query(self, query: str) -> List[float]:
+        return self.batcher.submit(query)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"micro_batch": self.batcher.stats()}
+        inner = getattr(self.embedder, "stats", None)
+        if callable(inner):
+            out.update(inner())
+        return out
+
+
+def with_micro_batching(embedder: Any) -> Any:
+    """
+    Wrap `embedder` with query micro-batching if
+    model.yaml:embeddings.micro_batch.enabled.
+    """
+    emb_cfg = load_model_config().get("embeddings", {}) or {}
+    mb_cfg = emb_cfg.get("micro_batch", {}) or {}
+    if not mb_cfg.get("enabled", False):
+        return embedder
+    return MicroBatchedEmbedder(
+        embedder,
+        max_batch_size=mb_cfg.get("max_batch_size", DEFAULT_MAX_BATCH_SIZE),
+        max_wait_ms=mb_cfg.get("max_wait_ms", DEFAULT_MAX_WAIT_MS),
+    )
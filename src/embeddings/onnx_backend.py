@@ -0,0 +1,224 @@
+# src/embeddings/onnx_backend.py
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+CONFIG_FILE = "onnx_config.json"
+
+
+def default_model_dir(model_name: str) -> str:
+    return str(Path("data/models") / (model_name.replace("/", "__") + "-onnx"))
+
+
+def export_onnx(
+    model_name: str,
+    out_dir: str,
+    quantize: bool = True,
+    opset: int = 17,
+) -> Dict[str, str]:
+    """
+    Export a sentence-transformers model's transformer to ONNX.
+
+    Writes model.onnx, the tokenizer, onnx_config.json (pooling mode + max
+    sequence length, read from the sentence-transformers model so vectors
+    match) and, with quantize=True, an int8 dynamically quantized
+    model.int8.onnx.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0]
+    hf_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+
+    pooling = "cls"
+    if len(st) > 1 and hasattr(st[1], "get_pooling_mode_str"):
+        pooling = st[1].get_pooling_mode_str()
+
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    dummy = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in dummy]
+    dynamic_axes = {n: {0: "batch", 1: "seq"} for n in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+
+    fp32_path = out / FP32_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            hf_model,
+            tuple(dummy[n] for n in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    tokenizer.save_pretrained(str(out))
+    (out / CONFIG_FILE).write_text(
+        json.dumps(
+            {
+                "model_name": model_name,
+                "pooling": pooling,
+                "max_seq_length": int(st.max_seq_length),
+            }
+        ),
+        encoding="utf-8",
+    )
+    paths = {"fp32": str(fp32_path)}
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        int8_path = out / INT8_FILE
+        quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+        paths["int8"] = str(int8_path)
+
+    logger.info("Exported %s to ONNX: %s (pooling=%s)", model_name, paths, pooling)
+    return paths
+
+
+class OnnxEmbeddingBackend:
+    """
+    Runs an exported ONNX graph on CPU with onnxruntime.
+
+    Same interface as the sentence-transformers backend in embedder.py:
+    `tokenizer`, `max_seq_length` and `encode(texts) -> np.ndarray`
+    (L2-normalized float32), so it can be swapped in via
+    model.yaml:embeddings.backend without re-indexing Chroma.
+    """
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = True,
+        num_threads: Optional[int] = None,
+    ):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        d = Path(model_dir)
+        model_path = d / (INT8_FILE if quantized else FP32_FILE)
+        if not model_path.exists():
+            raise FileNotFoundError(
+                f"ONNX model not found at {model_path}. "
+                "Export it with: python -m cli.onnx_embeddings export"
+            )
+
+        cfg = json.loads((d / CONFIG_FILE).read_text(encoding="utf-8"))
+        self.pooling = cfg.get("pooling", "cls")
+        self.max_seq_length = int(cfg.get("max_seq_length", 512))
+        self.tokenizer = AutoTokenizer.from_pretrained(str(d))
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = int(num_threads or os.cpu_count() or 1)
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_path), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self.model_path = str(model_path)
+        self.variant = "onnx-int8" if quantized else "onnx-fp32"
+        logger.info("Loaded ONNX embedding model %s (pooling=%s)", model_path, self.pooling)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        enc = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=self.max_seq_length,
+            return_tensors="np",
+        )
+        feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self._input_names}
+        hidden = self.session.run(None, feeds)[0]
+
+        if self.pooling == "mean":
+            mask = enc["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        else:
+            pooled = hidden[:, 0]
+
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+# ---------- parity + benchmark ---------- #
+
+
+def parity_check(reference, candidate, texts: List[str]) -> Dict[str, float]:
+    """
+    Cosine similarity between reference (sentence-transformers) and candidate
+    (ONNX) vectors for the same texts. Both return normalized vectors.
+    """
+    ref = reference.encode(texts)
+    cand = candidate.encode(texts)
+    cos = (ref * cand).sum(axis=1)
+    return {
+        "n": len(texts),
+        "min_cosine": float(cos.min()),
+        "mean_cosine": float(cos.mean()),
+    }
+
+
+def benchmark(
+    reference,
+    candidate,
+    corpus: List[str],
+    queries: List[str],
+    top_k: int = 10,
+    repeats: int = 3,
+) -> Dict[str, float]:
+    """
+    Query-embedding latency of both backends, plus recall@k of candidate
+    query vectors against a corpus embedded with the reference backend
+    (i.e. the existing Chroma index is kept as-is).
+    """
+
+    def per_query_ms(backend) -> float:
+        backend.encode(queries[:1])  # warm-up
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for q in queries:
+                backend.encode([q])
+            best = min(best, time.perf_counter() - start)
+        return best * 1000.0 / max(len(queries), 1)
+
+    ref_ms = per_query_ms(reference)
+    cand_ms = per_query_ms(candidate)
+
+    corpus_vecs = reference.encode(corpus)
+    k = min(top_k, len(corpus))
+
+    def top_ids(query_vecs: np.ndarray) -> np.ndarray:
+        scores = query_vecs @ corpus_vecs.T
+        return np.argsort(-scores, axis=1)[:, :k]
+
+    ref_top = top_ids(reference.encode(queries))
+    cand_top = top_ids(candidate.encode(queries))
+    overlap = [
+        len(set(r.tolist()) & set(c.tolist())) / k for r, c in zip(ref_top, cand_top)
+    ]
+
+    return {
+        "queries": len(queries),
+        "corpus": len(corpus),
+        "reference_ms_per_query": ref_ms,
+        "candidate_ms_per_query": cand_ms,
+        "speedup": ref_ms / cand_ms if cand_ms > 0 else float("inf"),
+        f"recall@{k}": float(np.mean(overlap)) if overlap else 0.0,
+        "recall_delta": (float(np.mean(overlap)) - 1.0) if overlap else 0.0,
+    }
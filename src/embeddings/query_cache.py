@@ -0,0 +1,159 @@
+# src/embeddings/query_cache.py
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import threading
+import time
+
+from src.embeddings.embedding_cache import normalize_text
+from src.utils.config_loader import load_model_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL_SECONDS = 3600.0
+
+
+class QueryEmbeddingCache:
+    """
+    In-process LRU cache of query embeddings with a TTL.
+
+    Keyed by (model name, normalized query text). Entries older than
+    `ttl_seconds` are treated as misses (ttl_seconds <= 0 disables expiry).
+    Thread-safe; counters are exposed through stats().
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds or 0)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+
+    @staticmethod
+    def key(model_name: str, query: str) -> Tuple[str, str]:
+        return model_name, normalize_text(query)
+
+    def get(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0:
+                if time.monotonic() - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expired += 1
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple[str, str], vector: List[float]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+class QueryCachedEmbedder:
+    """
+    Wrapper adding a QueryEmbeddingCache in front of embed_query().
+
+    embed_queries() is the batch entry point: cached queries are served from
+    memory and the remaining distinct ones are embedded in one call to the
+    wrapped embedder's embed_queries(). Everything else is forwarded to the
+    wrapped embedder.
+    """
+
+    def __init__(self, embedder: Any, cache: QueryEmbeddingCache, model_name: str):
+        self.embedder = embedder
+        self.cache = cache
+        self.model_name = model_name
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.embedder, name)
+
+    def embed_query(self, query: str) -> List[float]:
+        key = self.cache.key(self.model_name, query)
+        vec = self.cache.get(key)
+        if vec is None:
+            vec = list(map(float, self.embedder.embed_query(query)))
+            self.cache.put(key, vec)
+        return vec
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        keys = [self.cache.key(self.model_name, q) for q in queries]
+        vectors = [self.cache.get(k) for k in keys]
+
+        missing: Dict[Tuple[str, str], int] = {}
+        miss_texts: List[str] = []
+        for k, q, v in zip(keys, queries, vectors):
+            if v is None and k not in missing:
+                missing[k] = len(miss_texts)
+                miss_texts.append(q)
+
+        if miss_texts:
+            fresh = [list(map(float, v)) for v in self.embedder.embed_queries(miss_texts)]
+            for k, i in missing.items():
+                self.cache.put(k, fresh[i])
+            vectors = [
+                v if v is not None else fresh[missing[k]] for k, v in zip(keys, vectors)
+            ]
+        return vectors
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"query_cache": self.cache.stats()}
+        inner = getattr(self.embedder, "stats", None)
+        if callable(inner):
+            out.update(inner())
+        return out
+
+
+def with_query_cache(embedder: Any) -> Any:
+    """
+    Wrap `embedder` with the in-process query cache if
+    model.yaml:embeddings.query_cache.enabled (default on).
+    """
+    emb_cfg = load_model_config().get("embeddings", {}) or {}
+    qc_cfg = emb_cfg.get("query_cache", {}) or {}
+    if not qc_cfg.get("enabled", True):
+        return embedder
+
+    cache = QueryEmbeddingCache(
+        max_entries=qc_cfg.get("max_entries", DEFAULT_MAX_ENTRIES),
+        ttl_seconds=qc_cfg.get("ttl_seconds", DEFAULT_TTL_SECONDS),
+    )
+    model_name = getattr(embedder, "model_name", None) or emb_cfg.get(
+        "model_name", "BAAI/bge-small-en-v1.5"
+    )
+    return QueryCachedEmbedder(embedder, cache, model_name)
@@ -1,16 +1,38 @@
-from typing import List, Dict
+from typing import Dict, Iterator
 import pandas as pd
 from pathlib import Path
 
+# Rows read per pandas chunk; bounds memory regardless of file size.
+DEFAULT_CSV_CHUNKSIZE = 10_000
 
-def load_csv(path: str) -> List[Dict]:
-    df = pd.read_csv(path)
-    docs = []
-    for idx, row in df.iterrows():
-        text = " ".join([f"{col}: {row[col]}" for col in df.columns])
-        docs.append(
-            {
-                "id": f"{Path(path).name}-{idx}",
+
+def _rows_to_text(df: pd.DataFrame) -> pd.Series:
+    """
+    Build "col1: val1 col2: val2 ..." for every row with column-wise
+    (vectorized) string concatenation instead of a per-row Python loop.
+    """
+    text = pd.Series("", index=df.index, dtype=object)
+    for i, col in enumerate(df.columns):
+        # astype(str) keeps NaN as NaN on newer pandas; render it as "nan"
+        values = df[col].astype(str).fillna("nan").astype(object)
+        prefix = f"{col}: " if i == 0 else f" {col}: "
+        text = text + prefix + values
+    return text
+
+
+def load_csv(path: str, chunksize: int = DEFAULT_CSV_CHUNKSIZE) -> Iterator[Dict]:
+    """
+    Stream a CSV file as documents, one per row.
+
+    The file is read `chunksize` rows at a time and documents are yielded
+    lazily, so memory stays bounded for multi-million-row exports.
+    """
+    name = Path(path).name
+    for df in pd.read_csv(path, chunksize=chunksize):
+        texts = _rows_to_text(df)
+        for idx, text in zip(df.index.tolist(), texts.tolist()):
+            yield {
+                "id": f"{name}-{idx}",
                 "text": text,
                 "metadata": {
                     "source": str(path),
@@ -18,5 +40,3 @@ def load_csv(path: str) -> List[Dict]:
                     "file_type": "csv",
                 },
             }
-        )
-    return docs
\ No newline at end of file
@@ -146,10 +146,20 @@
 #                 except Exception:
 #                     pass
 import logging
-from typing import List, Dict, Optional
+import multiprocessing
+import os
+import queue
+from collections import deque
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from itertools import islice
+from typing import Deque, Iterable, Iterator, List, Dict, Optional
 from pathlib import Path
 
-from src.utils.config_loader import load_settings, load_paths
+from src.utils.config_loader import load_settings, load_paths, load_model_config
 from src.utils.file_utils import (
     get_extension,
     is_remote_path,
@@ -160,25 +170,45 @@ from src.ingestion.yaml_loader import load_yaml_file
 from src.ingestion.text_loader import load_text_file
 from src.ingestion.md_loader import load_md_file
 from src.ingestion.xlsx_loader import load_xlsx
-from src.ingestion.json_loader import load_json
+from src.ingestion.json_loader import load_json, load_jsonl
+from src.ingestion.manifest import IngestionManifest, doc_sha256, source_tag
 from src.processing.chunker import chunk_text
 from src.embeddings.embedder import EmbeddingService
+from src.embeddings.embedding_cache import with_embedding_cache
 from src.db.vector_store import VectorStore
+from src.retrieval.bm25_store import LEXICAL_MODES, writer_from_config
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_INGEST_WORKERS = 1
+DEFAULT_EMBED_BATCH_SIZE = 256
+
 
 class IngestionPipeline:
     def __init__(self):
         self.settings = load_settings()
         self.paths = load_paths()
-        self.embedder = EmbeddingService()
+        self.embedder = with_embedding_cache(EmbeddingService())
         self.vector_store = VectorStore()
+        self.manifest = IngestionManifest()
+        # Live BM25 index (model.yaml:retrieval.bm25_persist), kept only if
+        # retrieval.mode reads it: every upsert and delete is published as a
+        # small segment retrievers pick up
+        retrieval_cfg = load_model_config().get("retrieval", {}) or {}
+        self.lexical_writer = None
+        if retrieval_cfg.get("bm25_persist", True):
+            writer = writer_from_config()
+            if (retrieval_cfg.get("mode") or "dense").lower() in LEXICAL_MODES:
+                self.lexical_writer = writer
+            elif writer.exists():
+                # Would go stale from here on; switching to hybrid/lexical
+                # later rebuilds it from Chroma
+                writer.drop()
 
     # ---------- NEW: RBAC metadata inference ---------- #
 
+    @staticmethod
     def _infer_rbac_metadata(
-        self,
         source_path: str,
         dataset_name: str,
         base_metadata: Dict,
@@ -187,11 +217,12 @@ class IngestionPipeline:
         Infer RBAC-related metadata based on dataset and file path.
 
         Returns dict with:
-          - visibility: "public" | "hr" | "admin" | "private"
+          - visibility: "public" | "hr" | "admin" | "private" (always
+            lowercase: RBACFilterTool.where_filter matches it exactly)
           - owner_user_id: str (optional, for private docs)
         """
-        # If already explicitly set, respect it
-        visibility = base_metadata.get("visibility")
+        # If already explicitly set, respect it (normalized)
+        visibility = str(base_metadata.get("visibility") or "").strip().lower()
         owner_user_id = base_metadata.get("owner_user_id")
 
         if visibility:
@@ -256,7 +287,16 @@ class IngestionPipeline:
 
     # ---------- existing methods ---------- #
 
-    def _load_docs_from_path(self, path: str) -> List[Dict]:
+    @staticmethod
+    def _load_docs_from_path(path: str, sheet_workers: Optional[int] = None) -> Iterable[Dict]:
+        """
+        Load a file into documents. Loaders may return a list or a generator
+        (e.g. the streaming CSV loader); callers must only iterate once.
+
+        `sheet_workers` is passed to load_xlsx (None = its size-based
+        default); folder ingestion workers pass 1, since the folder-level
+        pool already has a process per core.
+        """
         ext = get_extension(path)
 
         # 1) Simple text-like formats
@@ -271,9 +311,11 @@ class IngestionPipeline:
 
         # 2) Structured tabular formats (custom loaders)
         if ext in [".xlsx", ".xls"]:
-            return load_xlsx(path)
+            return load_xlsx(path, workers=sheet_workers)
         if ext == ".json":
             return load_json(path)
+        if ext in [".jsonl", ".ndjson"]:
+            return load_jsonl(path)
 
         # 3) Rich document formats via LangChain loaders (PDF, Word)
         if ext in [".pdf", ".docx", ".doc"]:
@@ -306,81 +348,500 @@ class IngestionPipeline:
         # 4) Fallback: treat as plain text
         return load_text_file(path)
 
+    @staticmethod
+    def _chunk_docs(
+        docs: Iterable[Dict],
+        source_path: str,
+        dataset_name: str,
+        extra_metadata: Optional[Dict] = None,
+        source_key: Optional[str] = None,
+    ) -> Iterator[Dict]:
+        """
+        Attach dataset/RBAC metadata to loaded docs and split them into chunks.
+
+        Chunk ids are qualified with source_tag(source_key) (default: the
+        resolved source path), since loader doc ids only use the file name.
+        """
+        tag = source_tag(source_key or IngestionManifest.source_key(source_path))
+        for d in docs:
+            text = d["text"]
+            metadata = d.get("metadata", {}) or {}
+
+            if extra_metadata:
+                metadata.update(extra_metadata)
+
+            metadata["dataset"] = dataset_name
+
+            # ---------- NEW: inject RBAC metadata ----------
+            rbac_meta = IngestionPipeline._infer_rbac_metadata(
+                source_path=source_path,
+                dataset_name=dataset_name,
+                base_metadata=metadata,
+            )
+            metadata.update(rbac_meta)
+            # ---------------------------------------------- #
+
+            # Document-level hash for incremental re-ingestion (see manifest.py)
+            doc_hash = doc_sha256(text, metadata)
+
+            chunks = chunk_text(text)
+            for idx, ch in enumerate(chunks):
+                yield {
+                    "id": f"{tag}:{d['id']}-chunk-{idx}",
+                    "text": ch,
+                    "metadata": metadata,
+                    "doc_id": d["id"],
+                    "doc_hash": doc_hash,
+                }
+
     def ingest(
         self,
         path_or_url: str,
         dataset_name: str = "default",
         extra_metadata: Optional[Dict] = None,
+        force: bool = False,
+        batch_size: Optional[int] = None,
     ) -> Dict:
         """
         Full pipeline: download (if URL) -> load -> chunk -> embed -> index
+
+        Streaming: chunks flow from the loader through the chunker into
+        fixed-size batches (`batch_size`, default settings.yaml
+        ingestion.embed_batch_size); each batch is embedded and upserted
+        before the next one is produced.
+
+        Incremental: a source whose content is unchanged since the last run is
+        skipped, only new/modified documents are embedded, and chunks that no
+        longer exist are deleted from the vector store. `force=True` re-embeds
+        every chunk.
         """
+        if batch_size is None:
+            batch_size = self._embed_batch_size()
+
         tmp_path = None
         paths_cfg = load_paths()
         tmp_dir = paths_cfg.get("tmp_dir", "data/tmp")
         Path(tmp_dir).mkdir(parents=True, exist_ok=True)
 
         try:
-            if is_remote_path(path_or_url):
+            local = not is_remote_path(path_or_url)
+            if not local:
                 tmp_path = download_file(path_or_url, tmp_dir)
                 source_path = tmp_path
             else:
                 source_path = path_or_url
 
-            docs = self._load_docs_from_path(source_path)
-
-            processed_docs: List[Dict] = []
-            for d in docs:
-                text = d["text"]
-                metadata = d.get("metadata", {}) or {}
-
-                if extra_metadata:
-                    metadata.update(extra_metadata)
+            key = self.manifest.source_key(path_or_url)
+            if force:
+                fingerprint = self.manifest.fingerprint(source_path, local=local)
+            else:
+                fingerprint = self.manifest.fingerprint_if_changed(
+                    key,
+                    source_path,
+                    local=local,
+                    dataset_name=dataset_name,
+                    extra_metadata=extra_metadata,
+                )
+            if fingerprint is None:
+                logger.info("Skipping unchanged source %s", path_or_url)
+                self.manifest.save()
+                return {"status": "unchanged", "count": 0}
 
-                metadata["dataset"] = dataset_name
+            update = self.manifest.begin(
+                key, dataset_name, fingerprint, extra_metadata=extra_metadata, force=force
+            )
+            legacy_ids = self._delete_unmanifested(update, source_path) if local else []
+            docs = self._load_docs_from_path(source_path)
+            stream = update.filter(
+                self._chunk_docs(docs, source_path, dataset_name, extra_metadata, source_key=key)
+            )
 
-                # ---------- NEW: inject RBAC metadata ----------
-                rbac_meta = self._infer_rbac_metadata(
-                    source_path=source_path,
-                    dataset_name=dataset_name,
-                    base_metadata=metadata,
+            # Embed + upsert one fixed-size batch at a time: the loader and
+            # chunker are generators, so memory is bounded by batch_size.
+            count = 0
+            for batch_no, batch in enumerate(_batched(stream, batch_size), start=1):
+                self._write_batch(self._embed_batch(batch))
+                count += len(batch)
+                logger.info(
+                    "  %s: batch %d upserted (%d chunks, %d total)",
+                    path_or_url,
+                    batch_no,
+                    len(batch),
+                    count,
                 )
-                metadata.update(rbac_meta)
-                # ---------------------------------------------- #
-
-                chunks = chunk_text(text)
-                for idx, ch in enumerate(chunks):
-                    processed_docs.append(
-                        {
-                            "id": f"{d['id']}-chunk-{idx}",
-                            "text": ch,
-                            "metadata": metadata,
-                        }
-                    )
 
-            if not processed_docs:
+            # Saved only after the deletes: if they fail, the next run
+            # still sees the old entry and retries
+            stale_ids = update.commit()
+            self.vector_store.delete_documents(stale_ids)
+            self._publish_lexical(deleted=stale_ids + legacy_ids)
+            self.manifest.save()
+
+            if not count and not stale_ids and not legacy_ids and not update.unchanged_chunks:
                 logger.warning("No documents to ingest from %s", path_or_url)
                 return {"status": "empty", "count": 0}
 
-            texts = [d["text"] for d in processed_docs]
-            metadatas = [d["metadata"] for d in processed_docs]
-            ids = [d["id"] for d in processed_docs]
-
-            embeddings = self.embedder.embed_texts(texts)
-            self.vector_store.add_documents(
-                ids=ids, texts=texts, metadatas=metadatas, embeddings=embeddings
-            )
-
             logger.info(
-                "Ingested %d chunks from %s into dataset %s",
-                len(processed_docs),
+                "Ingested %d chunks from %s into dataset %s "
+                "(%d unchanged, %d stale removed)",
+                count,
                 path_or_url,
                 dataset_name,
+                update.unchanged_chunks,
+                len(stale_ids) + len(legacy_ids),
             )
-            return {"status": "ok", "count": len(processed_docs)}
+            return {"status": "ok", "count": count, "deleted": len(stale_ids) + len(legacy_ids)}
         finally:
             if tmp_path:
                 try:
                     Path(tmp_path).unlink()
                 except Exception:
-                    pass
\ No newline at end of file
+                    pass
+
+    # ---------- parallel folder ingestion ---------- #
+
+    def ingest_folder(
+        self,
+        folder: str,
+        dataset_name: str = "default",
+        extra_metadata: Optional[Dict] = None,
+        workers: Optional[int] = None,
+        force: bool = False,
+    ) -> Dict:
+        """
+        Ingest every file under `folder` (recursively).
+
+        With workers > 1, files are loaded and chunked in a process pool that
+        streams bounded chunk batches back while this process embeds them and
+        a writer thread upserts them into Chroma, so embedding never waits on
+        disk and memory stays bounded by embed_batch_size, not file size.
+        With workers <= 1, files are ingested one by one via `ingest`.
+
+        Unchanged files are skipped (see `ingest`), and chunks of files that
+        were deleted from `folder` since the last run are removed.
+
+        Defaults come from settings.yaml:ingestion (workers, embed_batch_size).
+        """
+        ingest_cfg = self.settings.get("ingestion", {}) or {}
+        if workers is None:
+            workers = ingest_cfg.get("workers", DEFAULT_INGEST_WORKERS)
+        batch_size = self._embed_batch_size()
+
+        files = [
+            os.path.join(root, fname)
+            for root, _dirs, fnames in os.walk(folder)
+            for fname in fnames
+        ]
+
+        total = 0
+        skipped = 0
+        deleted = 0
+
+        if workers <= 1:
+            for fpath in files:
+                logger.info("Ingesting file: %s", fpath)
+                res = self.ingest(
+                    fpath,
+                    dataset_name=dataset_name,
+                    extra_metadata=extra_metadata,
+                    force=force,
+                )
+                logger.info("  -> %s", res)
+                total += res.get("count", 0)
+                deleted += res.get("deleted", 0)
+                if res.get("status") == "unchanged":
+                    skipped += 1
+        else:
+            res = self._ingest_files_parallel(
+                files, dataset_name, extra_metadata, workers, batch_size, force
+            )
+            total, skipped, deleted = res["count"], res["skipped"], res["deleted"]
+
+        # Sources that disappeared from the folder: drop their chunks
+        for key in self.manifest.missing_sources(folder):
+            ids = self.manifest.remove(key)
+            self.vector_store.delete_documents(ids)
+            self._publish_lexical(deleted=ids)
+            deleted += len(ids)
+            logger.info("Removed %d chunks of deleted source %s", len(ids), key)
+        self.manifest.save()
+
+        if hasattr(self.embedder, "stats"):
+            logger.info("Embedding cache: %s", self.embedder.stats())
+
+        logger.info(
+            "Ingested %d chunks from %d files in %s into dataset %s "
+            "(%d unchanged files skipped, %d stale chunks removed)",
+            total,
+            len(files),
+            folder,
+            dataset_name,
+            skipped,
+            deleted,
+        )
+        return {
+            "status": "ok",
+            "count": total,
+            "files": len(files),
+            "skipped": skipped,
+            "deleted": deleted,
+        }
+
+    def _ingest_files_parallel(
+        self,
+        files: List[str],
+        dataset_name: str,
+        extra_metadata: Optional[Dict],
+        workers: int,
+        batch_size: int,
+        force: bool,
+    ) -> Dict:
+        # Manifest check happens here so unchanged files never reach the pool
+        todo = []
+        skipped = 0
+        for fpath in files:
+            key = self.manifest.source_key(fpath)
+            if force:
+                fingerprint = self.manifest.fingerprint(fpath)
+            else:
+                fingerprint = self.manifest.fingerprint_if_changed(
+                    key, fpath, dataset_name=dataset_name, extra_metadata=extra_metadata
+                )
+            if fingerprint is None:
+                skipped += 1
+                continue
+            todo.append((fpath, key, fingerprint))
+
+        logger.info(
+            "Parallel ingestion of %d/%d changed files (workers=%d, batch=%d)",
+            len(todo),
+            len(files),
+            workers,
+            batch_size,
+        )
+
+        total = 0
+        buffer: Deque[Dict] = deque()
+        stale_ids: List[str] = []
+        legacy_ids: List[str] = []
+        updates = {}
+        pending_write: Optional[Future] = None
+
+        def flush(size: int) -> None:
+            nonlocal total, pending_write
+            while len(buffer) >= size and buffer:
+                batch = [buffer.popleft() for _ in range(min(batch_size, len(buffer)))]
+                total += len(batch)
+                pending_write = self._embed_and_write(batch, writer, pending_write)
+                logger.info("  batch embedded (%d chunks, %d total)", len(batch), total)
+
+        # Workers put chunk batches on a bounded queue: a fast loader blocks
+        # until this process has embedded what it already sent, so at most
+        # ~(2 * workers + 1) batches are in memory whatever the file sizes.
+        # The manager is shut down before the pool is joined, so on error a
+        # worker blocked on a full queue fails instead of hanging the pool.
+        with ProcessPoolExecutor(
+            max_workers=workers
+        ) as loaders, multiprocessing.Manager() as manager, ThreadPoolExecutor(
+            max_workers=1
+        ) as writer:
+            batches = manager.Queue(maxsize=2 * workers)
+            futures = [
+                loaders.submit(
+                    _stream_file_chunks,
+                    fpath,
+                    key,
+                    dataset_name,
+                    extra_metadata,
+                    batch_size,
+                    batches,
+                )
+                for fpath, key, _fingerprint in todo
+            ]
+            fingerprints = {key: (fpath, fingerprint) for fpath, key, fingerprint in todo}
+            remaining = len(todo)
+
+            while remaining:
+                try:
+                    kind, key, payload = batches.get(timeout=1.0)
+                except queue.Empty:
+                    # A worker process that died cannot report through the queue
+                    for fut in futures:
+                        if fut.done() and fut.exception() is not None:
+                            for other in futures:
+                                other.cancel()
+                            raise fut.exception()
+                    continue
+
+                fpath, fingerprint = fingerprints[key]
+                if kind == "error":
+                    for fut in futures:
+                        fut.cancel()
+                    raise payload
+                update = updates.get(key)
+                if update is None:
+                    update = updates[key] = self.manifest.begin(
+                        key, dataset_name, fingerprint, extra_metadata=extra_metadata, force=force
+                    )
+                    # Before any of this source's chunks are queued for writing
+                    legacy_ids.extend(self._delete_unmanifested(update, fpath))
+                if kind == "done":
+                    remaining -= 1
+                    logger.info(
+                        "  loaded %s (%d unchanged chunks)", fpath, update.unchanged_chunks
+                    )
+                    continue
+
+                buffer.extend(update.filter(payload))
+                flush(batch_size)
+
+            flush(1)
+
+            if pending_write is not None:
+                pending_write.result()
+
+        # Record sources only once their chunks are safely written
+        for update in updates.values():
+            stale_ids.extend(update.commit())
+        self.vector_store.delete_documents(stale_ids)
+        self._publish_lexical(deleted=stale_ids + legacy_ids)
+
+        return {
+            "count": total,
+            "skipped": skipped,
+            "deleted": len(stale_ids) + len(legacy_ids),
+        }
+
+    def _write_batch(self, payload: Dict) -> None:
+        """
+        Upsert one embedded batch, then publish it to the lexical index.
+        """
+        self.vector_store.add_documents(**payload)
+        self._publish_lexical(
+            added=[
+                {"id": i, "text": t, "metadata": m}
+                for i, t, m in zip(payload["ids"], payload["texts"], payload["metadatas"])
+            ]
+        )
+
+    def _delete_unmanifested(self, update, source_path: str) -> List[str]:
+        """
+        Delete the chunks a source without a manifest entry already has in
+        the vector store, found by their `source` metadata; returns their
+        ids. They were written before the manifest (or under unqualified
+        chunk ids) and would otherwise stay next to the new copies.
+        """
+        if not update.is_new:
+            return []
+        spellings = {str(source_path), update.key}
+        try:
+            spellings.add(os.path.relpath(update.key))
+        except ValueError:  # Windows: different drive
+            pass
+        ids = self.vector_store.delete_where({"source": {"$in": sorted(spellings)}})
+        if ids:
+            logger.info(
+                "Deleted %d chunks of %s stored before it was tracked", len(ids), source_path
+            )
+        return ids
+
+    def _publish_lexical(
+        self,
+        added: Optional[List[Dict]] = None,
+        deleted: Optional[List[str]] = None,
+    ) -> None:
+        """
+        Publish added/deleted chunks to the on-disk BM25 index as a new
+        segment, so running retrievers can search them within
+        retrieval.bm25_refresh_seconds. The first publish indexes the whole
+        collection.
+        """
+        if self.lexical_writer is None or not (added or deleted):
+            return
+        try:
+            if not self.lexical_writer.exists():
+                self.lexical_writer.rebuild(self.vector_store.get_all_documents())
+            else:
+                self.lexical_writer.apply(added or [], deleted or [])
+        except Exception as e:
+            # Retrievers rebuild the index when its size disagrees with Chroma
+            logger.warning("Failed to publish BM25 index update: %s", e)
+
+    def _embed_batch_size(self) -> int:
+        ingest_cfg = self.settings.get("ingestion", {}) or {}
+        return max(1, int(ingest_cfg.get("embed_batch_size", DEFAULT_EMBED_BATCH_SIZE)))
+
+    def _embed_batch(self, batch: List[Dict]) -> Dict:
+        """
+        Embed one batch of chunks; returns kwargs for VectorStore.add_documents.
+        """
+        # Chroma rejects duplicate ids within a single upsert (e.g. a loader
+        # emitting the same doc id twice), so keep the last occurrence.
+        by_id = {d["id"]: d for d in batch}
+        batch = list(by_id.values())
+
+        texts = [d["text"] for d in batch]
+        return {
+            "ids": [d["id"] for d in batch],
+            "texts": texts,
+            "metadatas": [d["metadata"] for d in batch],
+            "embeddings": self.embedder.embed_texts(texts),
+        }
+
+    def _embed_and_write(
+        self,
+        batch: List[Dict],
+        writer: ThreadPoolExecutor,
+        pending_write: Optional[Future],
+    ) -> Future:
+        """
+        Embed one batch, then hand it to the writer thread.
+
+        At most one upsert is in flight: the previous write is awaited only after
+        this batch has been embedded, which keeps memory bounded and surfaces
+        write errors.
+        """
+        payload = self._embed_batch(batch)
+
+        if pending_write is not None:
+            pending_write.result()
+
+        return writer.submit(self._write_batch, payload)
+
+
+def _stream_file_chunks(
+    path: str,
+    key: str,
+    dataset_name: str,
+    extra_metadata: Optional[Dict],
+    batch_size: int,
+    batches,
+) -> None:
+    """
+    Process-pool worker: load + chunk one file (no embedding, no DB access)
+    and put its chunks on `batches` as ("chunks", key, [<= batch_size chunks]),
+    followed by ("done", key, None) or ("error", key, exception).
+    """
+    try:
+        # Sheets are parsed sequentially: this is already one of `workers`
+        # processes, and a sheet pool per worker would oversubscribe the CPU
+        docs = IngestionPipeline._load_docs_from_path(path, sheet_workers=1)
+        chunks = IngestionPipeline._chunk_docs(
+            docs, path, dataset_name, extra_metadata, source_key=key
+        )
+        for batch in _batched(chunks, batch_size):
+            batches.put(("chunks", key, batch))
+    except Exception as e:
+        batches.put(("error", key, e))
+        return
+    batches.put(("done", key, None))
+
+
+def _batched(items: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Group an iterable into lists of at most `size` items."""
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
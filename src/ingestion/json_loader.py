@@ -1,7 +1,19 @@
 # src/ingestion/json_loader.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 from pathlib import Path
 import json
+import logging
+import os
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+# Files at least this large are parsed incrementally (requires ijson).
+STREAM_MIN_BYTES = 16 * 1024 * 1024
 
 
 def _flatten_kv(obj: Any, prefix: str = "") -> List[str]:
@@ -24,14 +36,104 @@ def _flatten_kv(obj: Any, prefix: str = "") -> List[str]:
     return lines
 
 
-def load_json(path: str) -> List[Dict]:
+def _record_to_text(rec: Any) -> str:
+    if isinstance(rec, dict):
+        return " ".join(f"{k}: {v}" for k, v in rec.items())
+    # non-dict; just stringify
+    return str(rec)
+
+
+def _record_doc(
+    p: Path,
+    idx: int,
+    item: Any,
+    container_key: Optional[str] = None,
+    file_type: str = "json",
+) -> Dict:
+    metadata: Dict[str, Any] = {
+        "source": str(p),
+        "file_type": file_type,
+        "record_index": idx,
+    }
+    if container_key:
+        metadata["container_key"] = container_key
+        doc_id = f"{p.name}-{container_key}-{idx}"
+    else:
+        doc_id = f"{p.name}-{idx}"
+    return {"id": doc_id, "text": _record_to_text(item), "metadata": metadata}
+
+
+class _NoRecords(Exception):
+    """Top-level JSON is neither an array nor an object with a 'records' array."""
+
+
+def _stream_records(p: Path) -> Iterator[Dict]:
+    """
+    Event-driven parse of a top-level array (or the array under a top-level
+    'records' key): only one element is materialized at a time.
+
+    Raises _NoRecords (before yielding anything) for any other shape.
+    """
+    with p.open("rb") as f:
+        events = ijson.parse(f, use_float=True)
+        _, first_event, _ = next(events, ("", None, None))
+
+        if first_event == "start_array":
+            item_prefix, container_key = "item", None
+        elif first_event == "start_map":
+            # Skip over other top-level keys until the 'records' array starts
+            for prefix, event, _ in events:
+                if prefix == "records" and event == "start_array":
+                    break
+                if prefix == "" and event == "end_map":
+                    raise _NoRecords()
+            else:
+                raise _NoRecords()
+            item_prefix, container_key = "records.item", "records"
+        else:
+            raise _NoRecords()
+
+        for idx, item in enumerate(ijson.items(events, item_prefix)):
+            yield _record_doc(p, idx, item, container_key)
+
+
+def _docs_from_data(p: Path, data: Any) -> Iterator[Dict]:
+    # Case 1: top-level list -> treat each item as a record
+    if isinstance(data, list):
+        for idx, item in enumerate(data):
+            yield _record_doc(p, idx, item)
+        return
+
+    # Case 2: top-level dict with 'records' key that is a list
+    if isinstance(data, dict) and isinstance(data.get("records"), list):
+        for idx, item in enumerate(data["records"]):
+            yield _record_doc(p, idx, item, container_key="records")
+        return
+
+    # Fallback: flatten entire JSON into one doc
+    lines = _flatten_kv(data)
+    yield {
+        "id": p.name,
+        "text": "\n".join(lines),
+        "metadata": {
+            "source": str(p),
+            "file_type": "json",
+        },
+    }
+
+
+def load_json(path: str) -> Iterator[Dict]:
     """
-    Load a JSON file and convert it into a list of docs:
+    Load a JSON file and convert it into docs:
 
     - If top-level is a list of objects: each element -> one doc
     - If top-level has a key 'records' that is a list: each record -> one doc
     - Otherwise: flatten entire JSON into one doc.
 
+    Files >= STREAM_MIN_BYTES are parsed incrementally with ijson so only
+    one record is in memory at a time; smaller files (and the flatten
+    fallback) use json.load.
+
     Each doc:
     {
       "id": "<filename>-<index>",
@@ -40,70 +142,44 @@ def load_json(path: str) -> List[Dict]:
     }
     """
     p = Path(path)
+
+    if os.path.getsize(p) >= STREAM_MIN_BYTES:
+        if ijson is None:
+            logger.warning(
+                "ijson is not installed; loading %s fully into memory. "
+                "Install with `pip install ijson` for streaming JSON ingestion.",
+                path,
+            )
+        else:
+            try:
+                yield from _stream_records(p)
+                return
+            except _NoRecords:
+                logger.info("%s has no top-level record array; flattening it.", path)
+
     with p.open("r", encoding="utf-8") as f:
         data = json.load(f)
+    yield from _docs_from_data(p, data)
 
-    docs: List[Dict] = []
 
-    def record_to_text(rec: Dict[str, Any]) -> str:
-        parts = []
-        for k, v in rec.items():
-            parts.append(f"{k}: {v}")
-        return " ".join(parts)
-
-    # Case 1: top-level list -> treat each item as a record
-    if isinstance(data, list):
-        for idx, item in enumerate(data):
-            if isinstance(item, dict):
-                text = record_to_text(item)
-            else:
-                # non-dict; just stringify
-                text = str(item)
-            docs.append(
-                {
-                    "id": f"{p.name}-{idx}",
-                    "text": text,
-                    "metadata": {
-                        "source": str(path),
-                        "file_type": "json",
-                        "record_index": idx,
-                    },
-                }
-            )
-        return docs
-
-    # Case 2: top-level dict with 'records' key that is a list
-    if isinstance(data, dict) and isinstance(data.get("records"), list):
-        for idx, item in enumerate(data["records"]):
-            if isinstance(item, dict):
-                text = record_to_text(item)
-            else:
-                text = str(item)
-            docs.append(
-                {
-                    "id": f"{p.name}-records-{idx}",
-                    "text": text,
-                    "metadata": {
-                        "source": str(path),
-                        "file_type": "json",
-                        "record_index": idx,
-                        "container_key": "records",
-                    },
-                }
-            )
-        return docs
+def load_jsonl(path: str) -> Iterator[Dict]:
+    """
+    Stream a JSON Lines file: one doc per non-empty line.
 
-    # Fallback: flatten entire JSON into one doc
-    lines = _flatten_kv(data)
-    text = "\n".join(lines)
-    docs.append(
-        {
-            "id": p.name,
-            "text": text,
-            "metadata": {
-                "source": str(path),
-                "file_type": "json",
-            },
-        }
-    )
-    return docs
\ No newline at end of file
+    Docs mirror load_json's record docs ("<filename>-<index>", record_index),
+    with file_type "jsonl".
+    """
+    p = Path(path)
+    with p.open("r", encoding="utf-8") as f:
+        idx = 0
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning("Skipping invalid JSON on line %d of %s: %s", line_no, path, e)
+                continue
+            yield _record_doc(p, idx, item, file_type="jsonl")
+            idx += 1
@@ -0,0 +1,315 @@
+# src/ingestion/manifest.py
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from pathlib import Path
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from src.utils.config_loader import load_paths
+
+logger = logging.getLogger(__name__)
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+# Chunk id scheme recorded per source; entries written under an older
+# scheme are re-ingested. 2 = ids qualified by source_tag()
+ID_SCHEME = 2
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file's bytes in fixed-size blocks (constant memory)."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def doc_sha256(text: str, metadata: Dict[str, Any]) -> str:
+    """Hash a loaded document: its text plus the metadata we store with it."""
+    h = hashlib.sha256()
+    h.update(text.encode("utf-8", errors="ignore"))
+    h.update(json.dumps(metadata, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def settings_sha256(extra_metadata: Optional[Dict[str, Any]]) -> str:
+    """Hash of the caller-supplied metadata a source was ingested with."""
+    return hashlib.sha256(
+        json.dumps(extra_metadata or {}, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+def source_tag(key: str) -> str:
+    """
+    Short stable tag of a source key, used to qualify chunk ids: loaders
+    build ids from the file name only, which collides across folders.
+    """
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+
+class IngestionManifest:
+    """
+    Persistent record of what has been ingested, used to skip unchanged
+    sources and to find chunks that must be deleted from the vector store.
+
+    Stored as JSON (default: <db_dir>/ingest_manifest.json):
+
+        {
+          "<source key>": {
+            "dataset": "...",
+            "settings": "...",         # settings_sha256(extra_metadata)
+            "ids": 2,                  # ID_SCHEME
+            "mtime": 1700000000.0,     # local files only
+            "size": 1234,              # local files only
+            "sha256": "...",
+            "docs": {
+              "<doc id>": {"hash": "...", "chunk_ids": ["...", ...]}
+            }
+          }
+        }
+
+    A source is re-ingested when its content, dataset or extra metadata
+    changes (the latter two decide its RBAC visibility). Chunk ids are
+    reference-counted across sources, and only ids no source owns any
+    more are handed back for deletion.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            db_dir = load_paths().get("db_dir", "data/chroma_db")
+            path = str(Path(db_dir) / "ingest_manifest.json")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._sources: Dict[str, Dict[str, Any]] = self._read()
+        self._owners: Counter = Counter(
+            cid for entry in self._sources.values() for cid in _entry_ids(entry)
+        )
+
+    # -------- persistence -------- #
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8")) or {}
+        except Exception as e:
+            logger.warning("Ignoring unreadable ingestion manifest %s: %s", self.path, e)
+            return {}
+
+    def save(self) -> None:
+        """Write the manifest atomically (no-op if nothing changed)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps(self._sources, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+    # -------- source-level checks -------- #
+
+    @staticmethod
+    def source_key(path_or_url: str) -> str:
+        if path_or_url.startswith(("http://", "https://")):
+            return path_or_url
+        return str(Path(path_or_url).resolve())
+
+    def fingerprint(self, source_path: str, local: bool = True) -> Dict[str, Any]:
+        """Content hash (plus mtime/size for local files) of `source_path`."""
+        fp: Dict[str, Any] = {"sha256": file_sha256(source_path)}
+        if local:
+            st = os.stat(source_path)
+            fp.update({"mtime": st.st_mtime, "size": st.st_size})
+        return fp
+
+    def fingerprint_if_changed(
+        self,
+        key: str,
+        source_path: str,
+        local: bool = True,
+        dataset_name: str = "default",
+        extra_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return the fingerprint of `source_path`, or None if it matches the
+        recorded entry for `key` and was ingested with the same dataset and
+        extra metadata.
+
+        Local files are first compared by mtime/size (no read needed); the
+        content hash is only computed when those differ, so a touched but
+        identical file is still skipped.
+        """
+        entry = self._sources.get(key)
+        if entry and (
+            entry.get("dataset") != dataset_name
+            or entry.get("settings") != settings_sha256(extra_metadata)
+            or entry.get("ids") != ID_SCHEME
+        ):
+            return self.fingerprint(source_path, local=local)
+        if entry and local:
+            st = os.stat(source_path)
+            if entry.get("mtime") == st.st_mtime and entry.get("size") == st.st_size:
+                return None
+
+        fp = self.fingerprint(source_path, local=local)
+        if entry and entry.get("sha256") == fp["sha256"]:
+            # Same content: refresh mtime/size so the next check is stat-only
+            with self._lock:
+                entry.update(fp)
+                self._dirty = True
+            return None
+        return fp
+
+    def begin(
+        self,
+        key: str,
+        dataset_name: str,
+        fingerprint: Dict[str, Any],
+        extra_metadata: Optional[Dict[str, Any]] = None,
+        force: bool = False,
+    ) -> "SourceUpdate":
+        return SourceUpdate(
+            self, key, dataset_name, fingerprint, extra_metadata=extra_metadata, force=force
+        )
+
+    def commit(self, key: str, entry: Dict[str, Any]) -> List[str]:
+        """
+        Record `entry` for `key`; returns the chunk ids of the previous entry
+        that no source owns any more (to delete from the vector store).
+        """
+        with self._lock:
+            old = self._sources.get(key) or {}
+            self._sources[key] = entry
+            self._dirty = True
+            return self._release(_entry_ids(old), _entry_ids(entry))
+
+    def _release(self, old_ids: Iterable[str], new_ids: Iterable[str]) -> List[str]:
+        # Caller holds self._lock
+        self._owners.update(new_ids)
+        released = []
+        for cid in old_ids:
+            self._owners[cid] -= 1
+            if self._owners[cid] <= 0:
+                del self._owners[cid]
+                released.append(cid)
+        return released
+
+    # -------- removal of deleted sources -------- #
+
+    def missing_sources(self, folder: str) -> List[str]:
+        """Recorded local sources under `folder` that no longer exist on disk."""
+        root = str(Path(folder).resolve())
+        prefix = root.rstrip(os.sep) + os.sep
+        return [
+            key
+            for key in list(self._sources)
+            if key.startswith(prefix) and not os.path.exists(key)
+        ]
+
+    def remove(self, key: str) -> List[str]:
+        """
+        Forget a source and return the chunk ids it owned that no other
+        source owns.
+        """
+        with self._lock:
+            entry = self._sources.pop(key, None) or {}
+            self._dirty = True
+            return self._release(_entry_ids(entry), ())
+
+
+def _entry_ids(entry: Dict[str, Any]) -> set:
+    return {
+        cid
+        for doc in (entry.get("docs") or {}).values()
+        for cid in doc.get("chunk_ids", [])
+    }
+
+
+class SourceUpdate:
+    """
+    Diff of one source against its manifest entry.
+
+    Pass the source's chunks through `filter()`: chunks of documents whose
+    hash is unchanged are dropped, everything else is yielded for embedding.
+    Once the stream is consumed and written, `commit()` records the new
+    entry and returns the chunk ids to delete.
+
+    With force=True (or an entry from an older ID_SCHEME) every chunk is
+    yielded (full re-embed), but stale ids are still computed against the
+    previous entry. `is_new` is set when there is no previous entry: any
+    chunks the source already has in the vector store predate the manifest
+    and are unknown to it.
+    """
+
+    def __init__(
+        self,
+        manifest: IngestionManifest,
+        key: str,
+        dataset_name: str,
+        fingerprint: Dict[str, Any],
+        extra_metadata: Optional[Dict[str, Any]] = None,
+        force: bool = False,
+    ):
+        self.manifest = manifest
+        self.key = key
+        old = manifest._sources.get(key) or {}
+        self.is_new = not old
+        # Chunks of an older id scheme are re-embedded under their new ids
+        self.force = force or old.get("ids") != ID_SCHEME
+        self._old_docs: Dict[str, Dict[str, Any]] = old.get("docs") or {}
+        self._new_docs: Dict[str, Dict[str, Any]] = {}
+        self._entry: Dict[str, Any] = {
+            "dataset": dataset_name,
+            "settings": settings_sha256(extra_metadata),
+            "ids": ID_SCHEME,
+            **fingerprint,
+        }
+        self.unchanged_chunks = 0
+
+    def filter(self, chunks: Iterable[Dict]) -> Iterator[Dict]:
+        for ch in chunks:
+            doc_id = ch.get("doc_id", ch["id"])
+            doc_hash = ch.get("doc_hash")
+
+            new_doc = self._new_docs.get(doc_id)
+            if new_doc is None:
+                old_doc = self._old_docs.get(doc_id)
+                if (
+                    not self.force
+                    and old_doc is not None
+                    and doc_hash
+                    and old_doc.get("hash") == doc_hash
+                ):
+                    # Unchanged document: keep its existing chunks as-is
+                    new_doc = {"hash": doc_hash, "chunk_ids": list(old_doc["chunk_ids"])}
+                    new_doc["_unchanged"] = True
+                else:
+                    new_doc = {"hash": doc_hash, "chunk_ids": []}
+                self._new_docs[doc_id] = new_doc
+
+            if new_doc.get("_unchanged"):
+                self.unchanged_chunks += 1
+                continue
+
+            new_doc["chunk_ids"].append(ch["id"])
+            yield ch
+
+    def commit(self) -> List[str]:
+        """
+        Record the new entry; returns the previous chunk ids that are gone
+        and not owned by any other source.
+        """
+        self._entry["docs"] = {
+            doc_id: {"hash": doc["hash"], "chunk_ids": doc["chunk_ids"]}
+            for doc_id, doc in self._new_docs.items()
+        }
+        return self.manifest.commit(self.key, self._entry)
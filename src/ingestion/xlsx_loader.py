@@ -1,29 +1,112 @@
 # src/ingestion/xlsx_loader.py
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-import pandas as pd
+import multiprocessing
+import os
+import queue
 
+# Workbooks at least this large parse their sheets concurrently by default.
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+# Rows per batch sent back by a sheet worker, and batches a worker may get
+# ahead of the consumer before it blocks.
+ROW_BATCH_SIZE = 1000
+ROW_BATCHES_AHEAD = 2
 
-def load_xlsx(
-    path: str,
-    sheet_name: Optional[str] = None,
-) -> List[Dict]:
+
+def _column_names(header: Sequence) -> List[str]:
     """
-    Load an .xlsx/.xls file and convert each row into a text document
-    similar to csv_loader.
+    Header row -> column names, mirroring pandas: blank headers become
+    "Unnamed: <i>" and duplicates get ".1", ".2", ... suffixes.
+    """
+    names: List[str] = []
+    seen: Dict[str, int] = {}
+    for i, h in enumerate(header):
+        name = f"Unnamed: {i}" if h is None or str(h).strip() == "" else str(h)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
 
-    - Each row -> one doc
-    - Text: "col1: val1 col2: val2 ..."
-    - metadata: source, row_index, sheet_name, file_type
+
+def _iter_sheet(path: str, sheet_name: str) -> Iterator[Dict]:
+    """
+    Stream one sheet with openpyxl's read-only row iterator.
+
+    - First row is the header
+    - Each following row -> one doc ("col1: val1 col2: val2 ...", blanks skipped)
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _column_names(header)
+        fname = Path(path).name
+
+        for idx, row in enumerate(rows):
+            parts = []
+            for i, val in enumerate(row):
+                if val is None:
+                    continue
+                col = columns[i] if i < len(columns) else f"Unnamed: {i}"
+                parts.append(f"{col}: {val}")
+            if not parts:
+                continue
+
+            yield {
+                "id": f"{fname}-{sheet_name}-{idx}",
+                "text": " ".join(parts),
+                "metadata": {
+                    "source": str(path),
+                    "row_index": idx,
+                    "sheet_name": sheet_name,
+                    "file_type": "xlsx",
+                },
+            }
+    finally:
+        wb.close()
+
+
+def _stream_sheet(path: str, sheet_name: str, batches) -> None:
+    """
+    Process-pool worker: parse one sheet and put its rows on `batches` as
+    ("rows", [<= ROW_BATCH_SIZE docs]), then ("done", None) or
+    ("error", exception).
+    """
+    try:
+        rows = _iter_sheet(path, sheet_name)
+        while True:
+            batch = list(islice(rows, ROW_BATCH_SIZE))
+            if not batch:
+                break
+            batches.put(("rows", batch))
+    except Exception as e:
+        batches.put(("error", e))
+        return
+    batches.put(("done", None))
+
+
+def _load_xls(path: str, sheet_name: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Legacy .xls files (not readable by openpyxl): pandas, one sheet at a time.
     """
-    # Read all sheets or specific one
+    import pandas as pd
+
     if sheet_name is None:
-        xls = pd.read_excel(path, sheet_name=None)  # dict of sheet_name -> DataFrame
+        sheet_names = pd.ExcelFile(path).sheet_names
     else:
-        xls = {sheet_name: pd.read_excel(path, sheet_name=sheet_name)}
+        sheet_names = [sheet_name]
 
-    docs: List[Dict] = []
-    for sname, df in xls.items():
+    for sname in sheet_names:
+        df = pd.read_excel(path, sheet_name=sname)
         for idx, row in df.iterrows():
             parts = []
             for col in df.columns:
@@ -33,17 +116,90 @@ def load_xlsx(
                 parts.append(f"{col}: {val}")
             text = " ".join(parts)
 
-            docs.append(
-                {
-                    "id": f"{Path(path).name}-{sname}-{idx}",
-                    "text": text,
-                    "metadata": {
-                        "source": str(path),
-                        "row_index": int(idx),
-                        "sheet_name": sname,
-                        "file_type": "xlsx",
-                    },
-                }
-            )
-
-    return docs
\ No newline at end of file
+            yield {
+                "id": f"{Path(path).name}-{sname}-{idx}",
+                "text": text,
+                "metadata": {
+                    "source": str(path),
+                    "row_index": int(idx),
+                    "sheet_name": sname,
+                    "file_type": "xlsx",
+                },
+            }
+
+
+def load_xlsx(
+    path: str,
+    sheet_name: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> Iterator[Dict]:
+    """
+    Stream an .xlsx/.xls file, converting each row into a text document
+    similar to csv_loader.
+
+    - Each row -> one doc
+    - Text: "col1: val1 col2: val2 ..."
+    - metadata: source, row_index, sheet_name, file_type
+
+    .xlsx is read with openpyxl in read-only mode, so rows are yielded lazily
+    instead of loading every sheet into memory. With workers > 1 (default for
+    multi-sheet workbooks >= PARALLEL_MIN_BYTES) sheets are parsed concurrently
+    in a process pool and yielded sheet by sheet, in workbook order. Each
+    worker sends rows back in bounded batches and blocks once it is
+    ROW_BATCHES_AHEAD batches ahead, so memory stays bounded by the batch
+    size rather than the size of a sheet. Callers that are themselves pool
+    workers (folder ingestion) pass workers=1.
+    """
+    if Path(path).suffix.lower() == ".xls":
+        yield from _load_xls(path, sheet_name)
+        return
+
+    if sheet_name is not None:
+        yield from _iter_sheet(path, sheet_name)
+        return
+
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True)
+    try:
+        sheet_names = list(wb.sheetnames)
+    finally:
+        wb.close()
+
+    if workers is None:
+        large = os.path.getsize(path) >= PARALLEL_MIN_BYTES
+        workers = min(len(sheet_names), os.cpu_count() or 1) if large else 1
+
+    if workers <= 1 or len(sheet_names) <= 1:
+        for sname in sheet_names:
+            yield from _iter_sheet(path, sname)
+        return
+
+    # One bounded queue per sheet: sheets are started in workbook order, so
+    # the sheet being yielded is always running while later ones wait on
+    # their own full queue. The manager is shut down before the pool is
+    # joined, so if the caller stops early blocked workers fail, not hang.
+    with ProcessPoolExecutor(max_workers=workers) as pool, multiprocessing.Manager() as manager:
+        queues = [manager.Queue(maxsize=ROW_BATCHES_AHEAD) for _ in sheet_names]
+        futures = [
+            pool.submit(_stream_sheet, path, sname, q)
+            for sname, q in zip(sheet_names, queues)
+        ]
+        try:
+            for q, fut in zip(queues, futures):
+                while True:
+                    try:
+                        kind, payload = q.get(timeout=1.0)
+                    except queue.Empty:
+                        # A worker process that died cannot report through the queue
+                        if fut.done() and fut.exception() is not None:
+                            raise fut.exception()
+                        continue
+                    if kind == "done":
+                        break
+                    if kind == "error":
+                        raise payload
+                    yield from payload
+        finally:
+            for fut in futures:
+                fut.cancel()
@@ -1,14 +1,26 @@
 import os
 import logging
-from typing import List, Dict
+import threading
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
 
+from src.utils.concurrency_limiter import ConcurrencyLimiter
 from src.utils.config_loader import load_settings, load_model_config
 from src.llm.ollama_client import OllamaClient
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MAX_CONCURRENCY = 8
+
 
 class LLMGenerator:
+    """
+    Reentrant: one instance serves concurrent threads and coroutines.
+    Sampling parameters are passed down per call (the instance defaults are
+    never swapped), clients are created once under a lock, and in-flight
+    calls per provider are capped by settings.yaml:llm.max_concurrency
+    (sync and async calls share the cap; extra callers queue).
+    """
+
     def __init__(self):
         self.settings = load_settings()
         self.model_cfg = load_model_config()
@@ -16,7 +28,17 @@ class LLMGenerator:
         self.max_tokens = self.settings.get("llm", {}).get("max_tokens", 512)
         self.temperature = self.settings.get("llm", {}).get("temperature", 0.1)
 
+        limits = self.settings.get("llm", {}).get("max_concurrency", {}) or {}
+        self._limiters = {
+            provider: ConcurrencyLimiter(
+                limits.get(provider, DEFAULT_MAX_CONCURRENCY), name=f"llm-{provider}"
+            )
+            for provider in ("groq", "ollama")
+        }
+
+        self._client_lock = threading.Lock()
         self._groq_client = None
+        self._async_groq_client = None
         self._ollama_client = None
 
     def _get_groq_client(self):
@@ -25,22 +47,49 @@ class LLMGenerator:
         api_key = os.getenv("GROQ_API_KEY")
         if not api_key:
             return None
-        try:
-            from groq import Groq
+        with self._client_lock:
+            if self._groq_client is not None:
+                return self._groq_client
+            try:
+                from groq import Groq
 
-            self._groq_client = Groq(api_key=api_key)
-            return self._groq_client
-        except Exception as e:
-            logger.warning("Failed to init Groq client: %s", e)
+                self._groq_client = Groq(api_key=api_key)
+                return self._groq_client
+            except Exception as e:
+                logger.warning("Failed to init Groq client: %s", e)
+                return None
+
+    def _get_async_groq_client(self):
+        if self._async_groq_client is not None:
+            return self._async_groq_client
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
             return None
+        with self._client_lock:
+            if self._async_groq_client is not None:
+                return self._async_groq_client
+            try:
+                from groq import AsyncGroq
+
+                self._async_groq_client = AsyncGroq(api_key=api_key)
+                return self._async_groq_client
+            except Exception as e:
+                logger.warning("Failed to init async Groq client: %s", e)
+                return None
 
     def _get_ollama_client(self):
         if self._ollama_client is None:
-            self._ollama_client = OllamaClient()
+            with self._client_lock:
+                if self._ollama_client is None:
+                    self._ollama_client = OllamaClient()
         return self._ollama_client
 
     def _call_groq(
-        self, system_prompt: str, messages: List[Dict[str, str]]
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
     ) -> str:
         client = self._get_groq_client()
         if not client:
@@ -51,30 +100,185 @@ class LLMGenerator:
         )
 
         logger.info("Using Groq LLM with model %s", model_name)
-        self.last_provider_used = ("groq", model_name)
 
-        resp = client.chat.completions.create(
-            model=model_name,
-            messages=[{"role": "system", "content": system_prompt}] + messages,
-            max_tokens=self.max_tokens,
-            temperature=self.temperature,
+        with self._limiters["groq"]:
+            resp = client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "system", "content": system_prompt}] + messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+        return resp.choices[0].message.content
+
+    def _call_ollama(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        client = self._get_ollama_client()
+        model_name = client.model_name
+
+        logger.info("Using Ollama LLM (TinyLLaMA) with model %s", model_name)
+        with self._limiters["ollama"]:
+            return client.generate(
+                system_prompt=system_prompt,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+
+    def _stream_groq(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+    ) -> Iterator[str]:
+        client = self._get_groq_client()
+        if not client:
+            raise RuntimeError("Groq client not available")
+
+        model_name = self.model_cfg.get("llm", {}).get("groq", {}).get(
+            "model_name", "llama-3.3-70b-versatile"
+        )
+
+        logger.info("Streaming from Groq LLM with model %s", model_name)
+
+        # The slot is held until the stream is exhausted or closed
+        with self._limiters["groq"]:
+            stream = client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "system", "content": system_prompt}] + messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+
+    def _stream_ollama(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+    ) -> Iterator[str]:
+        client = self._get_ollama_client()
+        model_name = client.model_name
+
+        logger.info("Streaming from Ollama LLM (TinyLLaMA) with model %s", model_name)
+        with self._limiters["ollama"]:
+            yield from client.generate_stream(
+                system_prompt=system_prompt,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+
+    # ---- Async variants ---- #
+
+    async def _acall_groq(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        client = self._get_async_groq_client()
+        if not client:
+            raise RuntimeError("Groq client not available")
+
+        model_name = self.model_cfg.get("llm", {}).get("groq", {}).get(
+            "model_name", "llama-3.3-70b-versatile"
         )
+
+        logger.info("Using Groq LLM (async) with model %s", model_name)
+
+        async with self._limiters["groq"]:
+            resp = await client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "system", "content": system_prompt}] + messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
         return resp.choices[0].message.content
 
-    # def _call_ollama(
-    #     self, system_prompt: str, messages: List[Dict[str, str]]
-    # ) -> str:
-    #     client = self._get_ollama_client()
-    #     model_name = client.model_name
-
-    #     logger.info("Using Ollama LLM (TinyLLaMA) with model %s", model_name)
-    #     self.last_provider_used = ("ollama", model_name)
-    #     return client.generate(
-    #         system_prompt=system_prompt,
-    #         messages=messages,
-    #         max_tokens=self.max_tokens,
-    #         temperature=self.temperature,
-    #     )
+    async def _acall_ollama(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+    ) -> str:
+        client = self._get_ollama_client()
+        model_name = client.model_name
+
+        logger.info("Using Ollama LLM (TinyLLaMA, async) with model %s", model_name)
+        async with self._limiters["ollama"]:
+            return await client.agenerate(
+                system_prompt=system_prompt,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            )
+
+    async def _astream_groq(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+    ) -> AsyncIterator[str]:
+        client = self._get_async_groq_client()
+        if not client:
+            raise RuntimeError("Groq client not available")
+
+        model_name = self.model_cfg.get("llm", {}).get("groq", {}).get(
+            "model_name", "llama-3.3-70b-versatile"
+        )
+
+        logger.info("Streaming from Groq LLM (async) with model %s", model_name)
+
+        async with self._limiters["groq"]:
+            stream = await client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "system", "content": system_prompt}] + messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+            )
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield delta
+
+    async def _astream_ollama(
+        self,
+        system_prompt: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int,
+        temperature: float,
+    ) -> AsyncIterator[str]:
+        client = self._get_ollama_client()
+        model_name = client.model_name
+
+        logger.info("Streaming from Ollama LLM (TinyLLaMA, async) with model %s", model_name)
+        async with self._limiters["ollama"]:
+            async for token in client.agenerate_stream(
+                system_prompt=system_prompt,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+            ):
+                yield token
 
     def generate_text(
         self,
@@ -95,21 +299,11 @@ class LLMGenerator:
                 if provider == "groq":
                     if not self._get_groq_client():
                         continue
-                    old_max, old_temp = self.max_tokens, self.temperature
-                    self.max_tokens, self.temperature = max_tokens, temperature
-                    try:
-                        return self._call_groq(system_prompt, messages)
-                    finally:
-                        self.max_tokens, self.temperature = old_max, old_temp
-
-                # elif provider == "ollama":
-                #     # Ollama is local; assume always available once client is created
-                #     old_max, old_temp = self.max_tokens, self.temperature
-                #     self.max_tokens, self.temperature = max_tokens, temperature
-                #     try:
-                #         return self._call_ollama(system_prompt, messages)
-                #     finally:
-                #         self.max_tokens, self.temperature = old_max, old_temp
+                    return self._call_groq(system_prompt, messages, max_tokens, temperature)
+
+                elif provider == "ollama":
+                    # Ollama is local; assume always available once client is created
+                    return self._call_ollama(system_prompt, messages, max_tokens, temperature)
 
             except Exception as e:
                 logger.warning("LLM provider %s failed in generate_text: %s", provider, e)
@@ -117,14 +311,12 @@ class LLMGenerator:
 
         raise RuntimeError(f"No LLM provider available for generate_text. Last error: {last_error}")
 
-    def generate_answer(
-        self,
-        question: str,
-        context_docs: List[Dict],
-        hr_domain: str = "it_assets",
-    ) -> str:
+    @staticmethod
+    def _rag_prompt(
+        question: str, context_docs: List[Dict]
+    ) -> Tuple[str, List[Dict[str, str]]]:
         """
-        RAG-style prompt. Only use context_docs as knowledge.
+        (system_prompt, messages) shared by generate_answer and stream_answer.
         """
         system_prompt = (
             "You are an IT assets assistant. "
@@ -152,7 +344,18 @@ class LLMGenerator:
             "Now answer the question using only this context."
         )
 
-        messages = [{"role": "user", "content": user_content}]
+        return system_prompt, [{"role": "user", "content": user_content}]
+
+    def generate_answer(
+        self,
+        question: str,
+        context_docs: List[Dict],
+        hr_domain: str = "it_assets",
+    ) -> str:
+        """
+        RAG-style prompt. Only use context_docs as knowledge.
+        """
+        system_prompt, messages = self._rag_prompt(question, context_docs)
 
         # Try providers in priority order, fall back if needed
         last_error = None
@@ -161,11 +364,158 @@ class LLMGenerator:
                 if provider == "groq":
                     if not self._get_groq_client():
                         continue
-                    return self._call_groq(system_prompt, messages)
-                # elif provider == "ollama":
-                #     return self._call_ollama(system_prompt, messages)
+                    return self._call_groq(
+                        system_prompt, messages, self.max_tokens, self.temperature
+                    )
+                elif provider == "ollama":
+                    return self._call_ollama(
+                        system_prompt, messages, self.max_tokens, self.temperature
+                    )
+            except Exception as e:
+                logger.warning("LLM provider %s failed: %s", provider, e)
+                last_error = e
+
+        raise RuntimeError(f"No LLM provider available. Last error: {last_error}")
+
+    def stream_answer(
+        self,
+        question: str,
+        context_docs: List[Dict],
+        hr_domain: str = "it_assets",
+    ) -> Iterator[str]:
+        """
+        Same prompt and provider fallback as generate_answer, but yields
+        answer text as the provider produces it. A provider is only skipped
+        if it fails before its first token; later errors propagate.
+        """
+        system_prompt, messages = self._rag_prompt(question, context_docs)
+
+        last_error = None
+        for provider in self.providers:
+            if provider == "groq":
+                if not self._get_groq_client():
+                    continue
+                stream = self._stream_groq(
+                    system_prompt, messages, self.max_tokens, self.temperature
+                )
+            elif provider == "ollama":
+                stream = self._stream_ollama(
+                    system_prompt, messages, self.max_tokens, self.temperature
+                )
+            else:
+                continue
+
+            try:
+                first = next(stream, None)
+            except Exception as e:
+                logger.warning("LLM provider %s failed: %s", provider, e)
+                last_error = e
+                continue
+            if first is not None:
+                yield first
+            yield from stream
+            return
+
+        raise RuntimeError(f"No LLM provider available. Last error: {last_error}")
+
+    async def agenerate_text(
+        self,
+        system_prompt: str,
+        user_content: str,
+        max_tokens: int = 128,
+        temperature: float = 0.1,
+    ) -> str:
+        """
+        generate_text() for coroutines (async Groq / Ollama clients).
+        """
+        messages = [{"role": "user", "content": user_content}]
+        last_error = None
+
+        for provider in self.providers:
+            try:
+                if provider == "groq":
+                    if not self._get_async_groq_client():
+                        continue
+                    return await self._acall_groq(
+                        system_prompt, messages, max_tokens, temperature
+                    )
+                elif provider == "ollama":
+                    return await self._acall_ollama(
+                        system_prompt, messages, max_tokens, temperature
+                    )
+            except Exception as e:
+                logger.warning("LLM provider %s failed in agenerate_text: %s", provider, e)
+                last_error = e
+
+        raise RuntimeError(f"No LLM provider available for generate_text. Last error: {last_error}")
+
+    async def agenerate_answer(
+        self,
+        question: str,
+        context_docs: List[Dict],
+        hr_domain: str = "it_assets",
+    ) -> str:
+        """
+        generate_answer() for coroutines (async Groq / Ollama clients).
+        """
+        system_prompt, messages = self._rag_prompt(question, context_docs)
+
+        last_error = None
+        for provider in self.providers:
+            try:
+                if provider == "groq":
+                    if not self._get_async_groq_client():
+                        continue
+                    return await self._acall_groq(
+                        system_prompt, messages, self.max_tokens, self.temperature
+                    )
+                elif provider == "ollama":
+                    return await self._acall_ollama(
+                        system_prompt, messages, self.max_tokens, self.temperature
+                    )
+            except Exception as e:
+                logger.warning("LLM provider %s failed: %s", provider, e)
+                last_error = e
+
+        raise RuntimeError(f"No LLM provider available. Last error: {last_error}")
+
+    async def astream_answer(
+        self,
+        question: str,
+        context_docs: List[Dict],
+        hr_domain: str = "it_assets",
+    ) -> AsyncIterator[str]:
+        """
+        stream_answer() for coroutines, with the same fallback rule.
+        """
+        system_prompt, messages = self._rag_prompt(question, context_docs)
+
+        last_error = None
+        for provider in self.providers:
+            if provider == "groq":
+                if not self._get_async_groq_client():
+                    continue
+                stream = self._astream_groq(
+                    system_prompt, messages, self.max_tokens, self.temperature
+                )
+            elif provider == "ollama":
+                stream = self._astream_ollama(
+                    system_prompt, messages, self.max_tokens, self.temperature
+                )
+            else:
+                continue
+
+            try:
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                return
             except Exception as e:
                 logger.warning("LLM provider %s failed: %s", provider, e)
                 last_error = e
+                continue
+            yield first
+            async for token in stream:
+                yield token
+            return
 
-        raise RuntimeError(f"No LLM provider available. Last error: {last_error}")
\ No newline at end of file
+        raise RuntimeError(f"No LLM provider available. Last error: {last_error}")
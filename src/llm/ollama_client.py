@@ -1,17 +1,24 @@
-import requests
-from typing import List, Dict, Optional
+import json
+from typing import AsyncIterator, Iterator, List, Dict
 from src.utils.config_loader import load_model_config
+from src.utils.http_transport import async_http_client, http_session
 
 
 class OllamaClient:
     """
     Simple client for local Ollama TinyLLaMA.
+
+    Requests go through the shared keep-alive transport (http_transport),
+    and ask Ollama to keep the model loaded for `keep_alive`
+    (model.yaml:llm.ollama.keep_alive) so short calls do not pay a reload.
     """
 
     def __init__(self, base_url: str = "http://localhost:11434"):
         self.base_url = base_url.rstrip("/")
         cfg = load_model_config()
-        self.model_name = cfg.get("llm", {}).get("ollama", {}).get("model_name", "tinyllama")
+        ollama_cfg = cfg.get("llm", {}).get("ollama", {})
+        self.model_name = ollama_cfg.get("model_name", "tinyllama")
+        self.keep_alive = ollama_cfg.get("keep_alive", "30m")
 
     def generate(
         self, system_prompt: str, messages: List[Dict[str, str]], max_tokens: int = 512, temperature: float = 0.1
@@ -23,10 +30,90 @@ class OllamaClient:
         payload = {
             "model": self.model_name,
             "messages": [{"role": "system", "content": system_prompt}] + messages,
-            "options": {"temperature": temperature},
+            "options": {"temperature": temperature, "num_predict": max_tokens},
             "stream": False,
+            "keep_alive": self.keep_alive,
         }
-        resp = requests.post(f"{self.base_url}/api/chat", json=payload, timeout=120)
+        resp = http_session().post(f"{self.base_url}/api/chat", json=payload, timeout=120)
         resp.raise_for_status()
         data = resp.json()
-        return data["message"]["content"]
\ No newline at end of file
+        return data["message"]["content"]
+
+    def generate_stream(
+        self, system_prompt: str, messages: List[Dict[str, str]], max_tokens: int = 512, temperature: float = 0.1
+    ) -> Iterator[str]:
+        """
+        Like generate(), but yields the answer text chunk by chunk as Ollama
+        produces it (one JSON object per line with "stream": true).
+        """
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "system", "content": system_prompt}] + messages,
+            "options": {"temperature": temperature, "num_predict": max_tokens},
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        with http_session().post(
+            f"{self.base_url}/api/chat", json=payload, timeout=120, stream=True
+        ) as resp:
+            resp.raise_for_status()
+            for line in resp.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"Ollama error: {data['error']}")
+                content = data.get("message", {}).get("content")
+                if content:
+                    yield content
+                if data.get("done"):
+                    break
+
+    async def agenerate(
+        self, system_prompt: str, messages: List[Dict[str, str]], max_tokens: int = 512, temperature: float = 0.1
+    ) -> str:
+        """
+        generate() for coroutines: waits on Ollama without holding a thread.
+        """
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "system", "content": system_prompt}] + messages,
+            "options": {"temperature": temperature, "num_predict": max_tokens},
+            "stream": False,
+            "keep_alive": self.keep_alive,
+        }
+        resp = await async_http_client().post(
+            f"{self.base_url}/api/chat", json=payload, timeout=120
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data["message"]["content"]
+
+    async def agenerate_stream(
+        self, system_prompt: str, messages: List[Dict[str, str]], max_tokens: int = 512, temperature: float = 0.1
+    ) -> AsyncIterator[str]:
+        """
+        generate_stream() for coroutines.
+        """
+        payload = {
+            "model": self.model_name,
+            "messages": [{"role": "system", "content": system_prompt}] + messages,
+            "options": {"temperature": temperature, "num_predict": max_tokens},
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        async with async_http_client().stream(
+            "POST", f"{self.base_url}/api/chat", json=payload, timeout=120
+        ) as resp:
+            resp.raise_for_status()
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise RuntimeError(f"Ollama error: {data['error']}")
+                content = data.get("message", {}).get("content")
+                if content:
+                    yield content
+                if data.get("done"):
+                    break
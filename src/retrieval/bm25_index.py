@@ -0,0 +1,457 @@
+# src/retrieval/bm25_index.py
+
+from __future__ import annotations
+
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import json
+import math
+
+import numpy as np
+
+DEFAULT_K1 = 1.5
+DEFAULT_B = 0.75
+DEFAULT_EPSILON = 0.25
+
+FORMAT_VERSION = 2
+_ARRAYS = ("offsets", "doc_ids", "tfs", "doc_len", "term_max_tf", "term_min_len")
+
+# Relative slack when comparing bounds, so float rounding never prunes a
+# doc that ties the k-th score.
+_PRUNE_SLACK = 1e-9
+
+
+class BM25Segment:
+    """
+    Immutable postings for one batch of docs (CSR, one row per term).
+
+    Holds only per-segment data; collection-wide statistics (N, avgdl, df,
+    idf) are computed by BM25Index over all live segments, so segments can
+    be added, tombstoned and merged independently.
+
+      - offsets       int64 [T + 1]  postings of term t: offsets[t]:offsets[t+1]
+      - doc_ids       int32 [P]      local doc index, ascending within a term
+      - tfs           int32 [P]
+      - doc_len       int32 [N]      tokens per doc
+      - term_max_tf   int32 [T]      per-term max tf  } score upper bounds
+      - term_min_len  int32 [T]      per-term min len }
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        tfs: np.ndarray,
+        doc_len: np.ndarray,
+        term_max_tf: np.ndarray,
+        term_min_len: np.ndarray,
+    ):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.term_max_tf = term_max_tf
+        self.term_min_len = term_min_len
+
+    @property
+    def num_docs(self) -> int:
+        return len(self.doc_len)
+
+    @classmethod
+    def build(cls, corpus_tokens: Sequence[Sequence[str]]) -> "BM25Segment":
+        n_docs = len(corpus_tokens)
+        vocab: Dict[str, int] = {}
+        term_docs: List[List[int]] = []
+        term_tfs: List[List[int]] = []
+        doc_len = np.zeros(n_docs, dtype=np.int32)
+
+        for d, tokens in enumerate(corpus_tokens):
+            doc_len[d] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                t = vocab.get(term)
+                if t is None:
+                    t = vocab[term] = len(term_docs)
+                    term_docs.append([])
+                    term_tfs.append([])
+                term_docs[t].append(d)
+                term_tfs[t].append(tf)
+
+        n_terms = len(term_docs)
+        df = np.fromiter((len(p) for p in term_docs), dtype=np.int64, count=n_terms)
+        offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(df, out=offsets[1:])
+        n_postings = int(offsets[-1])
+        doc_ids = np.fromiter(
+            (d for p in term_docs for d in p), dtype=np.int32, count=n_postings
+        )
+        tfs = np.fromiter((tf for p in term_tfs for tf in p), dtype=np.int32, count=n_postings)
+
+        term_max_tf = np.zeros(n_terms, dtype=np.int32)
+        term_min_len = np.zeros(n_terms, dtype=np.int32)
+        if n_terms:
+            starts = offsets[:-1]
+            term_max_tf[:] = np.maximum.reduceat(tfs, starts)
+            term_min_len[:] = np.minimum.reduceat(doc_len[doc_ids], starts)
+
+        return cls(vocab, offsets, doc_ids, tfs, doc_len, term_max_tf, term_min_len)
+
+    def df(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def postings(self, t: int) -> Tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.offsets[t], self.offsets[t + 1]
+        return self.doc_ids[lo:hi], self.tfs[lo:hi]
+
+    def live_df(self, live: np.ndarray) -> np.ndarray:
+        """Per-term count of postings whose doc is live."""
+        if not len(self.doc_ids):
+            return np.zeros(len(self.vocab), dtype=np.int64)
+        hit = live[self.doc_ids].astype(np.int64)
+        out = np.zeros(len(self.vocab), dtype=np.int64)
+        nonempty = self.offsets[1:] > self.offsets[:-1]
+        out[nonempty] = np.add.reduceat(hit, self.offsets[:-1][nonempty])
+        return out
+
+    # -------- persistence -------- #
+
+    def save(self, directory: str) -> None:
+        """
+        Write one .npy file per array plus vocab.json and index_meta.json,
+        so load() can memory-map them.
+        """
+        d = Path(directory)
+        d.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(d / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        (d / "vocab.json").write_text(json.dumps(self.vocab), encoding="utf-8")
+        (d / "index_meta.json").write_text(
+            json.dumps(
+                {
+                    "format_version": FORMAT_VERSION,
+                    "num_docs": self.num_docs,
+                    "num_terms": len(self.vocab),
+                }
+            ),
+            encoding="utf-8",
+        )
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> "BM25Segment":
+        """
+        Load a segment written by save(). With mmap=True the arrays are
+        read-only memory maps, so pages are shared by every process that
+        opens the same files.
+        """
+        d = Path(directory)
+        meta = json.loads((d / "index_meta.json").read_text(encoding="utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported BM25 index format {meta.get('format_version')} in {d}"
+            )
+        arrays = {name: _load_array(d / f"{name}.npy", mmap) for name in _ARRAYS}
+        vocab = json.loads((d / "vocab.json").read_text(encoding="utf-8"))
+        return cls(vocab, **arrays)
+
+
+class BM25Index:
+    """
+    Searchable BM25 (Okapi / ATIRE idf with epsilon floor) over segments.
+
+    `deleted[i]` holds tombstoned local doc indices of segment i. Scores are
+    identical to rank_bm25.BM25Okapi(live_docs).get_scores for the live docs
+    in segment order: idf log(N - df + 0.5) - log(df + 0.5) with negative
+    values floored to epsilon * mean idf, length norm
+    k1 * (1 - b + b * len / avgdl), query terms summed in query order
+    (repeated terms count twice).
+
+    search() runs a MaxScore-style top-k per segment: terms are visited in
+    decreasing upper-bound order and, once the remaining terms can no
+    longer lift an unseen doc above the current k-th score, only
+    already-seen candidates are updated (and hopeless ones dropped). Only
+    postings of query terms are touched; non-matching docs are never
+    scored. Instances are immutable snapshots, safe to share across threads.
+    """
+
+    def __init__(
+        self,
+        segments: Sequence[BM25Segment],
+        deleted: Optional[Sequence[Optional[np.ndarray]]] = None,
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+        epsilon: float = DEFAULT_EPSILON,
+    ):
+        self.segments = list(segments)
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+
+        deleted = list(deleted or [None] * len(self.segments))
+        self.live: List[Optional[np.ndarray]] = []
+        self.seg_starts: List[int] = []
+        seg_df: List[np.ndarray] = []
+        n_live = 0
+        total_len = 0
+        start = 0
+        for seg, dead in zip(self.segments, deleted):
+            self.seg_starts.append(start)
+            start += seg.num_docs
+            if dead is not None and len(dead):
+                live = np.ones(seg.num_docs, dtype=bool)
+                live[np.asarray(dead, dtype=np.int64)] = False
+                self.live.append(live)
+                seg_df.append(seg.live_df(live))
+                n_live += int(live.sum())
+                total_len += int(seg.doc_len[live].sum(dtype=np.int64))
+            else:
+                self.live.append(None)
+                seg_df.append(seg.df())
+                n_live += seg.num_docs
+                total_len += int(seg.doc_len.sum(dtype=np.int64))
+        self.num_docs = n_live
+        self.num_slots = start
+        self.avgdl = (total_len / n_live) if n_live else 0.0
+
+        # Collection df: the first segment (the large merged base) keeps an
+        # array keyed by its term ids, other segments add into a dict.
+        if self.segments:
+            self._df_main = seg_df[0].astype(np.int64, copy=True)
+            self._vocab_main = self.segments[0].vocab
+        else:
+            self._df_main = np.zeros(0, dtype=np.int64)
+            self._vocab_main = {}
+        self._df_other: Dict[str, int] = {}
+        for seg, df in zip(self.segments[1:], seg_df[1:]):
+            for term, t in seg.vocab.items():
+                c = int(df[t])
+                if not c:
+                    continue
+                m = self._vocab_main.get(term)
+                if m is not None:
+                    self._df_main[m] += c
+                else:
+                    self._df_other[term] = self._df_other.get(term, 0) + c
+
+        all_df = np.concatenate(
+            [self._df_main, np.fromiter(self._df_other.values(), dtype=np.int64)]
+        )
+        all_df = all_df[all_df > 0]
+        if len(all_df):
+            idf = np.log(n_live - all_df + 0.5) - np.log(all_df + 0.5)
+            self._eps = self.epsilon * float(idf.sum()) / len(all_df)
+        else:
+            self._eps = 0.0
+        self._idf_cache: Dict[str, float] = {}
+
+        if self.avgdl:
+            self.norms = [
+                self.k1 * (1 - self.b + self.b * seg.doc_len / self.avgdl)
+                for seg in self.segments
+            ]
+        else:
+            self.norms = [
+                np.full(seg.num_docs, self.k1 * (1 - self.b)) for seg in self.segments
+            ]
+
+    @classmethod
+    def build(
+        cls,
+        corpus_tokens: Sequence[Sequence[str]],
+        k1: float = DEFAULT_K1,
+        b: float = DEFAULT_B,
+        epsilon: float = DEFAULT_EPSILON,
+    ) -> "BM25Index":
+        """Single-segment index over `corpus_tokens`."""
+        return cls([BM25Segment.build(corpus_tokens)], k1=k1, b=b, epsilon=epsilon)
+
+    # -------- statistics -------- #
+
+    def df(self, term: str) -> int:
+        m = self._vocab_main.get(term)
+        main = int(self._df_main[m]) if m is not None else 0
+        return main + self._df_other.get(term, 0)
+
+    def idf(self, term: str) -> float:
+        v = self._idf_cache.get(term)
+        if v is None:
+            df = self.df(term)
+            if not df:
+                v = 0.0
+            else:
+                v = math.log(self.num_docs - df + 0.5) - math.log(df + 0.5)
+                if v < 0:
+                    v = self._eps
+            self._idf_cache[term] = v
+        return v
+
+    def _tf_part(self, tf, norm):
+        return tf * (self.k1 + 1) / (tf + norm)
+
+    # -------- query -------- #
+
+    def search(
+        self,
+        query_tokens: Sequence[str],
+        top_k: int,
+        allowed: Optional[Callable[[int], bool]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (doc slot, score) among live docs matching at least one query
+        term, highest score first (ties: lower slot first). Slots number
+        docs across segments (segment i starts at seg_starts[i]).
+        `allowed(slot)` restricts the result set and is evaluated lazily on
+        candidates.
+        """
+        if top_k <= 0 or not self.num_docs:
+            return []
+        weights = Counter(t for t in query_tokens if self.df(t))
+        if not weights:
+            return []
+
+        results: List[Tuple[int, float]] = []
+        for i, seg in enumerate(self.segments):
+            results.extend(self._search_segment(i, seg, query_tokens, weights, top_k, allowed))
+        results.sort(key=lambda r: (-r[1], r[0]))
+        return results[:top_k]
+
+    def _search_segment(
+        self,
+        seg_no: int,
+        seg: BM25Segment,
+        query_tokens: Sequence[str],
+        weights: Counter,
+        top_k: int,
+        allowed: Optional[Callable[[int], bool]],
+    ) -> List[Tuple[int, float]]:
+        base = self.seg_starts[seg_no]
+        live = self.live[seg_no]
+        norms = self.norms[seg_no]
+
+        terms = {term: seg.vocab[term] for term in weights if term in seg.vocab}
+        if not terms:
+            return []
+
+        allowed_cache: Dict[int, bool] = {}
+
+        def is_allowed(d: int) -> bool:
+            ok = allowed_cache.get(d)
+            if ok is None:
+                ok = allowed_cache[d] = bool(allowed(base + d))
+            return ok
+
+        ub: Dict[str, float] = {}
+        for term, t in terms.items():
+            norm_min = self.k1 * (
+                1 - self.b + self.b * int(seg.term_min_len[t]) / self.avgdl
+            )
+            ub[term] = (
+                weights[term]
+                * self.idf(term)
+                * self._tf_part(int(seg.term_max_tf[t]), norm_min)
+            )
+        # Pruning needs non-negative contributions (partial sums = lower bounds)
+        can_prune = all(self.idf(term) >= 0 for term in terms)
+        order = sorted(terms, key=lambda term: ub[term], reverse=True)
+        remaining_ub = sum(ub.values())
+
+        cand = np.empty(0, dtype=np.int64)
+        partial = np.empty(0, dtype=np.float64)
+        for term in order:
+            ids, tfs = seg.postings(terms[term])
+            if live is not None:
+                keep = live[ids]
+                ids, tfs = ids[keep], tfs[keep]
+            if not len(ids):
+                remaining_ub -= ub[term]
+                continue
+            contrib = weights[term] * self.idf(term) * self._tf_part(tfs, norms[ids])
+            theta = (
+                self._kth_allowed(
+                    cand, partial, top_k, is_allowed if allowed is not None else None
+                )
+                if can_prune
+                else None
+            )
+
+            if theta is not None and remaining_ub < theta * (1 - _PRUNE_SLACK):
+                # Unseen docs can't reach the top-k any more: update and
+                # prune existing candidates only.
+                pos = np.searchsorted(ids, cand)
+                pos_c = np.minimum(pos, len(ids) - 1)
+                hit = (pos < len(ids)) & (ids[pos_c] == cand)
+                partial = partial + np.where(hit, contrib[pos_c], 0.0)
+                remaining_ub -= ub[term]
+                keep = partial + remaining_ub >= theta * (1 - _PRUNE_SLACK)
+                cand, partial = cand[keep], partial[keep]
+            else:
+                merged = np.union1d(cand, ids)
+                new_partial = np.zeros(len(merged), dtype=np.float64)
+                new_partial[np.searchsorted(merged, cand)] = partial
+                new_partial[np.searchsorted(merged, ids)] += contrib
+                cand, partial = merged, new_partial
+                remaining_ub -= ub[term]
+
+        # Exact rescoring of the surviving candidates in query order
+        scores = self._score_docs(seg, norms, query_tokens, cand)
+        ranked = np.lexsort((cand, -scores))
+        out: List[Tuple[int, float]] = []
+        for i in ranked:
+            d = int(cand[i])
+            if allowed is None or is_allowed(d):
+                out.append((base + d, float(scores[i])))
+                if len(out) >= top_k:
+                    break
+        return out
+
+    def _score_docs(
+        self,
+        seg: BM25Segment,
+        norms: np.ndarray,
+        query_tokens: Sequence[str],
+        docs: np.ndarray,
+    ) -> np.ndarray:
+        """Exact BM25 scores of `docs` (sorted ascending), summed in query order."""
+        scores = np.zeros(len(docs), dtype=np.float64)
+        doc_norms = norms[docs]
+        for term in query_tokens:
+            t = seg.vocab.get(term)
+            if t is None:
+                continue
+            ids, tfs = seg.postings(t)
+            pos = np.searchsorted(ids, docs)
+            pos_c = np.minimum(pos, max(len(ids) - 1, 0))
+            hit = (pos < len(ids)) & (ids[pos_c] == docs)
+            tf = np.where(hit, tfs[pos_c], 0)
+            scores += self.idf(term) * self._tf_part(tf, doc_norms)
+        return scores
+
+    @staticmethod
+    def _kth_allowed(
+        cand: np.ndarray,
+        partial: np.ndarray,
+        k: int,
+        is_allowed: Optional[Callable[[int], bool]],
+    ) -> Optional[float]:
+        """k-th best partial score among allowed candidates (None if < k)."""
+        if len(cand) < k:
+            return None
+        if is_allowed is None:
+            return float(-np.partition(-partial, k - 1)[k - 1])
+        found = 0
+        for i in np.argsort(-partial, kind="stable"):
+            if is_allowed(int(cand[i])):
+                found += 1
+                if found == k:
+                    return float(partial[i])
+        return None
+
+
+def _load_array(path: Path, mmap: bool) -> np.ndarray:
+    if mmap:
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            pass  # zero-length arrays can't be memory-mapped
+    return np.load(path)
@@ -0,0 +1,608 @@
+# src/retrieval/bm25_store.py
+from bisect import bisect_right
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+import numpy as np
+
+from src.retrieval.bm25_index import BM25Index, BM25Segment
+from src.utils.config_loader import load_model_config, load_paths
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, assume a single writer process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = "writer.lock"
+DEFAULT_REFRESH_SECONDS = 2.0
+DEFAULT_MAX_SEGMENTS = 8
+# retrieval.mode values that read the BM25 index
+LEXICAL_MODES = ("hybrid", "lexical")
+# Merge everything (base included) once small segments + base deletions
+# exceed this share of the base segment.
+DEFAULT_FULL_MERGE_RATIO = 0.25
+# Retired segment directories are deleted only after this long, so readers
+# that just read the previous manifest can still open them.
+_RETIRED_GRACE_SECONDS = 300
+
+
+def _simple_tokenize(text: str) -> List[str]:
+    # very simple word tokenizer
+    return re.findall(r"\w+", text.lower())
+
+
+class DocTable(Sequence):
+    """
+    Read-only, memory-mapped list of chunk docs ({"id", "text", "metadata"}).
+
+    Stored as docs.jsonl (one doc per line) + doc_offsets.npy (int64 byte
+    offsets, N + 1) + ids.json; a doc is decoded only when it is accessed.
+    """
+
+    def __init__(self, directory: str):
+        self.dir = Path(directory)
+        self._offsets = np.load(self.dir / "doc_offsets.npy")
+        path = self.dir / "docs.jsonl"
+        if path.stat().st_size:
+            self._data = np.memmap(path, dtype=np.uint8, mode="r")
+        else:
+            self._data = np.empty(0, dtype=np.uint8)
+
+    @staticmethod
+    def write(docs: Iterable[Dict], directory: str) -> int:
+        d = Path(directory)
+        d.mkdir(parents=True, exist_ok=True)
+        offsets = [0]
+        ids: List[str] = []
+        with open(d / "docs.jsonl", "wb") as f:
+            for doc in docs:
+                line = json.dumps(
+                    {
+                        "id": doc["id"],
+                        "text": doc.get("text", ""),
+                        "metadata": doc.get("metadata", {}) or {},
+                    },
+                    ensure_ascii=False,
+                ).encode("utf-8")
+                f.write(line + b"\n")
+                offsets.append(offsets[-1] + len(line) + 1)
+                ids.append(doc["id"])
+        np.save(d / "doc_offsets.npy", np.asarray(offsets, dtype=np.int64))
+        (d / "ids.json").write_text(json.dumps(ids), encoding="utf-8")
+        return len(ids)
+
+    def ids(self) -> List[str]:
+        return json.loads((self.dir / "ids.json").read_text(encoding="utf-8"))
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        start, end = int(self._offsets[idx]), int(self._offsets[idx + 1])
+        return json.loads(self._data[start:end].tobytes())
+
+
+class _Snapshot:
+    """Immutable (index, per-segment doc tables) pair served to readers."""
+
+    def __init__(self, index: BM25Index, tables: List[Sequence[Dict]], version: int):
+        self.index = index
+        self.tables = tables
+        self.version = version
+
+    def doc(self, slot: int) -> Dict:
+        i = bisect_right(self.index.seg_starts, slot) - 1
+        return self.tables[i][slot - self.index.seg_starts[i]]
+
+
+class BM25Store:
+    """
+    Lightweight BM25 index over already-ingested chunks, backed by the
+    inverted index in bm25_index.py (scores match rank_bm25.BM25Okapi).
+
+    Docs should be a list of:
+        {"id": str, "text": str, "metadata": {...}}
+
+    BM25Store(docs) indexes docs in memory. BM25Store.open() memory-maps
+    the segmented on-disk index maintained by BM25IndexWriter and, with
+    refresh_seconds > 0, a watcher thread picks up new manifests: the next
+    snapshot is built off the query path and swapped in with a single
+    reference assignment, so searches never wait for ingestion or merges.
+    """
+
+    def __init__(self, docs: Optional[Sequence[Dict]] = None):
+        docs = docs if docs is not None else []
+        index = BM25Index([BM25Segment.build([_simple_tokenize(d.get("text", "")) for d in docs])])
+        self._snapshot = _Snapshot(index, [docs], version=0)
+        self.root: Optional[Path] = None
+        self._segments: Dict[str, Tuple[BM25Segment, DocTable]] = {}
+        self._manifest_stat: Optional[Tuple[int, int]] = None
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+
+    @classmethod
+    def open(
+        cls,
+        root: Optional[str] = None,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+    ) -> Optional["BM25Store"]:
+        """Memory-map the published index under `root` (None if there is none)."""
+        root_path = Path(root) if root else default_index_root()
+        if not (root_path / MANIFEST_FILE).exists():
+            return None
+        store = cls.__new__(cls)
+        store._segments = {}
+        store._manifest_stat = None
+        store._stop = threading.Event()
+        store._watcher = None
+        store.root = root_path
+        store._snapshot = None
+        try:
+            store.refresh()
+        except Exception as e:
+            logger.warning("Could not load BM25 index from %s: %s", root_path, e)
+            return None
+        logger.info(
+            "Loaded BM25 index %s (v%d, %d docs in %d segments)",
+            root_path,
+            store._snapshot.version,
+            store.num_docs,
+            len(store._snapshot.tables),
+        )
+        if refresh_seconds and refresh_seconds > 0:
+            store._watcher = threading.Thread(
+                target=store._watch, args=(float(refresh_seconds),), name="bm25-refresh", daemon=True
+            )
+            store._watcher.start()
+        return store
+
+    @property
+    def num_docs(self) -> int:
+        return self._snapshot.index.num_docs
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def is_empty(self) -> bool:
+        return not self.num_docs
+
+    def close(self) -> None:
+        self._stop.set()
+
+    # -------- refresh -------- #
+
+    def refresh(self) -> bool:
+        """
+        Load the current manifest if it changed; returns True if a new
+        snapshot was swapped in.
+        """
+        if self.root is None:
+            return False
+        path = self.root / MANIFEST_FILE
+        st = path.stat()
+        stat_key = (st.st_mtime_ns, st.st_size)
+        if stat_key == self._manifest_stat:
+            return False
+        manifest = _read_manifest(self.root)
+        if self._snapshot is not None and manifest["version"] == self._snapshot.version:
+            self._manifest_stat = stat_key
+            return False
+
+        segments: List[BM25Segment] = []
+        tables: List[Sequence[Dict]] = []
+        deleted: List[Optional[np.ndarray]] = []
+        loaded: Dict[str, Tuple[BM25Segment, DocTable]] = {}
+        for entry in manifest["segments"]:
+            name = entry["name"]
+            pair = self._segments.get(name)
+            if pair is None:
+                seg_dir = self.root / name
+                pair = (BM25Segment.load(str(seg_dir)), DocTable(str(seg_dir)))
+            loaded[name] = pair
+            segments.append(pair[0])
+            tables.append(pair[1])
+            deleted.append(_load_tombstones(self.root, entry))
+
+        # Build fully, then publish with one assignment (readers never block)
+        self._snapshot = _Snapshot(BM25Index(segments, deleted), tables, manifest["version"])
+        self._segments = loaded
+        self._manifest_stat = stat_key
+        return True
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                if self.refresh():
+                    logger.info(
+                        "BM25 index refreshed to v%d (%d docs)",
+                        self._snapshot.version,
+                        self.num_docs,
+                    )
+            except Exception as e:
+                logger.warning("BM25 index refresh failed (keeping v%d): %s", self.version, e)
+
+    # -------- query -------- #
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        doc_filter: Optional[Callable[[Dict], bool]] = None,
+    ) -> List[Dict]:
+        """
+        Returns a list of docs with an added 'bm25_score' field.
+
+        Only docs sharing at least one term with the query are returned.
+        `doc_filter(metadata) -> bool` (e.g. RBAC visibility) is applied
+        during top-k selection, so the top_k returned docs are all allowed
+        ones.
+        """
+        snap = self._snapshot
+        if not snap.index.num_docs:
+            return []
+
+        q_tokens = _simple_tokenize(query)
+        allowed = None
+        if doc_filter is not None:
+
+            def allowed(slot: int) -> bool:
+                return doc_filter(snap.doc(slot).get("metadata", {}))
+
+        top = snap.index.search(q_tokens, top_k, allowed=allowed)
+
+        results: List[Dict] = []
+        for slot, score in top:
+            d = snap.doc(slot)
+            results.append(
+                {
+                    "id": d["id"],
+                    "text": d["text"],
+                    "metadata": d.get("metadata", {}),
+                    "bm25_score": float(score),
+                }
+            )
+        return results
+
+
+class BM25IndexWriter:
+    """
+    Maintains the on-disk BM25 index as a Lucene-style list of immutable
+    segments plus per-segment tombstones, described by manifest.json:
+
+        {"version": 7,
+         "segments": [{"name": "seg-...", "docs": 120000,
+                       "deleted": "deleted-7.npy", "num_deleted": 12}, ...],
+         "retired": [{"name": "seg-...", "at": 1700000000.0}]}
+
+    apply() writes added chunks as a new small segment and tombstones
+    deleted or replaced ids; the manifest is replaced atomically, so readers
+    (BM25Store.open) see either the old or the new version. When there are
+    more than `max_segments` segments, a background thread merges the small
+    ones (or everything, once they outweigh the base) into a new segment.
+
+    Writers serialize on an fcntl lock in the index directory; readers take
+    no locks.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        full_merge_ratio: float = DEFAULT_FULL_MERGE_RATIO,
+    ):
+        self.root = Path(root) if root else default_index_root()
+        self.max_segments = max(2, int(max_segments))
+        self.full_merge_ratio = float(full_merge_ratio)
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_file = None
+        self._id_map: Optional[Dict[str, Tuple[str, int]]] = None
+        self._id_map_version = -1
+        self._merge_thread: Optional[threading.Thread] = None
+
+    def exists(self) -> bool:
+        return (self.root / MANIFEST_FILE).exists()
+
+    def drop(self) -> None:
+        """
+        Delete the index, e.g. once writes stop being published to it; the
+        next retriever that needs it rebuilds it from Chroma.
+        """
+        with self._locked():
+            if not self.exists():
+                return
+            manifest = _read_manifest(self.root)
+            for entry in manifest["segments"] + manifest.get("retired", []):
+                shutil.rmtree(self.root / entry["name"], ignore_errors=True)
+            (self.root / MANIFEST_FILE).unlink()
+        logger.info("Dropped BM25 index %s", self.root)
+
+    # -------- writes -------- #
+
+    def rebuild(self, docs: Sequence[Dict]) -> int:
+        """Replace the whole index with a single segment over `docs`."""
+        name = self._write_segment(docs)
+        with self._locked():
+            manifest = _read_manifest(self.root) if self.exists() else _empty_manifest()
+            self._retire(manifest, [e["name"] for e in manifest["segments"]])
+            manifest["segments"] = [{"name": name, "docs": len(docs)}]
+            self._commit(manifest)
+        logger.info("Rebuilt BM25 index %s (%d docs)", self.root, len(docs))
+        return len(docs)
+
+    def apply(
+        self,
+        added: Sequence[Dict] = (),
+        deleted_ids: Sequence[str] = (),
+    ) -> None:
+        """
+        Publish added/updated chunks and deleted chunk ids. Re-added ids
+        replace their previous version.
+        """
+        if not added and not deleted_ids:
+            return
+        by_id = {d["id"]: d for d in added}
+        added = list(by_id.values())
+        # Build the segment before taking the lock; it is invisible until
+        # the manifest references it.
+        name = self._write_segment(added) if added else None
+
+        with self._locked():
+            manifest = _read_manifest(self.root) if self.exists() else _empty_manifest()
+            id_map = self._load_id_map(manifest)
+            tombstones = {e["name"]: set(_tombstone_list(self.root, e)) for e in manifest["segments"]}
+
+            changed: Set[str] = set()
+            removed = 0
+            for doc_id in list(deleted_ids) + list(by_id):
+                loc = id_map.pop(doc_id, None)
+                if loc is None:
+                    continue
+                seg_name, local = loc
+                tombstones[seg_name].add(local)
+                changed.add(seg_name)
+                removed += 1
+
+            for entry in manifest["segments"]:
+                if entry["name"] in changed:
+                    self._write_tombstones(entry, tombstones[entry["name"]], manifest["version"] + 1)
+
+            if name is not None:
+                manifest["segments"].append({"name": name, "docs": len(added)})
+                for i, d in enumerate(added):
+                    id_map[d["id"]] = (name, i)
+
+            self._commit(manifest)
+            self._id_map, self._id_map_version = id_map, manifest["version"]
+            needs_merge = self._needs_merge(manifest)
+
+        logger.info(
+            "BM25 index v%d: +%d docs, -%d docs (%d segments)",
+            manifest["version"],
+            len(added),
+            removed,
+            len(manifest["segments"]),
+        )
+        if needs_merge:
+            self._schedule_merge()
+
+    # -------- merging -------- #
+
+    def merge(self, full: bool = False) -> bool:
+        """
+        Merge segments into one: the small ones, or all of them when `full`
+        (or when small segments + base deletions outweigh the base).
+        The merged segment is built without holding the lock; deletions that
+        land meanwhile are carried over. Returns True if a merge committed.
+        """
+        with self._locked():
+            if not self.exists():
+                return False
+            manifest = _read_manifest(self.root)
+            segs = manifest["segments"]
+            if len(segs) < 2 and not (segs and segs[0].get("num_deleted")):
+                return False
+            base, small = segs[0], segs[1:]
+            small_live = sum(e["docs"] - e.get("num_deleted", 0) for e in small)
+            base_live = base["docs"] - base.get("num_deleted", 0)
+            if full or small_live + base.get("num_deleted", 0) > self.full_merge_ratio * max(base_live, 1):
+                chosen = segs
+            else:
+                chosen = small
+            before = {e["name"]: set(_tombstone_list(self.root, e)) for e in chosen}
+
+        # Copy live docs of the chosen segments into one new segment
+        docs: List[Dict] = []
+        mapping: Dict[Tuple[str, int], int] = {}
+        for entry in chosen:
+            table = DocTable(str(self.root / entry["name"]))
+            dead = before[entry["name"]]
+            for local in range(len(table)):
+                if local in dead:
+                    continue
+                mapping[(entry["name"], local)] = len(docs)
+                docs.append(table[local])
+        name = self._write_segment(docs)
+
+        with self._locked():
+            manifest = _read_manifest(self.root)
+            current = {e["name"]: e for e in manifest["segments"]}
+            chosen_names = [e["name"] for e in chosen]
+            if any(n not in current for n in chosen_names):
+                # Rebuilt or merged by someone else meanwhile
+                shutil.rmtree(self.root / name, ignore_errors=True)
+                return False
+
+            merged_entry = {"name": name, "docs": len(docs)}
+            late = sorted(
+                mapping[(n, local)]
+                for n in chosen_names
+                for local in set(_tombstone_list(self.root, current[n])) - before[n]
+            )
+            if late:
+                self._write_tombstones(merged_entry, set(late), manifest["version"] + 1)
+
+            new_segments: List[Dict] = []
+            for entry in manifest["segments"]:
+                if entry["name"] in before:
+                    if entry["name"] == chosen_names[0]:
+                        new_segments.append(merged_entry)
+                    continue
+                new_segments.append(entry)
+            manifest["segments"] = new_segments
+            self._retire(manifest, chosen_names)
+            self._commit(manifest)
+            self._id_map = None
+
+        logger.info(
+            "Merged %d BM25 segments into %s (%d docs, v%d)",
+            len(chosen_names),
+            name,
+            len(docs),
+            manifest["version"],
+        )
+        return True
+
+    def wait_for_merge(self) -> None:
+        t = self._merge_thread
+        if t is not None:
+            t.join()
+
+    def _needs_merge(self, manifest: Dict) -> bool:
+        return len(manifest["segments"]) > self.max_segments
+
+    def _schedule_merge(self) -> None:
+        if self._merge_thread is not None and self._merge_thread.is_alive():
+            return
+
+        def run() -> None:
+            try:
+                self.merge()
+            except Exception as e:
+                logger.warning("BM25 segment merge failed: %s", e)
+
+        # Not a daemon: a CLI ingest waits for the merge instead of killing it
+        self._merge_thread = threading.Thread(target=run, name="bm25-merge")
+        self._merge_thread.start()
+
+    # -------- storage helpers -------- #
+
+    def _write_segment(self, docs: Sequence[Dict]) -> str:
+        name = f"seg-{time.time_ns()}-{os.getpid()}-{threading.get_ident() % 10000}"
+        seg_dir = self.root / name
+        DocTable.write(docs, str(seg_dir))
+        BM25Segment.build([_simple_tokenize(d.get("text", "")) for d in docs]).save(str(seg_dir))
+        return name
+
+    def _write_tombstones(self, entry: Dict, dead: Set[int], version: int) -> None:
+        fname = f"deleted-{version}.npy"
+        np.save(self.root / entry["name"] / fname, np.asarray(sorted(dead), dtype=np.int64))
+        entry["deleted"] = fname
+        entry["num_deleted"] = len(dead)
+
+    def _load_id_map(self, manifest: Dict) -> Dict[str, Tuple[str, int]]:
+        if self._id_map is not None and self._id_map_version == manifest["version"]:
+            return self._id_map
+        id_map: Dict[str, Tuple[str, int]] = {}
+        for entry in manifest["segments"]:
+            dead = set(_tombstone_list(self.root, entry))
+            ids = DocTable(str(self.root / entry["name"])).ids()
+            for local, doc_id in enumerate(ids):
+                if local not in dead:
+                    id_map[doc_id] = (entry["name"], local)
+        return id_map
+
+    def _retire(self, manifest: Dict, names: Sequence[str]) -> None:
+        now = time.time()
+        retired = manifest.setdefault("retired", [])
+        retired.extend({"name": n, "at": now} for n in names)
+        keep = []
+        for r in retired:
+            if now - r["at"] > _RETIRED_GRACE_SECONDS:
+                shutil.rmtree(self.root / r["name"], ignore_errors=True)
+            else:
+                keep.append(r)
+        manifest["retired"] = keep
+
+    def _commit(self, manifest: Dict) -> None:
+        manifest["version"] += 1
+        tmp = self.root / f".{MANIFEST_FILE}.{os.getpid()}.{threading.get_ident()}"
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, self.root / MANIFEST_FILE)
+
+    def _locked(self):
+        writer = self
+
+        class _Lock:
+            def __enter__(self_inner):
+                writer._thread_lock.acquire()
+                if writer._lock_depth == 0 and fcntl is not None:
+                    writer.root.mkdir(parents=True, exist_ok=True)
+                    writer._lock_file = open(writer.root / LOCK_FILE, "w")
+                    fcntl.flock(writer._lock_file, fcntl.LOCK_EX)
+                writer._lock_depth += 1
+
+            def __exit__(self_inner, *exc):
+                writer._lock_depth -= 1
+                if writer._lock_depth == 0 and writer._lock_file is not None:
+                    fcntl.flock(writer._lock_file, fcntl.LOCK_UN)
+                    writer._lock_file.close()
+                    writer._lock_file = None
+                writer._thread_lock.release()
+                return False
+
+        return _Lock()
+
+
+# ---------- manifest helpers ---------- #
+
+
+def default_index_root() -> Path:
+    """model.yaml:retrieval.bm25_index_dir, else <db_dir>/bm25_index."""
+    configured = (load_model_config().get("retrieval", {}) or {}).get("bm25_index_dir")
+    if configured:
+        return Path(configured)
+    return Path(load_paths().get("db_dir", "data/chroma_db")) / "bm25_index"
+
+
+def _empty_manifest() -> Dict:
+    return {"version": 0, "segments": [], "retired": []}
+
+
+def _read_manifest(root: Path) -> Dict:
+    return json.loads((root / MANIFEST_FILE).read_text(encoding="utf-8"))
+
+
+def _tombstone_list(root: Path, entry: Dict) -> List[int]:
+    arr = _load_tombstones(root, entry)
+    return arr.tolist() if arr is not None else []
+
+
+def _load_tombstones(root: Path, entry: Dict) -> Optional[np.ndarray]:
+    fname = entry.get("deleted")
+    if not fname:
+        return None
+    return np.load(root / entry["name"] / fname)
+
+
+def writer_from_config() -> BM25IndexWriter:
+    retrieval_cfg = load_model_config().get("retrieval", {}) or {}
+    return BM25IndexWriter(
+        root=retrieval_cfg.get("bm25_index_dir"),
+        max_segments=retrieval_cfg.get("bm25_max_segments", DEFAULT_MAX_SEGMENTS),
+    )
@@ -0,0 +1,254 @@
+# src/retrieval/hybrid_retriever.py
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass
+import logging
+import threading
+import time
+
+from src.db.vector_store import VectorStore
+from src.retrieval.bm25_store import BM25Store
+from src.embeddings.embedder import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HybridRetrievalConfig:
+    top_k: int
+    dense_k: int
+    lexical_k: int
+    dense_weight: float
+    min_relevance: float
+    # Deadline for each leg (dense / BM25), measured from the start of the
+    # query; None or <= 0 waits for both legs.
+    leg_timeout_ms: Optional[float] = None
+    # Threads running the legs (two per in-flight query)
+    max_workers: int = 8
+    # Legs of one kind still running past their deadline before further
+    # legs of that kind are skipped; the pool has room for these on top of
+    # max_workers
+    max_overdue_legs: int = 2
+
+
+class HybridRetriever:
+    """
+    Hybrid retriever: combines dense similarity (Chroma) and BM25 scores.
+
+    - Pulls `dense_k` candidates with embeddings from Chroma.
+    - Pulls `lexical_k` candidates via BM25.
+    - Normalizes both scores and merges them using `dense_weight`.
+
+    The two legs run concurrently on a thread pool. A leg that misses
+    `leg_timeout_ms` (or fails) is dropped and fusion proceeds with the
+    other. A dropped leg cannot be interrupted, so it keeps its thread until
+    it finishes; while `max_overdue_legs` legs of one kind are still
+    running, that kind is skipped rather than queued behind them.
+    Per-leg latencies are reported through the `timings` argument, not in
+    the results.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        bm25_store: BM25Store,
+        embedder: EmbeddingService,
+        cfg: HybridRetrievalConfig,
+        recency_boost_fn: Callable[[Dict], float],
+    ):
+        self.vs = vector_store
+        self.bm25 = bm25_store
+        self.embedder = embedder
+        self.cfg = cfg
+        self._recency_boost = recency_boost_fn
+        self._max_overdue = max(1, int(cfg.max_overdue_legs))
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(2, int(cfg.max_workers)) + 2 * self._max_overdue,
+            thread_name_prefix="hybrid-leg",
+        )
+        self._overdue_lock = threading.Lock()
+        self._overdue: Dict[str, int] = {"dense": 0, "lexical": 0}
+
+    def retrieve(
+        self,
+        query: str,
+        where: Optional[Dict[str, Any]] = None,
+        doc_filter: Optional[Callable[[Dict], bool]] = None,
+        timings: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict]:
+        """
+        `where` (Chroma filter) and `doc_filter` (metadata predicate) restrict
+        both legs to the same visible docs before top-k selection. If given,
+        `timings` is filled with per-leg latencies in ms ("timeout", "error"
+        or "skipped" for a dropped leg) and the total.
+        """
+        # ---- Dense + lexical (BM25) legs, concurrently ----
+        started = time.perf_counter()
+        latency: Dict[str, Any] = {}
+        legs: Dict[str, Future] = {}
+        if self._leg_allowed("dense"):
+            legs["dense"] = self._pool.submit(self._timed, self._dense_leg, query, where)
+        else:
+            latency["dense"] = "skipped"
+        if self.bm25.is_empty():
+            logger.warning("BM25 store is empty; falling back to dense-only in hybrid.")
+        elif self._leg_allowed("lexical"):
+            legs["lexical"] = self._pool.submit(
+                self._timed, self._lexical_leg, query, doc_filter
+            )
+        else:
+            latency["lexical"] = "skipped"
+        timeout = self.cfg.leg_timeout_ms
+        wait(legs.values(), timeout=timeout / 1000.0 if timeout and timeout > 0 else None)
+
+        results: Dict[str, List[Dict]] = {}
+        for name, fut in legs.items():
+            results[name], latency[name] = self._leg_result(name, fut)
+        dense_docs, lexical_docs = results.get("dense", []), results.get("lexical", [])
+
+        # ---- Merge by id ----
+        combined: Dict[str, Dict] = {}
+
+        for d in dense_docs:
+            _id = d["id"]
+            if _id is None:
+                # fallback if id is not present in metadata
+                _id = d["metadata"].get("source", "") + "#" + d["text"][:32]
+                d["id"] = _id
+            combined[_id] = d
+
+        for d in lexical_docs:
+            _id = d["id"]
+            if _id in combined:
+                combined[_id]["bm25_score"] = d["bm25_score"]
+            else:
+                combined[_id] = {
+                    "id": _id,
+                    "text": d["text"],
+                    "metadata": d.get("metadata", {}),
+                    "dense_score": 0.0,
+                    "bm25_score": d["bm25_score"],
+                }
+
+        docs = list(combined.values())
+        if not docs:
+            self._report(latency, started, timings)
+            return []
+
+        # Ensure bm25_score field exists
+        for d in docs:
+            if "bm25_score" not in d:
+                d["bm25_score"] = 0.0
+
+        # Normalize scores to [0,1] and combine
+        max_dense = max((d.get("dense_score", 0.0) for d in docs), default=0.0)
+        max_bm25 = max((d.get("bm25_score", 0.0) for d in docs), default=0.0)
+
+        for d in docs:
+            dense_norm = (
+                d.get("dense_score", 0.0) / max_dense if max_dense > 0 else 0.0
+            )
+            bm25_norm = (
+                d.get("bm25_score", 0.0) / max_bm25 if max_bm25 > 0 else 0.0
+            )
+            hybrid_score = (
+                self.cfg.dense_weight * dense_norm
+                + (1.0 - self.cfg.dense_weight) * bm25_norm
+            )
+            d["score"] = hybrid_score
+            d["hybrid_score"] = hybrid_score
+
+        # Filter & sort
+        filtered = [
+            d for d in docs if d["score"] >= self.cfg.min_relevance
+        ]
+        filtered.sort(key=lambda x: x["score"], reverse=True)
+        top = filtered[: self.cfg.top_k]
+
+        self._report(latency, started, timings)
+        return top
+
+    @staticmethod
+    def _report(
+        latency: Dict[str, Any], started: float, timings: Optional[Dict[str, Any]]
+    ) -> None:
+        latency["total"] = round((time.perf_counter() - started) * 1000.0, 2)
+        logger.debug("Hybrid retrieval latency (ms): %s", latency)
+        if timings is not None:
+            timings.update(latency)
+
+    # ---------- legs ---------- #
+
+    @staticmethod
+    def _timed(fn: Callable[..., List[Dict]], *args: Any) -> Tuple[List[Dict], float]:
+        t0 = time.perf_counter()
+        docs = fn(*args)
+        return docs, (time.perf_counter() - t0) * 1000.0
+
+    def _leg_result(self, name: str, fut: Future) -> Tuple[List[Dict], Any]:
+        """(docs, latency_ms) of a finished leg; ([], "timeout"/"error") otherwise."""
+        if not fut.done():
+            # A queued leg is cancelled; a running one cannot be, so it is
+            # counted as overdue until it finishes in the background
+            if not fut.cancel():
+                with self._overdue_lock:
+                    self._overdue[name] += 1
+                fut.add_done_callback(lambda _f, name=name: self._leg_finished(name))
+            logger.warning(
+                "Hybrid %s leg missed its %.0f ms deadline; fusing without it.",
+                name,
+                self.cfg.leg_timeout_ms,
+            )
+            return [], "timeout"
+        try:
+            docs, elapsed = fut.result()
+        except Exception as e:
+            logger.warning("Hybrid %s leg failed; fusing without it: %s", name, e)
+            return [], "error"
+        return docs, round(elapsed, 2)
+
+    def _leg_allowed(self, name: str) -> bool:
+        with self._overdue_lock:
+            if self._overdue[name] < self._max_overdue:
+                return True
+        logger.warning(
+            "Hybrid %s leg skipped: %d earlier ones are still running past their deadline.",
+            name,
+            self._overdue[name],
+        )
+        return False
+
+    def _leg_finished(self, name: str) -> None:
+        with self._overdue_lock:
+            self._overdue[name] -= 1
+
+    def _dense_leg(self, query: str, where: Optional[Dict[str, Any]]) -> List[Dict]:
+        dense_docs: List[Dict] = []
+        if self.cfg.dense_k <= 0:
+            return dense_docs
+        q_emb = self.embedder.embed_query(query)
+        dense_results = self.vs.similarity_search(
+            query_embedding=q_emb,
+            top_k=self.cfg.dense_k,
+            where=where,
+        )
+        for r in dense_results:
+            dist = r.get("distance", 1.0)
+            base_sim = 1.0 / (1.0 + dist)
+            boost = self._recency_boost(r.get("metadata", {}))
+            dense_score = base_sim + boost
+            dense_docs.append(
+                {
+                    "id": r.get("id") or r["metadata"].get("id"),
+                    "text": r["text"],
+                    "metadata": r.get("metadata", {}),
+                    "dense_score": dense_score,
+                    "distance": dist,
+                }
+            )
+        return dense_docs
+
+    def _lexical_leg(
+        self, query: str, doc_filter: Optional[Callable[[Dict], bool]]
+    ) -> List[Dict]:
+        return self.bm25.search(query, top_k=self.cfg.lexical_k, doc_filter=doc_filter)
\ No newline at end of file
@@ -2,6 +2,8 @@
 from typing import List, Dict
 from dataclasses import dataclass
 
+from src.utils.micro_batcher import MicroBatcher
+
 try:
     from FlagEmbedding import FlagReranker
 except ImportError:
@@ -11,6 +13,11 @@ except ImportError:
 @dataclass
 class RerankerConfig:
     model_name: str
+    # Coalesce (query, doc) pairs from concurrent rerank() calls into one
+    # compute_score call (see src/utils/micro_batcher.py)
+    micro_batch: bool = False
+    max_batch_size: int = 64
+    max_wait_ms: float = 5.0
 
 
 class BGEReranker:
@@ -31,6 +38,21 @@ class BGEReranker:
         self.config = config
         # use_fp16=True is faster on GPU; safe on CPU too
         self.model = FlagReranker(self.config.model_name, use_fp16=True)
+        self.batcher = None
+        if self.config.micro_batch:
+            self.batcher = MicroBatcher(
+                self._score_pairs,
+                max_batch_size=self.config.max_batch_size,
+                max_wait_ms=self.config.max_wait_ms,
+                name="rerank-batcher",
+            )
+
+    def _score_pairs(self, pairs: List[List[str]]) -> List[float]:
+        scores = self.model.compute_score(pairs)
+        # compute_score returns a bare float for a single pair
+        if not isinstance(scores, list):
+            scores = [scores]
+        return [float(s) for s in scores]
 
     def rerank(self, query: str, docs: List[Dict]) -> List[Dict]:
         """
@@ -42,7 +64,10 @@ class BGEReranker:
             return docs
 
         pairs = [[query, d["text"]] for d in docs]
-        scores = self.model.compute_score(pairs)  # list[float]
+        if self.batcher is not None:
+            scores = self.batcher.submit_many(pairs)
+        else:
+            scores = self._score_pairs(pairs)
 
         for d, s in zip(docs, scores):
             d["rerank_score"] = float(s)
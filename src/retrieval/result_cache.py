@@ -0,0 +1,96 @@
+# src/retrieval/result_cache.py
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import json
+import threading
+import time
+
+from src.embeddings.embedding_cache import normalize_text
+
+DEFAULT_MAX_ENTRIES = 2048
+DEFAULT_TTL_SECONDS = 300.0
+
+
+class RetrievalCache:
+    """
+    In-process LRU cache of final retrieval results with a TTL.
+
+    Keys include the index version (see IndexVersion), so entries computed
+    before an ingest or delete are never served after it; they simply age
+    out of the LRU. Cached docs are copied on the way in and out because
+    callers annotate the returned dicts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = float(ttl_seconds or 0)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, List[Dict]]]" = OrderedDict()
+
+    @staticmethod
+    def key(
+        query: str,
+        mode: str,
+        top_k: Optional[int],
+        scope: Optional[Dict[str, Any]],
+        version: Hashable,
+    ) -> Tuple:
+        """`scope` is the RBAC Chroma filter (None = unrestricted)."""
+        scope_key = json.dumps(scope, sort_keys=True, default=str) if scope else ""
+        return version, mode, top_k, scope_key, normalize_text(query)
+
+    def get(self, key: Hashable) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl_seconds > 0:
+                if time.monotonic() - entry[0] > self.ttl_seconds:
+                    del self._entries[key]
+                    self.expired += 1
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy_docs(entry[1])
+
+    def put(self, key: Hashable, docs: List[Dict]) -> None:
+        docs = _copy_docs(docs)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), docs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def _copy_docs(docs: List[Dict]) -> List[Dict]:
+    return [{**d, "metadata": dict(d.get("metadata") or {})} for d in docs]
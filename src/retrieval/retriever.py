@@ -157,12 +157,20 @@
 #                 logger.warning("Reranker failed; falling back to dense ranking: %s", e)
 
 #         return filtered
-from typing import List, Dict
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
 import logging
 
 from src.embeddings.embedder import EmbeddingService
+from src.embeddings.embedding_cache import with_embedding_cache
+from src.embeddings.micro_batch import with_micro_batching
+from src.embeddings.query_cache import with_query_cache
 from src.db.vector_store import VectorStore
+from src.retrieval.result_cache import (
+    DEFAULT_MAX_ENTRIES as RESULT_CACHE_MAX_ENTRIES,
+    DEFAULT_TTL_SECONDS as RESULT_CACHE_TTL_SECONDS,
+    RetrievalCache,
+)
 from src.utils.config_loader import load_settings, load_model_config
 
 logger = logging.getLogger(__name__)
@@ -170,7 +178,12 @@ logger = logging.getLogger(__name__)
 
 class Retriever:
     def __init__(self):
-        self.embedder = EmbeddingService()
+        # Repeated questions are served from the in-process query cache;
+        # misses from concurrent requests are micro-batched into one forward
+        # pass. The same wrapped embedder is shared with the hybrid retriever.
+        self.embedder = with_query_cache(
+            with_micro_batching(with_embedding_cache(EmbeddingService()))
+        )
         self.store = VectorStore()
 
         # App-level settings (legacy) + model config
@@ -197,6 +210,16 @@ class Retriever:
         self.dense_k = model_retrieval.get("dense_k", self.top_k)
         self.lexical_k = model_retrieval.get("lexical_k", self.top_k)
         self.dense_weight = model_retrieval.get("hybrid_dense_weight", 0.5)
+        self.leg_timeout_ms = model_retrieval.get("hybrid_leg_timeout_ms")
+
+        # Final results per (query, mode, top_k, RBAC scope, index version)
+        rc_cfg = model_retrieval.get("result_cache", {}) or {}
+        self.result_cache: Optional[RetrievalCache] = None
+        if rc_cfg.get("enabled", True):
+            self.result_cache = RetrievalCache(
+                max_entries=rc_cfg.get("max_entries", RESULT_CACHE_MAX_ENTRIES),
+                ttl_seconds=rc_cfg.get("ttl_seconds", RESULT_CACHE_TTL_SECONDS),
+            )
 
         # Reranker
         self.use_reranker = model_retrieval.get("use_reranker", False)
@@ -208,8 +231,14 @@ class Retriever:
                 reranker_model = model_retrieval.get(
                     "reranker_model", "BAAI/bge-reranker-base"
                 )
+                mb_cfg = model_retrieval.get("reranker_micro_batch", {}) or {}
                 self.reranker = BGEReranker(
-                    RerankerConfig(model_name=reranker_model)
+                    RerankerConfig(
+                        model_name=reranker_model,
+                        micro_batch=mb_cfg.get("enabled", False),
+                        max_batch_size=mb_cfg.get("max_batch_size", 64),
+                        max_wait_ms=mb_cfg.get("max_wait_ms", 5.0),
+                    )
                 )
                 logger.info("Initialized BGE reranker with model %s", reranker_model)
             except ImportError:
@@ -229,29 +258,29 @@ class Retriever:
 
         if self.mode in ("hybrid", "lexical"):
             try:
-                from src.retrieval.bm25_store import BM25Store
-
-                all_docs = self.store.get_all_documents()
-                if not all_docs:
+                self.bm25_store = self._load_bm25_store(
+                    persist=model_retrieval.get("bm25_persist", True),
+                    refresh_seconds=model_retrieval.get("bm25_refresh_seconds", 2.0),
+                )
+                if self.bm25_store is None:
                     logger.warning(
                         "BM25 index requested (mode=%s) but no documents found in vector store.",
                         self.mode,
                     )
+                elif self.bm25_store.is_empty():
+                    logger.warning(
+                        "BM25 index is empty after initialization; "
+                        "lexical/hybrid retrieval will be ineffective."
+                    )
                 else:
-                    self.bm25_store = BM25Store(all_docs)
-                    if self.bm25_store.is_empty():
-                        logger.warning(
-                            "BM25 index is empty after initialization; "
-                            "lexical/hybrid retrieval will be ineffective."
-                        )
-                    else:
-                        logger.info(
-                            "Initialized BM25 store with %d documents", len(all_docs)
-                        )
+                    logger.info(
+                        "Initialized BM25 store with %d documents",
+                        self.bm25_store.num_docs,
+                    )
             except ImportError:
                 logger.warning(
-                    "rank_bm25 is not installed, cannot use lexical/hybrid retrieval. "
-                    "Install with `pip install rank_bm25`. Falling back to dense."
+                    "BM25 store is unavailable, cannot use lexical/hybrid retrieval. "
+                    "Falling back to dense."
                 )
                 self.mode = "dense"
             except Exception as e:
@@ -272,6 +301,7 @@ class Retriever:
                     lexical_k=self.lexical_k,
                     dense_weight=self.dense_weight,
                     min_relevance=self.min_relevance,
+                    leg_timeout_ms=self.leg_timeout_ms,
                 )
 
                 self.hybrid_retriever = HybridRetriever(
@@ -290,6 +320,60 @@ class Retriever:
                 self.mode = "dense"
                 self.hybrid_retriever = None
 
+    def _load_bm25_store(self, persist: bool, refresh_seconds: float):
+        """
+        Memory-map the live BM25 index maintained at ingestion time; new
+        segments are picked up every `refresh_seconds`. The index is rebuilt
+        from Chroma only if it is missing or its doc count no longer matches
+        the collection.
+        """
+        from src.retrieval.bm25_store import BM25Store, writer_from_config
+
+        if persist:
+            store = BM25Store.open(refresh_seconds=refresh_seconds)
+            if store is not None:
+                expected = self.store.count()
+                if store.num_docs == expected:
+                    return store
+                store.close()
+                logger.info(
+                    "Published BM25 index has %d docs, collection has %d; rebuilding.",
+                    store.num_docs,
+                    expected,
+                )
+
+        all_docs = self.store.get_all_documents()
+        if persist:
+            try:
+                # Published even when empty, so later ingestion shows up live
+                writer = writer_from_config()
+                writer.rebuild(all_docs)
+                store = BM25Store.open(str(writer.root), refresh_seconds=refresh_seconds)
+                if store is not None:
+                    return store
+            except Exception as e:
+                logger.warning("Failed to publish BM25 index: %s", e)
+        if not all_docs:
+            return None
+        return BM25Store(all_docs)
+
+    def cache_stats(self) -> Dict:
+        """Hit/miss counters of the retrieval and query-embedding caches."""
+        out: Dict[str, Any] = {}
+        if self.result_cache is not None:
+            out["retrieval_cache"] = self.result_cache.stats()
+        stats = getattr(self.embedder, "stats", None)
+        if callable(stats):
+            out.update(stats())
+        return out
+
+    def _index_version(self) -> Any:
+        """Vector store write counter, plus the live BM25 snapshot if used."""
+        version = self.store.index_version.current()
+        if self.mode in ("hybrid", "lexical") and self.bm25_store is not None:
+            return version, self.bm25_store.version
+        return version
+
     def _recency_boost(self, metadata: Dict) -> float:
         """
         Newer docs get a small positive boost.
@@ -303,11 +387,14 @@ class Retriever:
         except Exception:
             return 0.0
 
-    def _dense_retrieve(self, query: str) -> List[Dict]:
+    def _dense_retrieve(
+        self, query: str, where: Optional[Dict[str, Any]] = None
+    ) -> List[Dict]:
         q_emb = self.embedder.embed_query(query)
         results = self.store.similarity_search(
             query_embedding=q_emb,
             top_k=self.dense_k,
+            where=where,
         )
 
         if not results:
@@ -324,14 +411,16 @@ class Retriever:
 
         return filtered[: self.top_k]
 
-    def _lexical_retrieve(self, query: str) -> List[Dict]:
+    def _lexical_retrieve(
+        self, query: str, doc_filter: Optional[Callable[[Dict], bool]] = None
+    ) -> List[Dict]:
         if self.bm25_store is None or self.bm25_store.is_empty():
             logger.warning(
                 "Lexical retrieval requested but BM25 store is not available; returning empty."
             )
             return []
 
-        docs = self.bm25_store.search(query, top_k=self.lexical_k)
+        docs = self.bm25_store.search(query, top_k=self.lexical_k, doc_filter=doc_filter)
         for d in docs:
             boost = self._recency_boost(d.get("metadata", {}))
             # Use raw BM25 score + tiny recency boost for ranking
@@ -340,14 +429,66 @@ class Retriever:
         docs.sort(key=lambda x: x["score"], reverse=True)
         return docs[: self.top_k]
 
-    def retrieve(self, query: str) -> List[Dict]:
+    def retrieve(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        where: Optional[Dict[str, Any]] = None,
+        doc_filter: Optional[Callable[[Dict], bool]] = None,
+        cache_info: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict]:
+        """
+        `where` is passed to Chroma and `doc_filter(metadata)` to BM25 scoring
+        (e.g. RBACFilterTool.where_filter / metadata_filter), so every
+        candidate counted towards top_k is one the caller may see.
+
+        Results are cached per RBAC scope, keyed on `where`: callers must
+        build `where` and `doc_filter` from the same rules. A `doc_filter`
+        without `where` bypasses the cache. If given, `cache_info` is filled
+        with the cache status ("hit" / "miss" / "bypass") and counters, and
+        on a hybrid-mode miss with the per-leg "latency_ms".
+        """
+        cacheable = self.result_cache is not None and (doc_filter is None or where is not None)
+        key = None
+        if cacheable:
+            key = self.result_cache.key(query, self.mode, top_k, where, self._index_version())
+            cached = self.result_cache.get(key)
+            if cache_info is not None:
+                cache_info.update(status="hit" if cached is not None else "miss")
+                cache_info.update(hits=self.result_cache.hits, misses=self.result_cache.misses)
+            if cached is not None:
+                return cached
+        elif cache_info is not None:
+            cache_info.update(status="bypass")
+
+        timings: Dict[str, Any] = {}
+        docs = self._retrieve_uncached(
+            query, where=where, doc_filter=doc_filter, timings=timings
+        )
+        if timings and cache_info is not None:
+            cache_info["latency_ms"] = timings
+        if top_k:
+            docs = docs[:top_k]
+        if key is not None:
+            self.result_cache.put(key, docs)
+        return docs
+
+    def _retrieve_uncached(
+        self,
+        query: str,
+        where: Optional[Dict[str, Any]] = None,
+        doc_filter: Optional[Callable[[Dict], bool]] = None,
+        timings: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict]:
         # Choose retrieval mode
         if self.mode == "hybrid" and self.hybrid_retriever is not None:
-            docs = self.hybrid_retriever.retrieve(query)
+            docs = self.hybrid_retriever.retrieve(
+                query, where=where, doc_filter=doc_filter, timings=timings
+            )
         elif self.mode == "lexical":
-            docs = self._lexical_retrieve(query)
+            docs = self._lexical_retrieve(query, doc_filter=doc_filter)
         else:
-            docs = self._dense_retrieve(query)
+            docs = self._dense_retrieve(query, where=where)
 
         if not docs:
             return []
@@ -0,0 +1,47 @@
+# src/utils/async_utils.py
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+import asyncio
+import functools
+import os
+import threading
+
+from src.utils.config_loader import load_settings
+
+T = TypeVar("T")
+
+DEFAULT_BLOCKING_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def blocking_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide pool for blocking work (embedding, BM25 scoring, Chroma
+    queries, file I/O) done on behalf of coroutines. Its size
+    (settings.yaml:async.blocking_workers) bounds how much of that work
+    runs at once, however many queries are in flight on the event loop;
+    the rest queue here instead of spawning threads.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                cfg = load_settings().get("async", {}) or {}
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(cfg.get("blocking_workers", DEFAULT_BLOCKING_WORKERS)),
+                    thread_name_prefix="async-blocking",
+                )
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Await fn(*args, **kwargs) run on blocking_executor()."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        blocking_executor(), functools.partial(fn, *args, **kwargs)
+    )
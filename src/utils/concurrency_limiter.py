@@ -0,0 +1,105 @@
+# src/utils/concurrency_limiter.py
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Any, Callable, Deque, Dict
+import asyncio
+import threading
+
+
+class ConcurrencyLimiter:
+    """
+    Allows at most `limit` concurrent holders. Threads (`with limiter:`) and
+    coroutines on any event loop (`async with limiter:`) share the same
+    slots, and waiters are served in FIFO order.
+
+    release() hands its slot directly to the oldest waiter, so a burst of
+    new callers cannot overtake those already queued.
+    """
+
+    def __init__(self, limit: int, name: str = "limiter"):
+        self.limit = max(1, int(limit))
+        self.name = name
+        self.waited = 0
+        self._lock = threading.Lock()
+        self._active = 0
+        # Each waiter is a callback that wakes it; the slot is already its own
+        self._waiters: Deque[Callable[[], None]] = deque()
+
+    # -------- sync -------- #
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            granted = threading.Event()
+            self._waiters.append(granted.set)
+            self.waited += 1
+        granted.wait()
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._waiters:
+                self._active -= 1
+                return
+            wake = self._waiters.popleft()
+        wake()
+
+    def __enter__(self) -> "ConcurrencyLimiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.release()
+
+    # -------- async -------- #
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            granted = loop.create_future()
+
+            def wake() -> None:
+                loop.call_soon_threadsafe(_resolve, granted)
+
+            self._waiters.append(wake)
+            self.waited += 1
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(wake)
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            if handed_over:
+                # The slot arrived as we were cancelled: pass it on
+                self.release()
+            raise
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "active": self._active,
+                "waiting": len(self._waiters),
+                "waited_total": self.waited,
+            }
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
@@ -3,7 +3,8 @@ import mimetypes
 import uuid
 from pathlib import Path
 from typing import Optional
-import requests
+
+from src.utils.http_transport import http_session
 
 
 def detect_mime_type(path: str) -> str:
@@ -16,7 +17,7 @@ def get_extension(path: str) -> str:
 
 
 def download_file(url: str, tmp_dir: str) -> str:
-    response = requests.get(url, timeout=30)
+    response = http_session().get(url, timeout=30)
     response.raise_for_status()
     content_disposition = response.headers.get("content-disposition")
     if content_disposition and "filename=" in content_disposition:
@@ -0,0 +1,136 @@
+# src/utils/http_transport.py
+
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils.config_loader import load_settings
+
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 10
+DEFAULT_MAX_HOSTS = 10
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+# One async client per event loop: httpx connections belong to the loop
+# that opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http_config() -> Dict[str, Any]:
+    cfg = load_settings().get("http", {}) or {}
+    return {
+        "per_host": max(1, int(cfg.get("max_connections_per_host", DEFAULT_MAX_CONNECTIONS_PER_HOST))),
+        "max_hosts": max(1, int(cfg.get("max_hosts", DEFAULT_MAX_HOSTS))),
+        "keepalive_expiry": float(cfg.get("keepalive_expiry", DEFAULT_KEEPALIVE_EXPIRY)),
+    }
+
+
+def http_session() -> requests.Session:
+    """
+    Process-wide requests.Session with keep-alive connection pools
+    (settings.yaml:http). At most `max_connections_per_host` connections
+    are open per host; further concurrent requests wait for a free one
+    instead of opening more. Pools of the `max_hosts` most recently used
+    hosts are kept.
+
+    Use it for every outgoing sync HTTP call so repeated calls to the same
+    host skip the TCP/TLS handshake.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                cfg = _http_config()
+                adapter = HTTPAdapter(
+                    pool_connections=cfg["max_hosts"],
+                    pool_maxsize=cfg["per_host"],
+                    pool_block=True,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """
+    Shared httpx.AsyncClient for the running event loop, with the same
+    keep-alive pooling and per-host limit as http_session().
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        cfg = _http_config()
+        # httpx only limits connections globally; the per-host limit is
+        # enforced by _PerHostLimitTransport
+        transport = _PerHostLimitTransport(
+            httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=cfg["per_host"] * cfg["max_hosts"],
+                    max_keepalive_connections=cfg["per_host"] * cfg["max_hosts"],
+                    keepalive_expiry=cfg["keepalive_expiry"],
+                )
+            ),
+            cfg["per_host"],
+        )
+        client = httpx.AsyncClient(transport=transport)
+        _async_clients[loop] = client
+    return client
+
+
+class _PerHostLimitTransport(httpx.AsyncBaseTransport):
+    """
+    Allows at most `max_per_host` in-flight requests per host. A slot is
+    held until the response body is closed, so streamed responses count
+    for as long as they are being read.
+    """
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, max_per_host: int):
+        self._inner = inner
+        self._max_per_host = max_per_host
+        self._slots: Dict[bytes, asyncio.Semaphore] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        slot = self._slots.setdefault(
+            request.url.netloc, asyncio.Semaphore(self._max_per_host)
+        )
+        await slot.acquire()
+        try:
+            response = await self._inner.handle_async_request(request)
+        except BaseException:
+            slot.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, slot.release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, inner: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._inner = inner
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._inner:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._inner.aclose()
+        finally:
+            if self._release is not None:
+                release, self._release = self._release, None
+                release()
@@ -0,0 +1,134 @@
+# src/utils/micro_batcher.py
+
+from __future__ import annotations
+
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Coalesces concurrent calls into batched calls of `batch_fn`.
+
+    Callers block in submit()/submit_many() while a single worker thread
+    drains the queue: once it takes an item it keeps collecting for up to
+    `max_wait_ms` (or until `max_batch_size` items), runs
+    `batch_fn(items) -> results` once and hands each caller its own result.
+    When only one caller is active the batch runs immediately, so an idle
+    server pays no extra latency.
+
+    Exceptions from batch_fn are re-raised in every caller of that batch.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        name: str = "micro-batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.name = name
+
+        self.batches = 0
+        self.items = 0
+        self.max_seen_batch = 0
+
+        self._queue: "queue.Queue[Tuple[T, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._active_callers = 0
+        self._worker: Optional[threading.Thread] = None
+
+    # -------- public API -------- #
+
+    def submit(self, item: T) -> R:
+        return self.submit_many([item])[0]
+
+    def submit_many(self, items: Sequence[T]) -> List[R]:
+        if not items:
+            return []
+        futures: List[Future] = [Future() for _ in items]
+        with self._lock:
+            self._active_callers += 1
+            self._ensure_worker()
+        try:
+            for item, fut in zip(items, futures):
+                self._queue.put((item, fut))
+            return [f.result() for f in futures]
+        finally:
+            with self._lock:
+                self._active_callers -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "max_batch_size_seen": self.max_seen_batch,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
+
+    # -------- worker -------- #
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._worker.start()
+
+    def _collect(self) -> List[Tuple[T, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            try:
+                # Whatever is already queued joins the batch for free
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._active_callers <= 1:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = list(self.batch_fn(items))
+                if len(results) != len(items):
+                    raise RuntimeError(
+                        f"{self.name}: batch_fn returned {len(results)} results "
+                        f"for {len(items)} items"
+                    )
+            except BaseException as e:
+                logger.warning("%s: batch of %d failed: %s", self.name, len(items), e)
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(items)
+            self.max_seen_batch = max(self.max_seen_batch, len(items))
+            for (_, fut), res in zip(batch, results):
+                fut.set_result(res)
+
@@ -0,0 +1,58 @@
+# tests/test_rbac_visibility.py
+
+import pytest
+
+pytest.importorskip("chromadb")
+
+from src.agent.tools.rbac_tool import RBACFilterTool
+from src.db.chroma_client import ChromaClient
+from src.ingestion import ingest_pipeline
+from src.ingestion.ingest_pipeline import IngestionPipeline
+
+
+class FakeEmbedder:
+    def embed_texts(self, texts):
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    # Relative db_dir (config/paths.yaml) resolves under tmp_path
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(ChromaClient, "_client", None)
+    monkeypatch.setattr(ingest_pipeline, "EmbeddingService", FakeEmbedder)
+    monkeypatch.setattr(ingest_pipeline, "with_embedding_cache", lambda embedder: embedder)
+    return IngestionPipeline()
+
+
+def test_explicit_mixed_case_visibility_is_stored_lowercase(pipeline, tmp_path):
+    path = tmp_path / "handbook.csv"
+    path.write_text("topic,answer\nleave,20 days\n", encoding="utf-8")
+
+    pipeline.ingest(str(path), "hr_policies", extra_metadata={"visibility": "Public"})
+
+    docs = pipeline.vector_store.get_all_documents()
+    assert docs
+    assert {d["metadata"]["visibility"] for d in docs} == {"public"}
+
+    # Dense (where) and BM25 (metadata_filter) pushdowns agree
+    rbac = RBACFilterTool()
+    where = rbac.where_filter(user_id="", role="employee")
+    allowed = rbac.metadata_filter(user_id="", role="employee")
+    visible = pipeline.vector_store.get_all_documents(where=where)
+    assert {d["id"] for d in visible} == {d["id"] for d in docs if allowed(d["metadata"])}
+
+
+def test_normalize_visibility_migrates_stored_chunks(pipeline):
+    store = pipeline.vector_store
+    store.add_documents(
+        ["a", "b", "c"],
+        ["x", "y", "z"],
+        [{"source": "s", "visibility": "HR"}, {"source": "s"}, {"source": "s", "visibility": "admin"}],
+        [[1.0, 0.0], [1.0, 0.0], [1.0, 0.0]],
+    )
+
+    assert store.normalize_visibility() == 2
+    visibility = {d["id"]: d["metadata"]["visibility"] for d in store.get_all_documents()}
+    assert visibility == {"a": "hr", "b": "public", "c": "admin"}
+    assert store.normalize_visibility() == 0